@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from dataclasses import replace
+from pathlib import Path
+
+from benchmarks.run import measure
+from benchmarks.synthetic import SYNTHETIC_DIR, scale_dataset
+
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+#Consultas de cada backend: (nome, função(store)) com os estados de filtro das paginas
+def queries():
+    from f1_reliability import analytics
+    from f1_reliability.filters import FilterSpec
+
+    default = FilterSpec(2004, 2024)
+    full = FilterSpec(1950, 2024)
+    selection = FilterSpec(2004, 2024, constructors=[6, 9], statuses=[5, 6])
+    country = FilterSpec(1950, 2024, countries=['Italy'])
+    return [('overview: default', lambda store: analytics.overview(store, default)),
+            ('overview: full range', lambda store: analytics.overview(store, full)),
+            ('failures by year: teams + issues', lambda store: analytics.failures_by(store, selection, 'year')),
+            ('failures by circuit: full range', lambda store: analytics.failures_by(store, full, 'circuitId')),
+            ('failures by team+year: country', lambda store: analytics.failures_by(store, country, ['year', 'constructorId'])),
+            ('top 10 teams: full range', lambda store: analytics.top_failures(store, full, 'constructorId')),
+            ('top 10 issues: default', lambda store: analytics.top_failures(store, default, 'statusId', least=True)),
+            ('trends: all seasons', lambda store: analytics.trends(store))]
+
+
+#Executado em um processo separado por escala (F1_DATASET_DIR e F1_SNAPSHOT_DIR apontando para o dataset da escala)
+def worker(repeats):
+    from f1_reliability.backends import BACKENDS, build_backend
+    from f1_reliability.store import get_store
+
+    store = get_store()
+    results = {}
+    for backend in BACKENDS:
+        results[f'{backend}: build'] = measure(lambda: build_backend(store.dataset, backend), repeats)
+        backend_store = replace(store, cube=build_backend(store.dataset, backend))
+        for name, query in queries():
+            results[f'{backend}: {name}'] = measure(lambda: query(backend_store), repeats)
+    print(json.dumps(results))
+
+
+def run_scale(factor, repeats):
+    dataset_dir = ROOT / 'dataset' if factor == 1 else SYNTHETIC_DIR / f'x{factor}'
+    if not dataset_dir.exists():
+        scale_dataset(factor)
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        env = dict(os.environ, F1_DATASET_DIR=str(dataset_dir), F1_SNAPSHOT_DIR=snapshot_dir)
+        output = subprocess.run([sys.executable, '-m', 'benchmarks.backends', '--worker', '--repeats', str(repeats)],
+                                cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+#Uma linha por consulta com o tempo de cada backend e quantas vezes o DuckDB é mais rapido
+def report(results):
+    lines = []
+    for scale, measures in results.items():
+        lines.append(f'{scale:<6}{"query":<36}{"pandas s":>10}{"duckdb s":>10}{"speedup":>9}')
+        names = dict.fromkeys(name.split(': ', 1)[1] for name in measures)
+        for name in names:
+            pandas, duckdb = measures[f'pandas: {name}']['seconds'], measures[f'duckdb: {name}']['seconds']
+            lines.append(f'{"":<6}{name:<36}{pandas:>10.4f}{duckdb:>10.4f}{pandas / duckdb if duckdb else float("nan"):>8.1f}x')
+    return '\n'.join(lines)
+
+
+#python -m benchmarks.backends [--scale 1 --scale 10 --scale 100] [--repeats 5]
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare the pandas cube and the DuckDB backend at several dataset scales.')
+    parser.add_argument('--scale', type=int, action='append', help='dataset scale factor (repeatable, default 1, 10 and 100)')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker(args.repeats)
+        return
+    print(report({f'x{factor}': run_scale(factor, args.repeats) for factor in args.scale or [1, 10, 100]}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import random
+import sys
+from dataclasses import replace
+
+import pandas as pd
+
+from f1_reliability import analytics
+from f1_reliability.backends import build_backend
+from f1_reliability.filters import FilterSpec
+from f1_reliability.store import get_store
+
+
+#Estados de filtro das paginas: valores padrão, seleções dos cenarios do benchmark e casos de borda
+#(seleção vazia, somente sprints, pais + circuito + falha)
+FIXED_SPECS = [
+    FilterSpec(),
+    FilterSpec(2004, 2024),
+    FilterSpec(2014, 2024),
+    FilterSpec(2004, 2024, constructors=[6, 9], statuses=[5, 6]),
+    FilterSpec(2014, 2024, constructors=[1, 3, 6, 9, 131, 214]),
+    FilterSpec(2004, 2024, countries=['Italy']),
+    FilterSpec(2004, 2024, countries=['Italy'], circuits=[14], statuses=[5]),
+    FilterSpec(2021, 2024, sessions=[2]),
+    FilterSpec(1990, 1995, constructors=[999]),
+]
+
+
+#Combinações aleatorias (reproduziveis pela semente) de anos, equipes, status, paises e sessões existentes no dataset
+def random_specs(store, count, seed=0):
+    rng = random.Random(seed)
+    facts = store.dataset.facts
+    years = store.index.year_values
+    constructors = sorted(facts['constructorId'].unique().tolist())
+    statuses = sorted(facts.loc[facts['is_mechanical'], 'statusId'].unique().tolist())
+    countries = sorted(store.dataset.circuits['country'].dropna().unique().tolist())
+    specs = []
+    for _ in range(count):
+        start = rng.choice(years)
+        end = rng.choice([year for year in years if year >= start])
+        specs.append(FilterSpec(start, end,
+                                constructors=rng.sample(constructors, rng.randint(1, 6)) if rng.random() < 0.5 else None,
+                                statuses=rng.sample(statuses, rng.randint(1, 4)) if rng.random() < 0.4 else None,
+                                countries=rng.sample(countries, rng.randint(1, 3)) if rng.random() < 0.3 else None,
+                                sessions=[rng.choice([1, 2])] if rng.random() < 0.2 else None))
+    return specs
+
+
+#Tabelas de KPIs e graficos que as paginas e a API pedem ao backend para um estado de filtro
+def tables(store, spec):
+    yield 'overview', analytics.overview(store, spec)
+    for by in ['year', 'constructorId', 'circuitId', 'statusId', ['year', 'constructorId']]:
+        yield f'failures by {by}', analytics.failures_by(store, spec, by)
+    for by in ['constructorId', 'statusId']:
+        for least in (False, True):
+            yield f'top failures by {by} (least={least})', analytics.top_failures(store, spec, by, least=least)
+    yield 'races by year', store.cube.select(spec).distinct_races('year')
+
+
+def _equal(left, right):
+    if isinstance(left, pd.DataFrame):
+        try:
+            pd.testing.assert_frame_equal(left.reset_index(drop=True), right.reset_index(drop=True), check_dtype=False)
+        except AssertionError:
+            return False
+        return True
+    return left == right
+
+
+#Diferenças entre o backend pandas e outro backend (lista vazia = resultados identicos)
+def compare(store, other, specs):
+    differences = []
+    for spec in specs:
+        for (name, left), (_, right) in zip(tables(store, spec), tables(other, spec)):
+            if not _equal(left, right):
+                differences.append(f'{name} {spec}')
+    for sessions in [None, (1,), (2,)]:
+        if not _equal(analytics.trends(store, sessions), analytics.trends(other, sessions)):
+            differences.append(f'trends sessions={sessions}')
+    return differences
+
+
+#python -m benchmarks.equivalence [--backend duckdb] [--random 200]
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check that a query backend returns the same tables as the pandas cube.')
+    parser.add_argument('--backend', default='duckdb')
+    parser.add_argument('--random', type=int, default=200, help='number of random filter combinations')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    store = get_store()
+    store = replace(store, cube=build_backend(store.dataset, 'pandas'))
+    other = replace(store, cube=build_backend(store.dataset, args.backend))
+    specs = FIXED_SPECS + random_specs(store, args.random, args.seed)
+    differences = compare(store, other, specs)
+    print(f'{len(specs)} filter states, {len(list(tables(store, FilterSpec())))} tables each + trends: '
+          f'{len(differences)} differences between pandas and {args.backend}')
+    if differences:
+        print('\n'.join(differences[:50]))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+#Requisições representativas dos outros sistemas: agregados por ano, equipe, circuito e status com filtros variados
+TEAMS = ['ferrari', 'mclaren', 'williams', 'red bull', 'mercedes', '6,9', '1,3,131']
+STATUSES = ['engine', 'gearbox', 'engine,gearbox', 'hydraulics']
+COUNTRIES = ['Italy', 'UK', 'Monaco', 'Brazil']
+
+
+def random_path(rng):
+    start = rng.randint(1950, 2024)
+    end = rng.randint(start, 2024)
+    query = [f'start_year={start}', f'end_year={end}']
+    if rng.random() < 0.4:
+        query.append(f'team={rng.choice(TEAMS)}')
+    if rng.random() < 0.3:
+        query.append(f'status={rng.choice(STATUSES)}')
+    if rng.random() < 0.2:
+        query.append(f'country={rng.choice(COUNTRIES)}')
+    endpoint = rng.choice(['/overview', '/failures/year', '/failures/team', '/failures/circuit', '/failures/status',
+                           '/constructors', '/circuits'])
+    return f'{endpoint}?{"&".join(query)}'.replace(' ', '%20')
+
+
+#Uma requisição: status e segundos. Com revalidate, repete o etag recebido antes para o mesmo caminho (If-None-Match)
+def fetch(url, etags, revalidate):
+    request = urllib.request.Request(url)
+    if revalidate and url in etags:
+        request.add_header('If-None-Match', etags[url])
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            response.read()
+            status = response.status
+            if response.headers.get('ETag'):
+                etags[url] = response.headers['ETag']
+    except urllib.error.HTTPError as error:
+        status = error.code
+    return status, time.perf_counter() - start
+
+
+def run(base_url, requests, concurrency, distinct, revalidate, seed):
+    rng = random.Random(seed)
+    paths = [random_path(rng) for _ in range(distinct)]
+    urls = [base_url.rstrip('/') + rng.choice(paths) for _ in range(requests)]
+    etags = {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda url: fetch(url, etags, revalidate), urls))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(seconds * 1000 for _, seconds in results)
+    return {'requests': requests,
+            'concurrency': concurrency,
+            'seconds': round(elapsed, 2),
+            'requests/s': round(requests / elapsed, 1),
+            'p50 ms': round(statistics.median(latencies), 1),
+            'p95 ms': round(latencies[int(len(latencies) * 0.95) - 1], 1),
+            'max ms': round(latencies[-1], 1),
+            'status': dict(Counter(status for status, _ in results))}
+
+
+#python -m benchmarks.load_test [--url http://127.0.0.1:8502] [--requests 2000] [--concurrency 32]
+#Sem --url sobe um servidor local em uma porta livre, no mesmo processo
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the JSON API with concurrent requests.')
+    parser.add_argument('--url', help='running API (default: start a local server on a free port)')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--distinct', type=int, default=200, help='number of distinct filter combinations')
+    parser.add_argument('--no-revalidate', dest='revalidate', action='store_false',
+                        help='do not send If-None-Match with the ETag of a previous response')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = None
+    url = args.url
+    if url is None:
+        from f1_reliability.api import make_server
+        server = make_server(port=0, quiet=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f'http://127.0.0.1:{server.server_port}'
+    try:
+        for name, value in run(url, args.requests, args.concurrency, args.distinct, args.revalidate, args.seed).items():
+            print(f'{name:<12}{value}')
+        if server is not None:
+            cache = server.RequestHandlerClass.cache
+            print(f'{"cache":<12}{cache.hits} hits, {cache.misses} misses')
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.synthetic import SYNTHETIC_DIR, scale_dataset
+
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+
+
+#Estados de filtro representativos de cada pagina: (pagina, nome, função que ajusta os widgets do AppTest)
+def _full_range(at):
+    slider = at.sidebar.select_slider[0]
+    slider.set_value((slider.options[0], slider.options[-1]))
+
+def _main_selection(at):
+    at.sidebar.multiselect[1].set_value([6, 9]) #Ferrari, Red Bull
+    at.sidebar.multiselect[2].set_value([5, 6]) #Engine, Gearbox
+
+def _constructors_selection(at):
+    at.sidebar.multiselect[1].set_value([1, 3, 6, 9, 131, 214]) #McLaren, Williams, Ferrari, Red Bull, Mercedes, Alpine
+
+def _circuits_selection(at):
+    at.sidebar.selectbox[0].set_value('Italy')
+
+def _circuits_circuit(at):
+    at.sidebar.selectbox[0].set_value('Italy')
+    at.sidebar.selectbox[1].set_value(14) #Monza
+    at.sidebar.multiselect[1].set_value([5]) #Engine
+
+#Somente sprints em anos sem sprint: a seleção fica vazia e a pagina mostra o estado vazio
+def _no_sprints(at):
+    at.sidebar.select_slider[0].set_value((2010, 2020))
+    at.sidebar.multiselect[0].set_value([2]) #Sprint
+
+SCENARIOS = [
+    ('Main.py', 'default', None),
+    ('Main.py', 'full range', _full_range),
+    ('Main.py', 'teams + issues', _main_selection),
+    ('pages/Constructors.py', 'default', None),
+    ('pages/Constructors.py', 'full range', _full_range),
+    ('pages/Constructors.py', 'six teams', _constructors_selection),
+    ('pages/Circuits.py', 'default', None),
+    ('pages/Circuits.py', 'full range', _full_range),
+    ('pages/Circuits.py', 'country', _circuits_selection),
+    ('pages/Circuits.py', 'circuit + issue', _circuits_circuit),
+    ('pages/Circuits.py', 'sprint, no sprints', _no_sprints),
+]
+
+
+#Medidas alternadas: cada rodada executa todas as funções uma vez, então uma fase lenta da maquina atinge todas as medidas
+#igualmente em vez de uma só. Tempo = o menor das rodadas (como no timeit: o ruido da maquina só aumenta o tempo)
+def measure_all(functions, repeats=3):
+    times = {name: [] for name in functions}
+    for _ in range(repeats):
+        for name, function in functions.items():
+            start = time.perf_counter()
+            function()
+            times[name].append(time.perf_counter() - start)
+    results = {}
+    for name, function in functions.items():
+        tracemalloc.start()
+        function()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results[name] = {'seconds': round(min(times[name]), 4), 'peak_mb': round(peak / 1e6, 2)}
+    return results
+
+
+#Tempo e pico de memoria de uma única função
+def measure(function, repeats=3):
+    return measure_all({'': function}, repeats)['']
+
+
+#Executado em um processo separado por escala, com F1_DATASET_DIR e F1_SNAPSHOT_DIR apontando para o dataset da escala
+def worker(repeats):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    from f1_reliability import snapshot, store
+    from f1_reliability.cube import build_cube
+    from f1_reliability.filters import FilterIndex
+
+    #Carga do dataset: construção a partir dos csv, leitura do snapshot e estruturas derivadas
+    functions = {'load: build from csv': snapshot.build}
+    snapshot.build()
+    dataset = snapshot.load()
+    functions['load: read snapshot'] = snapshot.load
+    functions['load: cube'] = lambda: build_cube(dataset)
+    functions['load: filter index'] = lambda: FilterIndex(dataset)
+    store.get_store()
+
+    #Rerun de cada pagina sem a cache de st.cache_data (o dataset compartilhado continua carregado)
+    for page, name, setup in SCENARIOS:
+        at = AppTest.from_file(str(ROOT / page), default_timeout=600)
+        at.run()
+        if setup is not None:
+            setup(at)
+        def rerun(at=at, page=page, name=name):
+            st.cache_data.clear()
+            at.run()
+            if at.exception:
+                raise RuntimeError(f'{page} [{name}]: {at.exception[0].value}')
+        functions[f'{page}: {name}'] = rerun
+
+    results = measure_all(functions, repeats)
+    results['process max rss'] = {'peak_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3, 2)}
+    print(json.dumps(results))
+
+
+def run_scale(factor, repeats):
+    dataset_dir = ROOT / 'dataset' if factor == 1 else SYNTHETIC_DIR / f'x{factor}'
+    if not dataset_dir.exists():
+        scale_dataset(factor)
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        env = dict(os.environ, F1_DATASET_DIR=str(dataset_dir), F1_SNAPSHOT_DIR=snapshot_dir)
+        output = subprocess.run([sys.executable, '-m', 'benchmarks.run', '--worker', '--repeats', str(repeats)],
+                                cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+#Velocidade da maquina agora em relação à baseline: primeiro quartil de tempo atual / baseline das medidas da escala. Em
+#uma maquina compartilhada todas as medidas mudam juntas; uma regressão de verdade (mesmo em todos os cenarios de uma
+#pagina) fica acima do quartil e aparece. Uma lentidão igual em mais de 3/4 das medidas não é detectada: --absolute
+#compara sem essa correção
+def speed_factor(measures, baseline_measures):
+    ratios = [values['seconds'] / baseline_measures[name]['seconds'] for name, values in measures.items()
+              if values.get('seconds') and baseline_measures.get(name, {}).get('seconds')]
+    return statistics.quantiles(ratios, n=4)[0] if len(ratios) > 1 else 1.0
+
+
+#Comparando com a baseline: tempos acima de (1 + tolerance) x baseline (escalada pela velocidade da maquina) + slack são
+#regressões. O slack absoluto evita falsos alarmes nas medidas de poucos milissegundos
+def compare(results, baseline, tolerance, slack=0.01, absolute=False):
+    regressions = []
+    for scale, measures in results.items():
+        factor = 1.0 if absolute else speed_factor(measures, baseline.get(scale, {}))
+        for name, values in measures.items():
+            before = baseline.get(scale, {}).get(name, {}).get('seconds')
+            if before:
+                before *= factor
+            if before and values.get('seconds', 0) > before * (1 + tolerance) + slack:
+                regressions.append(f'{scale} {name}: {before:.4f}s -> {values["seconds"]:.4f}s')
+    return regressions
+
+
+def report(results, baseline, absolute=False):
+    lines = []
+    for scale, measures in results.items():
+        factor = 1.0 if absolute else speed_factor(measures, baseline.get(scale, {}))
+        lines.append(f'{scale:<6}{"measure":<40}{"seconds":>10}{"baseline":>10}{"peak MB":>10}   (baseline x {factor:.2f} for machine speed)')
+        for name, values in measures.items():
+            before = baseline.get(scale, {}).get(name, {}).get('seconds')
+            if before:
+                before *= factor
+            seconds = values.get('seconds')
+            lines.append(f'{"":<6}{name:<40}{"" if seconds is None else f"{seconds:.4f}":>10}'
+                         f'{"" if before is None else f"{before:.4f}":>10}{values["peak_mb"]:>10.2f}')
+    return '\n'.join(lines)
+
+
+#python -m benchmarks.run [--scale 1 --scale 10 --scale 100] [--save] [--tolerance 0.25]
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark dataset loading and page reruns without a browser.')
+    parser.add_argument('--scale', type=int, action='append', help='dataset scale factor (repeatable, default 1 and 10)')
+    parser.add_argument('--repeats', type=int, default=7)
+    parser.add_argument('--save', action='store_true', help=f'store the results as the new baseline ({BASELINE.name})')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown against the baseline')
+    parser.add_argument('--slack', type=float, default=0.01, help='allowed absolute slowdown in seconds (for very short measures)')
+    parser.add_argument('--absolute', action='store_true', help='compare raw times, without the machine speed correction')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker(args.repeats)
+        return
+
+    results = {f'x{factor}': run_scale(factor, args.repeats) for factor in args.scale or [1, 10]}
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    print(report(results, baseline, args.absolute))
+    if args.save:
+        BASELINE.write_text(json.dumps({**baseline, **results}, indent=1) + '\n')
+        print(f'Baseline written: {BASELINE}')
+        return
+    regressions = compare(results, baseline, args.tolerance, args.slack, args.absolute)
+    if regressions:
+        print('Regressions:\n' + '\n'.join(regressions))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
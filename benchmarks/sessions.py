@@ -0,0 +1,110 @@
+import argparse
+import gc
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic import SYNTHETIC_DIR, scale_dataset
+
+
+ROOT = Path(__file__).resolve().parent.parent
+PAGES = ['Main.py', 'pages/Constructors.py', 'pages/Circuits.py', 'pages/Pit_Stops.py', 'pages/Championships.py', 'pages/Drivers.py']
+
+
+#Memoria residente atual do processo (MB)
+def rss_mb():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+
+
+#Valores guardados no session_state de uma sessão que são tabelas (nenhuma pagina deveria guardar dados por sessão)
+def session_tables(at):
+    state = at.session_state
+    return [key for key, value in state.items() if isinstance(value, (pd.DataFrame, pd.Series))]
+
+
+#Abre sessions sessões de cada pagina (todas mantidas vivas, como usuarios simultaneos), cada uma fria: nenhuma abriu a
+#Main antes. Mede a memoria depois da primeira sessão e depois da ultima
+def run(sessions, pages=PAGES):
+    from streamlit.testing.v1 import AppTest
+
+    from f1_reliability.store import get_store
+
+    alive = []
+    results = []
+    for page in pages:
+        before = None
+        for i in range(sessions):
+            at = AppTest.from_file(str(ROOT / page), default_timeout=600)
+            at.run()
+            if at.exception:
+                raise RuntimeError(f'{page} (session {i + 1}): {at.exception[0].value}')
+            tables = session_tables(at)
+            if tables:
+                raise RuntimeError(f'{page} keeps tables in session_state: {tables}')
+            alive.append(at)
+            if i == 0:
+                gc.collect()
+                before = rss_mb()
+        gc.collect()
+        after = rss_mb()
+        results.append({'page': page, 'sessions': sessions, 'rss_1_mb': round(before, 1), f'rss_{sessions}_mb': round(after, 1),
+                        'per_session_mb': round((after - before) / max(sessions - 1, 1), 3)})
+    dataset_mb = sum(get_store().dataset.memory_usage().values()) / 1e6
+    return pd.DataFrame(results), dataset_mb, len(alive)
+
+
+#Executado em um processo separado, com F1_DATASET_DIR e F1_SNAPSHOT_DIR apontando para o dataset da escala
+def worker(sessions):
+    table, dataset_mb, alive = run(sessions)
+    print(json.dumps({'table': table.to_dict('records'), 'dataset_mb': dataset_mb, 'alive': alive,
+                      'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3}))
+
+
+def run_scale(factor, sessions):
+    dataset_dir = ROOT / 'dataset' if factor == 1 else SYNTHETIC_DIR / f'x{factor}'
+    if not dataset_dir.exists():
+        scale_dataset(factor)
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        env = dict(os.environ, F1_DATASET_DIR=str(dataset_dir), F1_SNAPSHOT_DIR=snapshot_dir)
+        output = subprocess.run([sys.executable, '-m', 'benchmarks.sessions', '--worker', '--sessions', str(sessions)],
+                                cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+#python -m benchmarks.sessions [--scale 10] [--sessions 50] [--max-share 0.25]
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check that memory stays flat as concurrent sessions grow and that every page renders on a cold session.')
+    parser.add_argument('--scale', type=int, default=10, help='dataset scale factor (the shared tables must dwarf one session\'s widgets)')
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--max-share', type=float, default=0.25,
+                        help='allowed memory growth per session, as a share of the shared dataset size')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker(args.sessions)
+        return
+
+    result = run_scale(args.scale, args.sessions)
+    table = pd.DataFrame(result['table'])
+    print(table.to_string(index=False))
+    limit = result['dataset_mb'] * args.max_share
+    print(f'x{args.scale}: {result["alive"]} live sessions; shared dataset {result["dataset_mb"]:.1f} MB; '
+          f'allowed growth {limit:.2f} MB per session; process max rss {result["max_rss_mb"]:.1f} MB')
+    #Cada sessão guarda só os widgets, os elementos renderizados e os recortes da sua seleção; uma copia do dataset por
+    #sessão passaria do limite
+    over = table[table['per_session_mb'] > limit]
+    if not over.empty:
+        print('Memory grows with sessions:\n' + over.to_string(index=False))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
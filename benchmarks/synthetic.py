@@ -0,0 +1,65 @@
+import argparse
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+from f1_reliability.dataset import DATASET_DIR, SESSION_FILES
+
+
+#Diretorio dos datasets sinteticos (fica dentro de cache/, fora do git)
+SYNTHETIC_DIR = Path(__file__).resolve().parent.parent / 'cache' / 'benchmarks'
+
+
+#Dataset aumentado factor vezes: cada corrida vira factor corridas no mesmo ano e circuito (novos raceId e round)
+#e os resultados são copiados com novos resultId. Pilotos, equipes, circuitos e status continuam os mesmos,
+#então todas as chaves da tabela fato continuam existindo nas dimensões
+def scale_dataset(factor, dataset_dir=DATASET_DIR, output_dir=None):
+    output_dir = Path(output_dir or SYNTHETIC_DIR / f'x{factor}')
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    shutil.copytree(dataset_dir, output_dir)
+    if factor == 1:
+        return output_dir
+
+    races = pd.read_csv(Path(dataset_dir) / 'races.csv', keep_default_na=False, dtype=str)
+    race_ids = races['raceId'].astype(int)
+    rounds = races['round'].astype(int)
+    race_step, round_step = race_ids.max(), rounds.max()
+
+    race_copies = [races]
+    for copy in range(1, factor):
+        race_copy = races.copy()
+        race_copy['raceId'] = (race_ids + copy * race_step).astype(str)
+        race_copy['round'] = (rounds + copy * round_step).astype(str)
+        race_copies.append(race_copy)
+    pd.concat(race_copies, ignore_index=True).to_csv(output_dir / 'races.csv', index=False)
+
+    #Resultados do Grand Prix e da sprint copiados para as novas corridas
+    for file in SESSION_FILES.values():
+        results = pd.read_csv(Path(dataset_dir) / file, keep_default_na=False, dtype=str)
+        result_ids = results['resultId'].astype(int)
+        result_step = result_ids.max()
+        result_copies = [results]
+        for copy in range(1, factor):
+            result_copy = results.copy()
+            result_copy['resultId'] = (result_ids + copy * result_step).astype(str)
+            result_copy['raceId'] = (results['raceId'].astype(int) + copy * race_step).astype(str)
+            result_copies.append(result_copy)
+        pd.concat(result_copies, ignore_index=True).to_csv(output_dir / file, index=False)
+    return output_dir
+
+
+#python -m benchmarks.synthetic --factor 10 --factor 100
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate scaled-up synthetic copies of the F1 dataset.')
+    parser.add_argument('--factor', type=int, action='append', help='scale factor (repeatable, default 10 and 100)')
+    parser.add_argument('--dataset-dir', default=DATASET_DIR, type=Path)
+    args = parser.parse_args(argv)
+    for factor in args.factor or [10, 100]:
+        path = scale_dataset(factor, args.dataset_dir)
+        print(f'x{factor}: {path}')
+
+
+if __name__ == '__main__':
+    main()
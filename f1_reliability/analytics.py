@@ -0,0 +1,120 @@
+from dataclasses import dataclass, replace
+
+from f1_reliability.counterfactual import counterfactual
+from f1_reliability.kpis import circuit_summary, constructor_kpis, driver_failures, driver_kpis
+from f1_reliability.pitstops import get_pit_stops, stop_profile
+from f1_reliability.simulation import RUNS, simulate_season
+from f1_reliability.survival import race_laps, survival_curves
+from f1_reliability.trends import rolling_trends, season_totals
+
+
+#Funções de analise de confiabilidade sem dependencia do Streamlit: recebem os dados compartilhados (Store: dataset,
+#cubo e indice de filtros) e um FilterSpec e devolvem numeros ou DataFrames. As paginas só desenham o resultado
+
+
+#KPIs gerais da seleção
+@dataclass(frozen=True)
+class Overview:
+    races: int
+    seasons: int
+    drivers: int
+    constructors: int
+    circuits: int
+    countries: int
+    results: int
+    mechanical_issues: int
+
+    #Parcela dos resultados que terminou em falha mecânica (%)
+    @property
+    def mechanical_share(self):
+        return round(self.mechanical_issues * 100 / self.results, 1) if self.results else 0.0
+
+
+def overview(store, spec):
+    cube = store.cube.select(spec)
+    return Overview(races=cube.distinct_races(),
+                    seasons=cube.distinct('year'),
+                    drivers=int(store.index.select(spec)['driverId'].nunique()),
+                    constructors=cube.distinct('constructorId'),
+                    circuits=cube.distinct('circuitId'),
+                    countries=cube.distinct_countries(),
+                    results=cube.total(),
+                    mechanical_issues=cube.slice(mechanical=True).total())
+
+
+#Quantidade de falhas mecânicas agrupadas por colunas do cubo (year, constructorId, circuitId, statusId)
+def failures_by(store, spec, by, name='failures'):
+    return store.cube.select(replace(spec, mechanical=True)).count_by(by, name)
+
+
+#Top n de falhas mecânicas por uma coluna do cubo, calculado pelo backend (um ORDER BY ... LIMIT no DuckDB)
+def top_failures(store, spec, by, name='failures', n=10, least=False):
+    return store.cube.select(replace(spec, mechanical=True)).top(by, name, n, least)
+
+
+#Tabela de KPIs de todas as equipes na seleção (races, wins, podiums, lost podiums/victories, worst season, reliability)
+def constructor_table(store, spec):
+    return constructor_kpis(store.index.select(spec))
+
+
+#Tabela de KPIs de todos os pilotos na seleção, com nome, nacionalidade e ultima equipe
+def driver_table(store, spec):
+    table = driver_kpis(store.index.select(spec)).reset_index()
+    table = store.dataset.attach(table, 'drivers', ['driver', 'nationality'])
+    table['last_team'] = table['last_team'].map(store.dataset.labels('constructors', 'constructor'))
+    return table
+
+
+#Falhas mecânicas de todos os pilotos da seleção por temporada, equipe e tipo de falha, com os nomes de exibição
+def failures_by_driver(store, spec):
+    failures = driver_failures(store.index.select(spec))
+    failures = store.dataset.attach(failures, 'constructors', ['constructor'])
+    return store.dataset.attach(failures, 'status', ['status'])
+
+
+#Tabela resumo por circuito com os atributos de exibição; statuses muda somente a contagem de falhas
+def circuit_table(store, spec, statuses=None):
+    summary = circuit_summary(store.index.select(spec), statuses)
+    summary = store.dataset.attach(summary, 'status', ['status'])
+    summary = store.dataset.attach(summary, 'circuits', ['circuit_name', 'flag_url', 'country', 'location'])
+    return summary[['circuitId', 'circuit_name', 'flag_url', 'country', 'location', 'failures', 'races', 'mean', 'status', 'status_count', 'rate']]
+
+
+#Volta em que cada falha mecânica da seleção aconteceu
+def failure_laps(store, spec):
+    return store.index.select(replace(spec, mechanical=True))['laps'].to_numpy()
+
+
+#Paradas de box de cada resultado da seleção (somente corridas com dados de paradas; a tabela é carregada na primeira chamada)
+def pit_stop_profile(store, spec):
+    return stop_profile(get_pit_stops(store), store.index.select(spec))
+
+
+#Curvas de sobrevivência até a falha mecânica por distancia da corrida, para todos os grupos da seleção de uma vez
+#(by = constructorId, era ou category). O filtro de status é ignorado: quem terminou a corrida também entra na curva
+def survival(store, spec, by):
+    curves = survival_curves(store.index.select(replace(spec, statuses=None, mechanical=None)), by, store.dataset.status,
+                             race_laps(store.dataset.facts))
+    if by == 'constructorId':
+        curves = store.dataset.attach(curves, 'constructors', ['constructor'])
+    return curves
+
+
+#Tabela pré-calculada de tendências moveis (3 e 5 temporadas) de todas as equipes e anos, a partir do cubo;
+#as paginas só recortam equipes e anos
+def trends(store, sessions=None):
+    return rolling_trends(season_totals(store.cube.slice(sessions=sessions)))
+
+
+#Campeonatos reais e contrafactuais (sem as falhas mecânicas) de todas as temporadas em um lote, com a checagem contra
+#as classificações oficiais (as tabelas de classificação são carregadas na primeira chamada)
+def championships(store):
+    return counterfactual(store.dataset.facts, store.dataset.races,
+                          store.tables['driver_standings'], store.tables['constructor_standings'])
+
+
+#Temporada re-simulada RUNS vezes com as falhas mecânicas sorteadas pelas taxas da equipe ou da era (by = driverId ou
+#constructorId): probabilidade de titulo e pontos medios de cada piloto/equipe
+def season_simulation(store, year, by='driverId', rates='constructor', runs=RUNS, seed=0):
+    standings = store.tables['driver_standings' if by == 'driverId' else 'constructor_standings']
+    return simulate_season(store.dataset.facts, store.dataset.races, standings, year, by, rates, runs, seed)
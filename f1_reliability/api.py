@@ -0,0 +1,248 @@
+import argparse
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from f1_reliability import analytics
+from f1_reliability.dataset import DATASET_DIR
+from f1_reliability.filters import FilterSpec
+from f1_reliability.store import get_store
+
+
+#API HTTP/JSON somente leitura com os mesmos agregados das paginas (python -m f1_reliability.api). Todas as requisições
+#usam a instancia única do processo (get_store), então o dataset é carregado uma vez e nunca copiado por requisição
+
+#Endereço padrão do servidor e quantidade de respostas guardadas na cache
+HOST = '127.0.0.1'
+PORT = 8502
+CACHE_SIZE = 1024
+
+#Filtros aceitos na query string: parametro -> (campo do FilterSpec, dimensão e coluna dos nomes aceitos no lugar dos ids).
+#Listas podem vir separadas por virgula ou repetindo o parametro (?team=ferrari&team=6)
+FILTERS = {'team': ('constructors', ('constructors', 'constructor')),
+           'status': ('statuses', ('status', 'status')),
+           'circuit': ('circuits', ('circuits', 'circuit_name')),
+           'country': ('countries', None),
+           'session': ('sessions', ('sessions', 'session'))}
+
+#Agrupamentos de /failures/<by>
+FAILURES_BY = {'year': 'year', 'team': 'constructorId', 'circuit': 'circuitId', 'status': 'statusId'}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _values(query, name):
+    return [value.strip() for values in query.get(name, []) for value in values.split(',') if value.strip()]
+
+
+#Ids de uma dimensão a partir de ids ou nomes (sem diferenciar maiusculas)
+def _ids(values, labels):
+    ids = {name.lower(): key for key, name in labels.items()}
+    result = []
+    for value in values:
+        if value.lstrip('-').isdigit():
+            result.append(int(value))
+        elif value.lower() in ids:
+            result.append(ids[value.lower()])
+        else:
+            raise BadRequest(f'unknown value: {value}')
+    return result
+
+
+def _year(query, name):
+    values = _values(query, name)
+    if not values:
+        return None
+    if not values[-1].isdigit():
+        raise BadRequest(f'{name} must be a year')
+    return int(values[-1])
+
+
+def filter_spec(store, query):
+    filters = {}
+    for name, (field, labels) in FILTERS.items():
+        values = _values(query, name)
+        if values:
+            filters[field] = values if labels is None else _ids(values, store.dataset.labels(*labels))
+    return FilterSpec(start_year=_year(query, 'start_year'), end_year=_year(query, 'end_year'), **filters)
+
+
+#Endpoints: caminho -> função (store, spec, by) que devolve um DataFrame ou um dict
+def _overview(store, spec, by):
+    overview = analytics.overview(store, spec)
+    return {**asdict(overview), 'mechanical_share': overview.mechanical_share}
+
+
+def _failures(store, spec, by):
+    if by not in FAILURES_BY:
+        raise BadRequest(f'failures can be grouped by {", ".join(FAILURES_BY)}')
+    failures = analytics.failures_by(store, spec, FAILURES_BY[by])
+    if by == 'team':
+        failures = store.dataset.attach(failures, 'constructors', ['constructor'])
+    elif by == 'circuit':
+        failures = store.dataset.attach(failures, 'circuits', ['circuit_name', 'country'])
+    elif by == 'status':
+        failures = store.dataset.attach(failures, 'status', ['status'])
+    return failures.sort_values('failures', ascending=False) if by != 'year' else failures
+
+
+def _constructors(store, spec, by):
+    table = analytics.constructor_table(store, spec).reset_index()
+    return store.dataset.attach(table, 'constructors', ['constructor'])
+
+
+def _circuits(store, spec, by):
+    return analytics.circuit_table(store, spec).drop(columns='flag_url')
+
+
+ENDPOINTS = {'overview': _overview,
+             'failures': _failures,
+             'constructors': _constructors,
+             'circuits': _circuits}
+
+
+#Cache LRU das respostas: (fingerprint, caminho, query normalizada) -> (etag, corpo). O etag é o hash dessa chave, então
+#muda sozinho quando o dataset muda, e um If-None-Match igual é respondido com 304 sem calcular nada.
+#Requisições simultâneas da mesma chave esperam a primeira calcular em vez de calcular de novo
+class ResponseCache:
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+        self._computing = {} #chave -> lock da chave sendo calculada
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def etag(key):
+        return f'"{hashlib.sha1(repr(key).encode()).hexdigest()[:20]}"'
+
+    def _get(self, key):
+        with self._lock:
+            response = self._responses.get(key)
+            if response is not None:
+                self._responses.move_to_end(key)
+                self.hits += 1
+            return response
+
+    def get(self, key, compute):
+        response = self._get(key)
+        if response is not None:
+            return response
+        with self._lock:
+            lock = self._computing.setdefault(key, threading.Lock())
+        with lock:
+            response = self._get(key)
+            if response is not None:
+                return response
+            try:
+                response = (self.etag(key), compute())
+            finally:
+                with self._lock:
+                    self._computing.pop(key, None)
+            with self._lock:
+                self.misses += 1
+                self._responses[key] = response
+                while len(self._responses) > self.size:
+                    self._responses.popitem(last=False)
+        return response
+
+
+def _body(store, spec, data):
+    if isinstance(data, dict):
+        data = json.dumps(data)
+    else:
+        data = data.to_json(orient='records', force_ascii=False)
+    filters = {name: value for name, value in asdict(spec).items() if value is not None}
+    return f'{{"fingerprint": {json.dumps(store.fingerprint)}, "filters": {json.dumps(filters)}, "data": {data}}}'.encode()
+
+
+#Status, headers e corpo da resposta de uma requisição GET
+def respond(path, query_string, if_none_match=None, cache=None, dataset_dir=DATASET_DIR):
+    store = get_store(dataset_dir)
+    parts = [part for part in path.split('/') if part]
+    if not parts:
+        body = json.dumps({'fingerprint': store.fingerprint,
+                           'endpoints': [f'/{name}' for name in ENDPOINTS if name != 'failures'] + [f'/failures/{by}' for by in FAILURES_BY],
+                           'filters': ['start_year', 'end_year'] + list(FILTERS)}).encode()
+        return 200, {}, body
+    if parts[0] not in ENDPOINTS or len(parts) > 2 or (len(parts) == 2) != (parts[0] == 'failures'):
+        return 404, {}, json.dumps({'error': f'unknown endpoint: {path}'}).encode()
+
+    query = parse_qs(query_string)
+    key = (store.fingerprint, tuple(parts), tuple(sorted((name, tuple(values)) for name, values in query.items())))
+    etag = ResponseCache.etag(key)
+    if if_none_match and etag in [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]:
+        return 304, {'ETag': etag}, b''
+
+    def compute():
+        spec = filter_spec(store, query)
+        return _body(store, spec, ENDPOINTS[parts[0]](store, spec, parts[1] if len(parts) == 2 else None))
+    try:
+        etag, body = cache.get(key, compute) if cache is not None else (etag, compute())
+    except BadRequest as error:
+        return 400, {}, json.dumps({'error': str(error)}).encode()
+    return 200, {'ETag': etag}, body
+
+
+class Handler(BaseHTTPRequestHandler):
+    cache = ResponseCache()
+    dataset_dir = DATASET_DIR
+    quiet = False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        status, headers, body = respond(url.path, url.query, self.headers.get('If-None-Match'), self.cache, self.dataset_dir)
+        self.send_response(status)
+        self.send_header('Cache-Control', 'no-cache')
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+#Servidor com uma thread por conexão e uma fila de conexões maior que a padrão (5), para rajadas de clientes simultâneos
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+#O dataset é carregado antes de aceitar a primeira requisição
+def make_server(host=HOST, port=PORT, dataset_dir=DATASET_DIR, quiet=False):
+    get_store(dataset_dir)
+    handler = type('Handler', (Handler,), {'cache': ResponseCache(), 'dataset_dir': dataset_dir, 'quiet': quiet})
+    return Server((host, port), handler)
+
+
+#python -m f1_reliability.api [--host 127.0.0.1] [--port 8502]
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the reliability aggregates as a read-only JSON API.')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--quiet', action='store_true', help='do not log each request')
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, quiet=args.quiet)
+    print(f'Serving on http://{args.host}:{server.server_port}/')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+import argparse
+import base64
+import functools
+import hashlib
+import io
+import os
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+import pandas as pd
+from PIL import Image
+
+
+#Diretorio das miniaturas (fica dentro de cache/, fora do git; configuravel com F1_ASSET_DIR)
+ASSET_DIR = Path(os.environ.get('F1_ASSET_DIR', Path(__file__).resolve().parent.parent / 'cache' / 'images'))
+
+#Copia local das imagens para instalações sem internet (F1_ASSET_SOURCE_DIR), no formato host/caminho da url
+#(o mesmo de wget --force-directories). Com esse diretorio definido nada é baixado da internet
+ASSET_SOURCE_DIR = os.environ.get('F1_ASSET_SOURCE_DIR')
+
+#Tamanho maximo da cache em disco (MB); acima disso as miniaturas usadas há mais tempo são apagadas
+ASSET_CACHE_MB = float(os.environ.get('F1_ASSET_CACHE_MB', 50))
+
+#Larguras usadas pelas paginas (as miniaturas são gravadas exatamente nessas larguras)
+FLAG_WIDTH = 70
+CAR_WIDTH = 400
+CIRCUIT_WIDTH = 180
+TABLE_FLAG_WIDTH = 40
+
+#Tempo limite de cada download e intervalo até tentar de novo uma imagem que falhou (segundos)
+TIMEOUT = 5
+RETRY_AFTER = 300
+
+
+def _missing(url):
+    return url is None or pd.isna(url) or url in ('', 'nan')
+
+
+#Data uri de uma miniatura, memorizado pelo arquivo: o inode muda quando a miniatura é regravada (o mtime não serve de
+#chave, ele marca o ultimo uso e muda a cada acesso)
+@functools.lru_cache(maxsize=1024)
+def _encode(path, inode, size):
+    return 'data:image/png;base64,' + base64.b64encode(Path(path).read_bytes()).decode()
+
+
+#Cache LRU em disco das imagens das paginas: cada imagem é baixada (ou importada do diretorio local) uma única vez,
+#reduzida para a largura usada e gravada como png. O mtime de cada arquivo marca o ultimo uso
+class AssetCache:
+    def __init__(self, cache_dir=ASSET_DIR, source_dir=ASSET_SOURCE_DIR, max_mb=ASSET_CACHE_MB, timeout=TIMEOUT):
+        self.cache_dir = Path(cache_dir)
+        self.source_dir = Path(source_dir) if source_dir else None
+        self.max_bytes = int(max_mb * 1e6)
+        self.timeout = timeout
+        self._failed = {} #url -> horario da ultima falha
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='assets')
+
+    def _path(self, url, width):
+        return self.cache_dir / f'{hashlib.sha1(url.encode()).hexdigest()[:20]}-{width}.png'
+
+    #Bytes originais da imagem: do diretorio local quando configurado, senão da internet
+    def _fetch(self, url):
+        if self.source_dir is not None:
+            parts = urlsplit(url)
+            for path in (parts.path, unquote(parts.path)):
+                candidate = self.source_dir / parts.netloc / path.lstrip('/')
+                if candidate.is_file():
+                    return candidate.read_bytes()
+            raise FileNotFoundError(url)
+        request = urllib.request.Request(url, headers={'User-Agent': 'f1_reliability (image cache)'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return response.read()
+
+    @staticmethod
+    def _thumbnail(data, width):
+        image = Image.open(io.BytesIO(data))
+        image = image.convert('RGBA')
+        if image.width > width:
+            image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, format='PNG', optimize=True)
+        return output.getvalue()
+
+    #Apagando as miniaturas usadas há mais tempo até a cache voltar ao tamanho maximo
+    def _evict(self):
+        files = []
+        for f in self.cache_dir.glob('*.png'):
+            try:
+                stat = f.stat()
+            except FileNotFoundError: #apagado por outro processo
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, f))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def _store(self, url, width):
+        path = self._path(url, width)
+        try:
+            thumbnail = self._thumbnail(self._fetch(url), width)
+        except Exception:
+            with self._lock:
+                self._failed[url] = time.time()
+            return None
+        finally:
+            with self._lock:
+                self._pending.discard((url, width))
+        with self._lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            partial = path.with_suffix(f'.{threading.get_ident()}.tmp')
+            partial.write_bytes(thumbnail)
+            partial.replace(path)
+            self._evict()
+        return path
+
+    #Caminho local da miniatura (None quando a imagem não pode ser obtida ou não é uma imagem).
+    #Com wait=False uma miniatura que ainda não existe é criada em segundo plano e a chamada devolve None
+    def path(self, url, width, wait=True):
+        if _missing(url):
+            return None
+        path = self._path(url, width)
+        try:
+            os.utime(path)
+            return path
+        except FileNotFoundError: #ainda não baixada, ou apagada por _evict() de outra sessão: busca de novo
+            pass
+        with self._lock:
+            failed = self._failed.get(url, -RETRY_AFTER)
+        if time.time() - failed < RETRY_AFTER:
+            return None
+        if wait:
+            return self._store(url, width)
+        with self._lock:
+            if (url, width) not in self._pending:
+                self._pending.add((url, width))
+                self._executor.submit(self._store, url, width)
+        return None
+
+    #Imagem para st.image: arquivo local, ou a url original enquanto a miniatura não existe (a pagina nunca espera o download)
+    def image(self, url, width):
+        path = self.path(url, width, wait=False)
+        return str(path) if path is not None else url
+
+    #Imagem embutida (data uri) para colunas de imagem do st.dataframe, que não aceitam arquivos locais
+    def data_uri(self, url, width=TABLE_FLAG_WIDTH):
+        path = self.path(url, width, wait=False)
+        if path is None:
+            return url
+        try:
+            stat = path.stat()
+            return _encode(str(path), stat.st_ino, stat.st_size)
+        except FileNotFoundError: #apagada por _evict() entre as duas chamadas
+            return url
+
+    #Quantidade de arquivos e MB em disco
+    def usage(self):
+        sizes = [f.stat().st_size for f in self.cache_dir.glob('*.png')] if self.cache_dir.exists() else []
+        return {'files': len(sizes), 'mb': round(sum(sizes) / 1e6, 2), 'max_mb': round(self.max_bytes / 1e6, 2)}
+
+
+#Cache compartilhada pelo processo (todas as sessões e paginas)
+assets = AssetCache()
+
+
+def image(url, width):
+    return assets.image(url, width)
+
+
+def data_uri(url, width=TABLE_FLAG_WIDTH):
+    return assets.data_uri(url, width)
+
+
+#Todas as imagens do dataset com as larguras usadas pelas paginas
+def dataset_images(dataset):
+    constructors, circuits = dataset.constructors, dataset.circuits
+    return ([(url, FLAG_WIDTH) for url in constructors['flag_url']] +
+            [(url, CAR_WIDTH) for url in constructors['car_url']] +
+            [(url, FLAG_WIDTH) for url in circuits['flag_url']] +
+            [(url, TABLE_FLAG_WIDTH) for url in circuits['flag_url']] +
+            [(url, CIRCUIT_WIDTH) for url in circuits['picture_url']])
+
+
+#python -m f1_reliability.assets [--source-dir mirror/]: baixa (ou importa) todas as imagens antes de abrir o app
+def main(argv=None):
+    from f1_reliability.store import get_store
+
+    parser = argparse.ArgumentParser(description='Prefetch and resize the flag, car and circuit images used by the pages.')
+    parser.add_argument('--source-dir', type=Path, default=ASSET_SOURCE_DIR,
+                        help='local copy of the images (host/path layout) used instead of the internet')
+    parser.add_argument('--cache-dir', type=Path, default=ASSET_DIR)
+    parser.add_argument('--max-mb', type=float, default=ASSET_CACHE_MB)
+    args = parser.parse_args(argv)
+
+    cache = AssetCache(args.cache_dir, args.source_dir, args.max_mb)
+    images = dict.fromkeys((url, width) for url, width in dataset_images(get_store().dataset) if not _missing(url))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        cached = sum(path is not None for path in executor.map(lambda image: cache.path(*image), images))
+    print(f'{cached}/{len(images)} images cached in {time.perf_counter() - start:.1f}s: {cache.usage()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+import os
+from dataclasses import replace
+
+from f1_reliability.cube import Cube, build_cube
+
+
+#Backend das agregações (total, contagens agrupadas, distintos e top n) usado por analytics: o cubo pré-agregado em
+#pandas (padrão) ou consultas SQL no DuckDB embutido, com os filtros empurrados para o WHERE e execução em varias
+#threads. Configuravel com F1_BACKEND=pandas|duckdb; os dois têm a mesma interface (select, slice, total, count_by,
+#top, distinct, distinct_countries, distinct_races e circuit_countries)
+BACKEND = os.environ.get('F1_BACKEND', 'pandas')
+BACKENDS = ('pandas', 'duckdb')
+
+#Colunas da tabela fato copiadas para o DuckDB
+DUCKDB_COLUMNS = ['raceId', 'year', 'constructorId', 'circuitId', 'statusId', 'sessionId', 'is_mechanical', 'is_finished']
+
+
+def _in(column, values):
+    values = [int(value) for value in values]
+    return f'{column} IN ({", ".join(map(str, values))})' if values else 'false'
+
+
+def _columns(by):
+    return [by] if isinstance(by, str) else list(by)
+
+
+#Mesma interface do Cube, respondida com SQL sobre a tabela fato. Uma fatia é só a lista de condições do WHERE;
+#cada consulta usa um cursor proprio, então sessões simultâneas podem consultar a mesma conexão
+class DuckDBCube:
+    def __init__(self, connection, circuit_countries, conditions=()):
+        self.connection = connection
+        self.circuit_countries = circuit_countries
+        self.conditions = tuple(conditions)
+
+    def slice(self, start_year=None, end_year=None, constructors=None, circuits=None, statuses=None,
+              mechanical=None, finished=None, sessions=None):
+        conditions = list(self.conditions)
+        if start_year is not None:
+            conditions.append(f'year >= {int(start_year)}')
+        if end_year is not None:
+            conditions.append(f'year <= {int(end_year)}')
+        for column, values in (('constructorId', constructors), ('circuitId', circuits), ('statusId', statuses), ('sessionId', sessions)):
+            if values is not None:
+                conditions.append(_in(column, values))
+        if mechanical is not None:
+            conditions.append('is_mechanical' if mechanical else 'NOT is_mechanical')
+        if finished is not None:
+            conditions.append('is_finished' if finished else 'NOT is_finished')
+        return DuckDBCube(self.connection, self.circuit_countries, conditions)
+
+    #Paises resolvidos para circuitos exatamente como no cubo
+    select = Cube.select
+
+    def _where(self):
+        return f'WHERE {" AND ".join(self.conditions)}' if self.conditions else ''
+
+    def _query(self, sql):
+        with self.connection.cursor() as cursor:
+            return cursor.execute(sql).df()
+
+    def _scalar(self, sql):
+        with self.connection.cursor() as cursor:
+            return int(cursor.execute(sql).fetchone()[0])
+
+    def total(self):
+        return self._scalar(f'SELECT count(*) FROM facts {self._where()}')
+
+    def count_by(self, by, name='count'):
+        keys = ', '.join(_columns(by))
+        return self._query(f'SELECT {keys}, count(*)::BIGINT AS {name} FROM facts {self._where()} GROUP BY {keys} ORDER BY {keys}')
+
+    def top(self, by, name='count', n=10, least=False):
+        counts = f'SELECT {by}, count(*)::BIGINT AS {name} FROM facts {self._where()} GROUP BY {by}'
+        if least:
+            counts = f'SELECT * FROM ({counts} ORDER BY {name} ASC, {by} DESC LIMIT {int(n)})'
+        return self._query(f'{counts} ORDER BY {name} DESC, {by} ASC LIMIT {int(n)}')
+
+    def distinct(self, column):
+        return self._scalar(f'SELECT count(DISTINCT {column}) FROM facts {self._where()}')
+
+    def distinct_countries(self):
+        return self._scalar(f'SELECT count(DISTINCT country) FROM facts JOIN circuits USING (circuitId) {self._where()}')
+
+    def distinct_races(self, by=None):
+        if by is None:
+            return self._scalar(f'SELECT count(DISTINCT raceId) FROM facts {self._where()}')
+        keys = ', '.join(_columns(by))
+        return self._query(f'SELECT {keys}, count(DISTINCT raceId)::BIGINT AS races FROM facts {self._where()} GROUP BY {keys} ORDER BY {keys}')
+
+
+#Banco DuckDB em memoria com a tabela fato e os paises dos circuitos (copia colunar, os filtros não tocam no pandas)
+def build_duckdb(dataset, threads=None):
+    import duckdb
+
+    connection = duckdb.connect(':memory:')
+    if threads:
+        connection.execute(f'SET threads = {int(threads)}')
+    facts = dataset.facts[DUCKDB_COLUMNS]
+    circuits = dataset.circuits[['circuitId', 'country']]
+    connection.register('facts_frame', facts)
+    connection.register('circuits_frame', circuits)
+    connection.execute('CREATE TABLE facts AS SELECT * FROM facts_frame')
+    connection.execute('CREATE TABLE circuits AS SELECT * FROM circuits_frame')
+    connection.unregister('facts_frame')
+    connection.unregister('circuits_frame')
+    return DuckDBCube(connection, dataset.labels('circuits', 'country'))
+
+
+def build_backend(dataset, backend=None):
+    backend = backend or BACKEND
+    if backend == 'pandas':
+        return build_cube(dataset)
+    if backend == 'duckdb':
+        return build_duckdb(dataset)
+    raise ValueError(f'unknown backend: {backend} (expected one of {", ".join(BACKENDS)})')
+
+
+#Backend depois de uma ingestão incremental: o cubo soma as celulas das linhas novas, o DuckDB é recriado
+def extend_backend(cube, dataset, facts):
+    if isinstance(cube, Cube):
+        return cube.extend(build_cube(replace(dataset, facts=facts)))
+    return build_backend(dataset, 'duckdb')
@@ -0,0 +1,269 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+
+#Figuras Plotly construidas somente a partir de tabelas já agregadas (sem dependencia do Streamlit): o json enviado ao
+#navegador leva uma linha por barra, fatia ou circuito, nunca as linhas da tabela fato. As paginas guardam as figuras
+#em cache pelos filtros selecionados, então um rerun que não muda a seleção não reconstrói nenhuma figura
+
+
+#Paleta das comparações de equipes (10 cores distintas): até 10 equipes selecionadas não repetem cor nos graficos
+TEAM_PALETTE = px.colors.qualitative.Plotly
+
+
+#Cor de cada equipe na ordem de seleção
+def team_color_map(names):
+    return {name: TEAM_PALETTE[i % len(TEAM_PALETTE)] for i, name in enumerate(names)}
+
+
+#Barras de falhas mecânicas por ano
+def year_bars(df, y, title, dtick=2, height=500):
+    fig = px.bar(df, x='year', y=y,
+                 labels={'x': 'year', 'y': 'mechanical issues'},
+                 title=title,
+                 height=height)
+    fig.update_traces(texttemplate='%{y}',
+                      textposition='outside',
+                      textfont_color='white',
+                      textfont_size=12)
+    fig.update_xaxes(tickmode='linear', #mostrando todos os anos
+                     tickangle=-45,     #evitando sobreposição dos anos
+                     dtick=dtick)
+    return fig
+
+
+#Barras horizontais de um ranking (top 10); least=True ordena do menor para o maior
+def ranking_bars(df, x, y, title, labels, least=False, height=400):
+    fig = px.bar(df, x=x, y=y, orientation='h',
+                 labels=labels,
+                 title=title,
+                 text=x, height=height)
+    fig.update_yaxes(categoryorder='total descending' if least else 'total ascending')
+    fig.update_traces(textposition='outside', textfont_color='white')
+    return fig
+
+
+#Barras verticais com o valor acima de cada barra (taxas e contagens já agregadas)
+def value_bars(df, x, y, title, labels, dtick=None, height=450):
+    fig = px.bar(df, x=x, y=y,
+                 labels=labels,
+                 title=title,
+                 text=y, height=height)
+    fig.update_traces(textposition='outside', textfont_color='white')
+    if dtick is not None:
+        fig.update_xaxes(dtick=dtick)
+    return fig
+
+#Grafico de rosca com a parcela de cada resultado
+def share_pie(values, names, title):
+    fig = px.pie(values=values, names=names, title=title, hole=0.5)
+    fig.update_traces(textfont_size=15)
+    return fig
+
+
+#Mapa dos circuitos com o tamanho e a cor dos pontos pela quantidade de falhas; fit=True aproxima o zoom dos pontos
+#(mapa de um pais), senão mostra o mapa inteiro
+def failures_map(df, title, style, fit=False):
+    lat_diff = df['lat'].max() - df['lat'].min()
+    lng_diff = df['lng'].max() - df['lng'].min()
+    zoom = 0.2
+    if fit and lat_diff > 0 and lng_diff > 0:
+        zoom = max(1, 7 - int(max(lat_diff, lng_diff)))
+    fig = px.scatter_mapbox(df,
+                            lat='lat',
+                            lon='lng',
+                            hover_name='circuit_name',
+                            hover_data={'country': True, 'status': True},
+                            color='status',
+                            color_continuous_scale='Plasma',
+                            size='status',
+                            size_max=20,
+                            zoom=zoom,
+                            title=title)
+    fig.update_layout(mapbox_style=style, #open-street-map (claro) ou carto-darkmatter (escuro)
+                      mapbox_center={'lat': df['lat'].mean(), 'lon': df['lng'].mean()},
+                      mapbox_zoom=zoom)
+    return fig
+
+
+#Barras agrupadas por ano comparando as equipes selecionadas (cores e ordem na ordem de seleção)
+def team_year_bars(df, color_map, order):
+    fig = px.bar(df,
+                 x='year',
+                 y='status',
+                 color='constructor',
+                 height=550,
+                 barmode='group',
+                 title='Mechanical issues per year',
+                 labels={'year': 'Year', 'status': 'Mechanical issues', 'constructor': 'Team'},
+                 color_discrete_map=color_map,
+                 category_orders={'constructor': order},
+                 template='plotly_dark',
+                 hover_name='constructor')
+    fig.update_traces(texttemplate='%{y}',
+                      textposition='outside',
+                      textfont_color='white',
+                      textfont_size=14)
+    fig.update_xaxes(tickmode='linear', tickangle=-45, dtick=1)
+    fig.update_layout(title_font_size=30,
+                      xaxis_title_font_size=20,
+                      yaxis_title_font_size=20,
+                      legend_title_font_size=20,
+                      legend_font_size=18,
+                      xaxis_tickfont_size=18,
+                      yaxis_tickfont_size=18)
+    return fig
+
+
+#Uma linha (go.Scatter) por grupo de color, nas cores de color_map (ou da paleta padrão) e na ordem de order. Montado
+#direto com graph_objects: o plotly express custa dezenas de ms por figura, mais que o resto do rerun destas paginas
+def group_lines(df, x, y, color, title, labels, color_map=None, order=None, height=450, **trace):
+    groups = dict(tuple(df.groupby(color, sort=False)))
+    names = [name for name in order or [] if name in groups] + [name for name in groups if name not in (order or [])]
+    color_map = color_map or {}
+    fig = go.Figure()
+    for i, name in enumerate(names):
+        rows = groups[name]
+        fig.add_trace(go.Scatter(x=rows[x], y=rows[y], name=str(name), legendgroup=str(name),
+                                 line_color=color_map.get(name, TEAM_PALETTE[i % len(TEAM_PALETTE)]),
+                                 hovertemplate=f'{labels[color] or color}={name}<br>{labels[x]}=%{{x}}<br>{labels[y]}=%{{y}}<extra></extra>',
+                                 **trace))
+    fig.update_layout(title=title, height=height, legend_title_text=labels[color],
+                      xaxis_title=labels[x], yaxis_title=labels[y])
+    return fig
+
+
+#Linhas por ano de uma medida movel, uma por equipe (cores e ordem na ordem de seleção)
+def team_trends(df, y, title, y_title, color_map, order, height=450):
+    fig = group_lines(df, 'year', y, 'constructor', title, {'year': 'Year', y: y_title, 'constructor': 'Team'},
+                      color_map, order, height, mode='lines+markers')
+    fig.update_xaxes(dtick=1 if df['year'].nunique() <= 30 else 5)
+    return fig
+
+
+#Curvas de sobrevivência em degraus (uma linha por grupo) com a distancia em % da corrida
+def survival_lines(curves, color, title, color_map=None, order=None, height=450):
+    #Em uma curva em degraus só os pontos onde a sobrevivência muda (e o ultimo de cada grupo) precisam ir para o grafico
+    group = curves.groupby(color, sort=False)['survival']
+    curves = curves[group.diff().ne(0) | group.shift(-1).isna()]
+    fig = group_lines(curves.assign(distance=(curves['distance'] * 100).round(1), survival=curves['survival'].round(4)),
+                      'distance', 'survival', color, title,
+                      {'distance': 'Race distance (%)', 'survival': 'Share without a mechanical failure', color: ''},
+                      color_map, order, height, mode='lines', line_shape='hv')
+    fig.update_yaxes(tickformat='.0%')
+    return fig
+
+
+#Barras agrupadas dos pontos perdidos para as falhas mecânicas por temporada (uma cor por colocação no campeonato)
+def points_lost_bars(df, names, title, height=450):
+    fig = px.bar(df, x='year', y='points_lost', color='standing', barmode='group',
+                 labels={'year': 'Season', 'points_lost': 'Points lost to failures', 'standing': ''},
+                 title=title,
+                 hover_name=names,
+                 height=height)
+    return fig
+
+
+#Barras horizontais com os pontos reais e sem as falhas mecânicas de cada piloto ou equipe (ordem da classificação real)
+def standings_bars(df, title, height=450):
+    chart = df.melt(id_vars=['name'], value_vars=['points', 'cf_points'], var_name='standings', value_name='total')
+    chart['standings'] = chart['standings'].map({'points': 'Actual', 'cf_points': 'Without failures'})
+    fig = px.bar(chart, x='total', y='name', color='standings', barmode='group', orientation='h',
+                 labels={'total': 'Points', 'name': '', 'standings': ''},
+                 title=title,
+                 height=height)
+    fig.update_yaxes(categoryorder='array', categoryarray=df['name'].tolist()[::-1])
+    return fig
+
+
+#Linhas por ano das parcelas (0 a 1) que batem com os valores oficiais
+def share_lines(df, y, height=350):
+    fig = px.line(df, x='year', y=y,
+                  labels={'year': 'Season', 'value': 'Share matching', 'variable': ''},
+                  height=height)
+    fig.update_yaxes(tickformat='.0%')
+    return fig
+
+
+#Barras empilhadas de falhas mecânicas por tipo de falha (temporadas ou equipes de um piloto)
+def failure_type_bars(df, x, title, x_title, height=450):
+    fig = px.bar(df, x=x, y='failures', color='status',
+                 labels={x: x_title, 'failures': 'Mechanical issues', 'status': 'Issue'},
+                 title=title,
+                 height=height)
+    if x == 'year':
+        fig.update_xaxes(tickmode='linear', tickangle=-45, dtick=1)
+    else:
+        fig.update_xaxes(categoryorder='total descending')
+    return fig
+
+
+#Barras horizontais de probabilidade (0 a 1) com o valor em % ao lado de cada barra
+def probability_bars(df, x, y, title, x_title, height=450):
+    fig = px.bar(df, x=x, y=y, orientation='h',
+                 labels={x: x_title, y: ''},
+                 title=title,
+                 text=x, height=height)
+    fig.update_traces(texttemplate='%{x:.1%}', textposition='outside', textfont_color='white')
+    fig.update_xaxes(tickformat='.0%', range=[0, 1.15])
+    fig.update_yaxes(categoryorder='array', categoryarray=df[y].tolist()[::-1])
+    return fig
+
+
+#Contagem por faixa de valores (no maximo nbins faixas de largura inteira, como voltas), calculada no servidor
+def histogram_bins(values, nbins=20):
+    values = np.asarray(values, dtype='float64')
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return pd.DataFrame({'start': [], 'end': [], 'count': []})
+    low = np.floor(values.min())
+    width = max(1.0, np.ceil((values.max() - low + 1) / nbins))
+    edges = low + width * np.arange(int((values.max() - low) // width) + 2)
+    counts, _ = np.histogram(values, bins=edges)
+    return pd.DataFrame({'start': edges[:-1], 'end': edges[1:], 'count': counts})
+
+
+#Quartis, cercas (1.5 x intervalo interquartil), media e valores distintos fora das cercas para um box plot pré-calculado
+def box_stats(values):
+    values = np.asarray(values, dtype='float64')
+    values = values[~np.isnan(values)]
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    outside = values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)]
+    return {'q1': q1, 'median': median, 'q3': q3,
+            'lowerfence': inside.min(), 'upperfence': inside.max(),
+            'mean': values.mean(),
+            'outliers': np.unique(outside)}
+
+
+#Histograma com box plot marginal a partir dos valores brutos, mas enviando ao navegador somente as faixas e os quartis
+def binned_histogram(values, title, x_title, y_title='count', nbins=20, box=True, height=None):
+    bins = histogram_bins(values, nbins)
+    box = box and not bins.empty
+    fig = make_subplots(rows=2 if box else 1, cols=1, shared_xaxes=True,
+                        row_heights=[0.25, 0.75] if box else None, vertical_spacing=0.03)
+    fig.add_trace(go.Bar(x=(bins['start'] + bins['end']) / 2, y=bins['count'],
+                         width=(bins['end'] - bins['start']) * 0.9,
+                         customdata=np.column_stack([bins['start'], bins['end'] - 1]),
+                         hovertemplate=f'{x_title}: %{{customdata[0]}}-%{{customdata[1]}}<br>{y_title}: %{{y}}<extra></extra>',
+                         showlegend=False),
+                  row=2 if box else 1, col=1)
+    if box:
+        stats = box_stats(values)
+        fig.add_trace(go.Box(y=[x_title], q1=[stats['q1']], median=[stats['median']], q3=[stats['q3']],
+                             lowerfence=[stats['lowerfence']], upperfence=[stats['upperfence']], mean=[stats['mean']],
+                             orientation='h', boxpoints=False, name='', showlegend=False, hoverinfo='x'),
+                      row=1, col=1)
+        if len(stats['outliers']):
+            fig.add_trace(go.Scatter(x=stats['outliers'], y=[x_title] * len(stats['outliers']), mode='markers',
+                                     marker={'size': 4}, name='', showlegend=False, hovertemplate='%{x}<extra></extra>'),
+                          row=1, col=1)
+        fig.update_yaxes(showticklabels=False, row=1, col=1)
+    fig.update_xaxes(title_text=x_title, row=2 if box else 1, col=1)
+    fig.update_yaxes(title_text=y_title, row=2 if box else 1, col=1)
+    fig.update_layout(title=title, height=height)
+    return fig
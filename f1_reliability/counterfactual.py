@@ -0,0 +1,134 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from f1_reliability.dataset import RACE
+
+
+#Pontos por posição de cada era (primeiro ano, pontos do 1º ao ultimo colocado que pontua). Ponto da volta mais rapida,
+#corridas com metade dos pontos e descartes de resultados não entram: a diferença contrafactual usa somente a tabela
+POINTS_SYSTEMS = [(1950, (8, 6, 4, 3, 2)),
+                  (1960, (8, 6, 4, 3, 2, 1)),
+                  (1961, (9, 6, 4, 3, 2, 1)),
+                  (1991, (10, 6, 4, 3, 2, 1)),
+                  (2003, (10, 8, 6, 5, 4, 3, 2, 1)),
+                  (2010, (25, 18, 15, 12, 10, 8, 6, 4, 2, 1))]
+
+#Primeiro ano do campeonato de construtores
+CONSTRUCTORS_SINCE = 1958
+
+
+#Pontos da tabela da era para cada (ano, posição) em uma consulta vetorizada
+def table_points(years, positions):
+    width = max(len(points) for _, points in POINTS_SYSTEMS)
+    table = np.zeros((len(POINTS_SYSTEMS), width + 1))
+    for row, (_, points) in enumerate(POINTS_SYSTEMS):
+        table[row, :len(points)] = points
+    eras = np.searchsorted([first for first, _ in POINTS_SYSTEMS], np.asarray(years), side='right') - 1
+    positions = np.asarray(positions, dtype=np.int64)
+    column = np.where((positions >= 1) & (positions <= width), positions - 1, width) #coluna width = zero pontos
+    return table[eras, column]
+
+
+#Posição esperada de cada carro: media entre o grid (largada do pit lane = ultimo) e o ritmo do piloto na temporada
+#(mediana das posições em que terminou as corridas daquele ano; sem chegadas, somente o grid)
+def expected_positions(results):
+    field = results.groupby('raceId')['raceId'].transform('size')
+    grid = results['grid'].where(results['grid'] > 0, field).astype('float64')
+    pace = results['positionOrder'].where(results['is_finished']).groupby([results['year'], results['driverId']]).transform('median')
+    return ((grid + pace.fillna(grid)) / 2).to_numpy()
+
+
+#Resultado contrafactual de todas as corridas (somente Grand Prix) em uma passada: cada carro que quebrou recebe a
+#posição esperada e entra na frente de quem chegou naquela posição; quem terminou ou abandonou por outro motivo mantém
+#a ordem. A nova classificação sai de uma ordenação por (corrida, chave) e os pontos da tabela da era de cada ano
+def counterfactual_results(facts):
+    results = facts[facts['sessionId'] == RACE].reset_index(drop=True)
+    expected = expected_positions(results)
+    failed = results['is_mechanical'].to_numpy()
+    key = np.where(failed, expected - 0.5, results['positionOrder'].to_numpy())
+    order = np.lexsort((results['grid'].to_numpy(), key, results['raceId'].to_numpy()))
+    race_ids = results['raceId'].to_numpy()[order]
+    starts = np.r_[0, np.flatnonzero(race_ids[1:] != race_ids[:-1]) + 1]
+    rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    position = np.empty(len(order), dtype=np.int64)
+    position[order] = rank + 1
+
+    results = results[['raceId', 'year', 'driverId', 'constructorId', 'grid', 'positionOrder', 'points', 'is_mechanical']].copy()
+    results['expected_position'] = np.round(expected, 1)
+    results['cf_position'] = position
+    results['table_points'] = table_points(results['year'], results['positionOrder'])
+    results['cf_table_points'] = table_points(results['year'], results['cf_position'])
+    #Pontos perdidos (carro que quebrou) ou ganhos por falha dos outros (negativo: perdeu posições para os carros que voltaram)
+    results['points_lost'] = results['cf_table_points'] - results['table_points']
+    return results
+
+
+#Pontos finais de cada temporada nas tabelas de classificação (ultima etapa de cada ano que já tem classificação;
+#o calendario pode listar corridas que ainda não aconteceram)
+def final_standings(standings, races, by):
+    standings = standings.merge(races[['raceId', 'year', 'round']], on='raceId')
+    final = standings[standings['round'] == standings.groupby('year')['round'].transform('max')]
+    return final[['year', by, 'points', 'position', 'wins']]
+
+
+#Ordenando o campeonato de cada ano por pontos e vitorias
+def _rank(df, points, wins):
+    df = df.sort_values(['year', points, wins], ascending=[True, False, False], kind='stable')
+    return df.groupby('year').cumcount().add(1).reindex(df.index)
+
+
+#Campeonato real e contrafactual de pilotos (by = driverId) ou construtores (by = constructorId): pontos reais da
+#classificação oficial (ou a soma dos resultados quando não há classificação) mais os pontos perdidos
+def championship(cf_results, facts, final, by):
+    summed = facts.groupby(['year', by])['points'].sum().rename('summed_points')
+    groups = cf_results.assign(cf_wins=cf_results['cf_position'] == 1).groupby(['year', by])
+    table = pd.concat([summed,
+                       groups['points_lost'].sum(),
+                       groups['is_mechanical'].sum().rename('failures'),
+                       groups['cf_wins'].sum()], axis=1).fillna(0).reset_index()
+    table = table.merge(final[['year', by, 'points', 'position', 'wins']], on=['year', by], how='left')
+    table['points'] = table['points'].fillna(table['summed_points'])
+    table['wins'] = table['wins'].fillna(0)
+    table['cf_points'] = table['points'] + table['points_lost']
+    table['position'] = table['position'].fillna(_rank(table, 'points', 'wins')).astype('int64')
+    table['cf_position'] = _rank(table, 'cf_points', 'cf_wins')
+    return table[['year', by, 'points', 'position', 'cf_points', 'cf_position', 'points_lost', 'failures', 'wins', 'cf_wins', 'summed_points']]
+
+
+#Checagem contra as classificações oficiais, por ano: parcela dos resultados em que a tabela da era dá os pontos
+#realmente concedidos e parcela dos pilotos cuja soma de pontos dos resultados bate com a classificação final
+def validate(cf_results, drivers):
+    table = cf_results.assign(table_match=np.isclose(cf_results['table_points'], cf_results['points'])).groupby('year')['table_match'].mean()
+    official = drivers.dropna(subset=['summed_points'])
+    standings = official.assign(standings_match=np.isclose(official['summed_points'], official['points'])).groupby('year')['standings_match'].mean()
+    return pd.concat([table, standings], axis=1).round(3).reset_index()
+
+
+#Temporadas em que o campeão contrafactual (sem as quebras) é outro
+def decided_by_reliability(table, by):
+    champions = table[table['position'] == 1].set_index('year')[[by, 'points']]
+    cf_champions = table[table['cf_position'] == 1].set_index('year')[[by, 'cf_points', 'points']]
+    seasons = champions.join(cf_champions, rsuffix='_cf', how='inner')
+    seasons = seasons[seasons[by] != seasons[f'{by}_cf']]
+    return seasons.rename(columns={by: 'champion', f'{by}_cf': 'cf_champion', 'points': 'champion_points',
+                                   'points_cf': 'cf_champion_points', 'cf_points': 'cf_champion_cf_points'}).reset_index()
+
+
+@dataclass(frozen=True)
+class Counterfactual:
+    results: pd.DataFrame #um Grand Prix por linha: posição real, esperada e contrafactual e pontos perdidos
+    drivers: pd.DataFrame #campeonato de pilotos real e contrafactual por ano
+    constructors: pd.DataFrame #campeonato de construtores (desde 1958)
+    validation: pd.DataFrame #concordancia com as classificações oficiais por ano
+
+
+#Todas as temporadas em um lote
+def counterfactual(facts, races, driver_standings, constructor_standings):
+    results = counterfactual_results(facts)
+    drivers = championship(results, facts, final_standings(driver_standings, races, 'driverId'), 'driverId')
+    constructors = championship(results, facts[facts['year'] >= CONSTRUCTORS_SINCE],
+                                final_standings(constructor_standings, races, 'constructorId'), 'constructorId')
+    constructors = constructors[constructors['year'] >= CONSTRUCTORS_SINCE].reset_index(drop=True)
+    return Counterfactual(results=results, drivers=drivers, constructors=constructors, validation=validate(results, drivers))
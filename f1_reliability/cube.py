@@ -0,0 +1,95 @@
+from dataclasses import dataclass
+
+import pandas as pd
+
+from f1_reliability.dataset import downcast
+
+
+#Dimensões do cubo: cada celula guarda a quantidade de resultados daquela combinação
+CUBE_KEYS = ['year', 'constructorId', 'circuitId', 'statusId', 'sessionId']
+
+
+#Cubo pre-agregado de confiabilidade. As paginas respondem graficos e KPIs fatiando e somando as celulas,
+#então o custo de cada interação não depende mais da quantidade de linhas da tabela fato
+@dataclass
+class Cube:
+    cells: pd.DataFrame #CUBE_KEYS + results + flags do status
+    races: pd.DataFrame #combinações distintas de raceId + CUBE_KEYS, para contagem de corridas distintas
+    circuit_countries: pd.Series #circuitId -> pais, para resolver o filtro de paises
+
+    #Fatiando o cubo pelos filtros da sidebar (None = sem filtro)
+    def slice(self, start_year=None, end_year=None, constructors=None, circuits=None, statuses=None,
+              mechanical=None, finished=None, sessions=None):
+        def mask(df):
+            keep = pd.Series(True, index=df.index)
+            if start_year is not None:
+                keep &= df['year'] >= start_year
+            if end_year is not None:
+                keep &= df['year'] <= end_year
+            if constructors is not None:
+                keep &= df['constructorId'].isin(constructors)
+            if circuits is not None:
+                keep &= df['circuitId'].isin(circuits)
+            if statuses is not None:
+                keep &= df['statusId'].isin(statuses)
+            if mechanical is not None:
+                keep &= df['is_mechanical'] == mechanical
+            if finished is not None:
+                keep &= df['is_finished'] == finished
+            if sessions is not None:
+                keep &= df['sessionId'].isin(sessions)
+            return keep
+        return Cube(self.cells[mask(self.cells)], self.races[mask(self.races)], self.circuit_countries)
+
+    #Fatiando o cubo com o mesmo FilterSpec usado pelo motor de filtros da tabela fato
+    def select(self, spec):
+        circuits = spec.circuits
+        if spec.countries is not None:
+            in_countries = self.circuit_countries.index[self.circuit_countries.isin(spec.countries)]
+            circuits = in_countries if circuits is None else in_countries.intersection(circuits)
+        return self.slice(spec.start_year, spec.end_year, spec.constructors, circuits, spec.statuses, spec.mechanical,
+                          sessions=spec.sessions)
+
+    #Quantidade total de resultados na fatia
+    def total(self):
+        return int(self.cells['results'].sum())
+
+    #Soma dos resultados agrupados pelas colunas do cubo (em int64, a coluna results é reduzida para economizar memoria)
+    def count_by(self, by, name='count'):
+        return self.cells.groupby(by)['results'].sum().astype('int64').reset_index(name=name)
+
+    #As n linhas com mais (ou menos, least=True) resultados, na ordem decrescente; empates pela chave crescente
+    def top(self, by, name='count', n=10, least=False):
+        counts = self.count_by(by, name).sort_values([name, by], ascending=[False, True], kind='stable')
+        return (counts.tail(n) if least else counts.head(n)).reset_index(drop=True)
+
+    #Quantidade de valores distintos de uma dimensão (somente celulas com resultados existem no cubo)
+    def distinct(self, column):
+        return int(self.cells[column].nunique())
+
+    #Quantidade de paises dos circuitos da fatia
+    def distinct_countries(self):
+        return int(self.circuit_countries[self.cells['circuitId'].unique()].nunique())
+
+    #Corridas distintas, no total ou agrupadas por alguma dimensão
+    def distinct_races(self, by=None):
+        if by is None:
+            return int(self.races['raceId'].nunique())
+        return self.races.groupby(by)['raceId'].nunique().reset_index(name='races')
+
+    #Somando ao cubo as celulas de outro cubo (linhas novas da tabela fato), sem reagregar o histórico
+    def extend(self, other):
+        cells = pd.concat([self.cells, other.cells], ignore_index=True)
+        cells = cells.groupby(CUBE_KEYS, as_index=False).agg(results=('results', 'sum'),
+                                                             is_mechanical=('is_mechanical', 'first'),
+                                                             is_finished=('is_finished', 'first'))
+        races = pd.concat([self.races, other.races], ignore_index=True).drop_duplicates(ignore_index=True)
+        return Cube(cells=downcast(cells), races=downcast(races), circuit_countries=other.circuit_countries)
+
+
+def build_cube(dataset):
+    flags = dataset.status[['statusId', 'is_mechanical', 'is_finished']]
+    cells = dataset.facts.groupby(CUBE_KEYS).size().reset_index(name='results').merge(flags, on='statusId')
+    races = dataset.facts[['raceId', *CUBE_KEYS]].drop_duplicates().merge(flags, on='statusId')
+    return Cube(cells=downcast(cells), races=downcast(races.reset_index(drop=True)),
+                circuit_countries=dataset.labels('circuits', 'country'))
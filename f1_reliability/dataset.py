@@ -0,0 +1,160 @@
+import os
+from dataclasses import dataclass, fields
+from pathlib import Path
+
+import pandas as pd
+
+
+#Diretorio com os csv e planilhas de origem (F1_DATASET_DIR permite apontar para outra copia, ex: datasets sinteticos do benchmark)
+DATASET_DIR = Path(os.environ.get('F1_DATASET_DIR', Path(__file__).resolve().parent.parent / 'dataset'))
+
+#Definindo critérios de seleção da coluna Status como mechanical issues
+MECHANICAL_ISSUES = ['Engine', 'Transmission', 'Gearbox', 'Suspension', 'Hydraulics', 'Brakes', 'Differential', 
+                       'Clutch', 'Driveshaft', 'Fuel pressure', 'Throttle', 'Steering', 'Exhaust', 'Fuel pump', 
+                       'Track rod', 'Pneumatics', 'Engine fire', 'Fuel system', 'Oil line', 'Oil pressure', 'Drivetrain', 'Halfshaft', 
+                       'Crankshaft', 'Wheel bearing', 'Vibrations', 'Oil pump', 'Injection', 'Distributor', 'Turbo', 
+                       'CV joint', 'Water pump', 'Spark plugs', 'Fuel pipe', 'Oil pipe', 'Axle', 'Water pipe', 
+                       'Supercharger', 'Engine misfire', 'Power Unit', 'Brake duct', 'Cooling system', 'Overheating',
+                       'Oil leak', 'Mechanical', 'Radiator', 'Electrical', 'Driver Seat', 'Water Pressure', 'Water leak',
+                       'Fire', 'Power loss', 'Launch control', 'Ignition', 'Battery', 'Alternator', 'ERS', 'Seat', 'Tyre', 'Puncture',
+                       'Wheel', 'Tyre puncture'
+                    ]
+
+PATTERN = '|'.join(MECHANICAL_ISSUES) #definindo pattern e carater "|" para botar mais opções como se fosse "or" entre cada palabra
+
+
+#Chave de cada tabela dimensão, utilizada para juntar os atributos de exibição na tabela fato
+DIMENSION_KEYS = {'races': 'raceId',
+                  'drivers': 'driverId',
+                  'constructors': 'constructorId',
+                  'circuits': 'circuitId',
+                  'status': 'statusId',
+                  'sessions': 'sessionId'}
+
+#Tipo de sessão de cada resultado da tabela fato (corrida principal ou sprint)
+RACE = 1
+SPRINT = 2
+SESSIONS = {RACE: 'Race', SPRINT: 'Sprint'}
+
+
+#Star schema: tabela fato estreita (chaves inteiras e medidas) + tabelas dimensão pequenas com os textos e urls
+@dataclass
+class Dataset:
+    facts: pd.DataFrame
+    races: pd.DataFrame
+    drivers: pd.DataFrame
+    constructors: pd.DataFrame
+    circuits: pd.DataFrame
+    status: pd.DataFrame
+    sessions: pd.DataFrame
+
+    def tables(self):
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    #Junta os atributos da dimensão somente nas linhas já agregadas que vão para o gráfico ou tabela
+    def attach(self, df, dimension, columns=None):
+        key = DIMENSION_KEYS[dimension]
+        dim = getattr(self, dimension)
+        if columns is not None:
+            dim = dim[[key, *columns]]
+        return df.merge(dim, on=key, how='left')
+
+    #Serie chave -> atributo, util para format_func dos widgets e para map()
+    def labels(self, dimension, column):
+        return getattr(self, dimension).set_index(DIMENSION_KEYS[dimension])[column]
+
+    def memory_usage(self):
+        return {name: int(df.memory_usage(deep=True).sum()) for name, df in self.tables().items()}
+
+
+#Reduzindo as colunas numericas para o menor tipo que comporta os valores
+def downcast(df):
+    for column in df.columns:
+        if pd.api.types.is_integer_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], downcast='integer')
+        elif pd.api.types.is_float_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], downcast='float')
+    return df
+
+
+#Arquivos de dataset/ lidos para montar o star schema (os demais csv não entram na tabela fato)
+SOURCE_FILES = ['constructors.csv', 'status.csv', 'results.csv', 'sprint_results.csv', 'races.csv', 'drivers.csv',
+                'constructor_car_pictures.xlsx', 'circuits.csv', 'circuits_pictures.xlsx']
+
+#Arquivo de resultados de cada tipo de sessão
+SESSION_FILES = {RACE: 'results.csv', SPRINT: 'sprint_results.csv'}
+
+#Colunas da tabela de resultados que entram na tabela fato
+RESULT_COLUMNS = ['resultId', 'raceId', 'driverId', 'constructorId', 'statusId', 'grid', 'positionOrder', 'points', 'laps']
+
+#Ordem das linhas da tabela fato (anos contiguos para o motor de filtros; a sprint vem depois da corrida do mesmo fim de semana)
+FACT_ORDER = ['year', 'raceId', 'sessionId', 'positionOrder']
+
+
+#Classificando cada statusId uma única vez (status.csv tem poucas linhas) em vez de rodar o regex na tabela fato a cada rerun
+def status_dimension(df_status):
+    df_status = df_status.copy()
+    df_status['is_mechanical'] = df_status['status'].str.contains(PATTERN, case=False, na=False)
+    df_status['is_finished'] = df_status['status'].str.contains(r'Finished|\+', case=False, na=False) #status que contem Finished ou o simbolo '+'
+    return df_status[['statusId', 'status', 'is_mechanical', 'is_finished']]
+
+
+def race_dimension(df_races):
+    return df_races[['raceId', 'year', 'round', 'circuitId', 'name', 'date']]
+
+
+def driver_dimension(df_drivers):
+    drivers = df_drivers[['driverId', 'forename', 'surname', 'nationality']].copy()
+    drivers['driver'] = drivers['forename'] + ' ' + drivers['surname'] #criando a coluna driver com nome e sobrenome
+    return drivers[['driverId', 'driver', 'nationality']]
+
+
+def session_dimension():
+    return pd.DataFrame({'sessionId': list(SESSIONS), 'session': list(SESSIONS.values())})
+
+
+#Linhas da tabela fato a partir das linhas de results.csv ou sprint_results.csv
+#(os inner joins mantêm somente resultados com todas as dimensões, como antes)
+def fact_rows(df_results, session, races, drivers, constructors, circuits, status):
+    facts = df_results[RESULT_COLUMNS].assign(sessionId=session).\
+                merge(races[['raceId', 'year', 'circuitId']], on='raceId').\
+                merge(status[['statusId', 'is_mechanical', 'is_finished']], on='statusId')
+    return facts[facts['driverId'].isin(drivers['driverId']) &
+                 facts['constructorId'].isin(constructors['constructorId']) &
+                 facts['circuitId'].isin(circuits['circuitId'])]
+
+
+#Lendo os csv e planilhas e construindo a tabela fato e as dimensões
+def build_dataset(dataset_dir=DATASET_DIR):
+    dataset_dir = Path(dataset_dir)
+    df_constructors = pd.read_csv(dataset_dir / 'constructors.csv')
+    df_status = pd.read_csv(dataset_dir / 'status.csv')
+    df_results = {session: pd.read_csv(dataset_dir / name) for session, name in SESSION_FILES.items()}
+    df_races = pd.read_csv(dataset_dir / 'races.csv')
+    df_drivers = pd.read_csv(dataset_dir / 'drivers.csv')
+    df_constructor_pictures = pd.read_excel(dataset_dir / 'constructor_car_pictures.xlsx')
+    df_circuits = pd.read_csv(dataset_dir / 'circuits.csv')
+    df_circuits_pictures = pd.read_excel(dataset_dir / 'circuits_pictures.xlsx')
+
+    #Dimensões (somente as colunas que as paginas mostram)
+    races = race_dimension(df_races)
+    drivers = driver_dimension(df_drivers)
+    constructors = pd.merge(df_constructors[['constructorId', 'name', 'nationality']],
+                            df_constructor_pictures[['constructorId', 'flag_url', 'car_url']], on='constructorId')
+    constructors = constructors.rename(columns={'name': 'constructor'})
+    circuits = pd.merge(df_circuits[['circuitId', 'name', 'location', 'country', 'lat', 'lng']],
+                        df_circuits_pictures[['circuitId', 'flag_url', 'picture_url']], on='circuitId')
+    circuits = circuits.rename(columns={'name': 'circuit_name'})
+    status = status_dimension(df_status)
+
+    #Construindo a tabela fato principal com os resultados das corridas e das sprints
+    f_races_results = pd.concat([fact_rows(df, session, races, drivers, constructors, circuits, status) for session, df in df_results.items()])
+    f_races_results = f_races_results.sort_values(FACT_ORDER).reset_index(drop=True)
+
+    return Dataset(facts=downcast(f_races_results),
+                   races=downcast(races.reset_index(drop=True)),
+                   drivers=downcast(drivers.reset_index(drop=True)),
+                   constructors=downcast(constructors),
+                   circuits=downcast(circuits),
+                   status=downcast(status.reset_index(drop=True)),
+                   sessions=downcast(session_dimension()))
@@ -0,0 +1,105 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+
+#Estado dos filtros da sidebar. None (ou lista vazia) = sem filtro naquela dimensão
+@dataclass(frozen=True)
+class FilterSpec:
+    start_year: int = None
+    end_year: int = None
+    constructors: tuple = None
+    statuses: tuple = None
+    countries: tuple = None
+    circuits: tuple = None
+    mechanical: bool = None
+    sessions: tuple = None
+
+    #Normalizando listas vazias para None e listas para tuplas (hashable, pode ser chave de cache)
+    def __post_init__(self):
+        for name in ('constructors', 'statuses', 'countries', 'circuits', 'sessions'):
+            value = getattr(self, name)
+            object.__setattr__(self, name, tuple(value) if value is not None and len(value) else None)
+
+
+#Dimensões indexadas: coluna do FilterSpec -> coluna da tabela fato
+INDEXED = {'constructors': 'constructorId',
+           'statuses': 'statusId',
+           'countries': 'country',
+           'circuits': 'circuitId',
+           'sessions': 'sessionId'}
+
+EMPTY = np.empty(0, dtype=np.int64)
+
+
+#Motor de filtros da tabela fato: a tabela fica ordenada por ano (intervalo de anos = fatia contigua via busca binaria)
+#e cada constructor, status, pais e circuito tem a lista ordenada das posições das suas linhas
+class FilterIndex:
+    def __init__(self, dataset):
+        facts = dataset.facts
+        if not facts['year'].is_monotonic_increasing:
+            facts = facts.sort_values('year', kind='stable').reset_index(drop=True)
+        self.facts = facts
+        self.years = facts['year'].to_numpy()
+        self.year_values = [int(y) for y in np.unique(self.years)]
+
+        keys = facts[['constructorId', 'statusId', 'circuitId', 'sessionId']].copy()
+        self.country_by_circuit = dataset.labels('circuits', 'country')
+        keys['country'] = keys['circuitId'].map(self.country_by_circuit)
+        self.positions_by = {column: {key: positions.astype(np.int64) for key, positions in keys.groupby(column).indices.items()}
+                             for column in INDEXED.values()}
+        self.mechanical_positions = np.flatnonzero(facts['is_mechanical'].to_numpy())
+
+    #Fatia [lo, hi) das linhas dentro do intervalo de anos
+    def year_bounds(self, start_year=None, end_year=None):
+        lo = 0 if start_year is None else int(np.searchsorted(self.years, start_year, side='left'))
+        hi = len(self.years) if end_year is None else int(np.searchsorted(self.years, end_year, side='right'))
+        return lo, hi
+
+    #Recortando uma lista ordenada de posições para a fatia de anos
+    @staticmethod
+    def _clip(positions, lo, hi):
+        return positions[np.searchsorted(positions, lo):np.searchsorted(positions, hi)]
+
+    #Posições das linhas selecionadas, ou a tupla (lo, hi) quando só há filtro de anos (sem materializar as posições)
+    def positions(self, spec):
+        lo, hi = self.year_bounds(spec.start_year, spec.end_year)
+        selected = None
+        for name, column in INDEXED.items():
+            values = getattr(spec, name)
+            if values is None:
+                continue
+            index = self.positions_by[column]
+            positions = [self._clip(index.get(value, EMPTY), lo, hi) for value in values]
+            positions = np.sort(np.concatenate(positions)) if len(positions) > 1 else positions[0]
+            selected = positions if selected is None else np.intersect1d(selected, positions, assume_unique=True)
+        if spec.mechanical is not None:
+            mechanical = self._clip(self.mechanical_positions, lo, hi)
+            if not spec.mechanical:
+                mechanical = np.setdiff1d(np.arange(lo, hi), mechanical, assume_unique=True)
+            selected = mechanical if selected is None else np.intersect1d(selected, mechanical, assume_unique=True)
+        return (lo, hi) if selected is None else selected
+
+    #Linhas da tabela fato selecionadas pelo FilterSpec
+    def select(self, spec):
+        positions = self.positions(spec)
+        if isinstance(positions, tuple):
+            return self.facts.iloc[positions[0]:positions[1]]
+        return self.facts.iloc[positions]
+
+    #Valores distintos de uma coluna indexada dentro da seleção, para as opções dos multiselect e selectbox
+    def options(self, column, spec=None):
+        spec = spec or FilterSpec()
+        lo, hi = self.year_bounds(spec.start_year, spec.end_year)
+        if all(getattr(spec, name) is None for name in (*INDEXED, 'mechanical')):
+            #Somente intervalo de anos: basta checar se a lista de posições de cada chave cai na fatia
+            keys = [key for key, positions in self.positions_by[column].items()
+                    if np.searchsorted(positions, hi) > np.searchsorted(positions, lo)]
+        else:
+            positions = self.positions(spec)
+            values = self.facts['circuitId' if column == 'country' else column].to_numpy()
+            values = values[slice(*positions)] if isinstance(positions, tuple) else values[positions]
+            keys = np.unique(values)
+            if column == 'country':
+                keys = self.country_by_circuit[keys].unique()
+        return sorted(key.item() if hasattr(key, 'item') else key for key in keys)
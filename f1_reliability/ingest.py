@@ -0,0 +1,125 @@
+import hashlib
+import io
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+import pandas as pd
+
+from f1_reliability.dataset import (DATASET_DIR, FACT_ORDER, SESSION_FILES, SOURCE_FILES, Dataset, downcast,
+                                    driver_dimension, fact_rows, race_dimension)
+
+
+#Arquivos que durante a temporada só recebem linhas novas no final (um Grand Prix por vez)
+APPEND_ONLY = ['results.csv', 'sprint_results.csv', 'races.csv', 'drivers.csv']
+
+#Resultado de uma ingestão incremental: dataset atualizado, somente as linhas novas da tabela fato e o novo manifest
+@dataclass
+class Ingested:
+    dataset: Dataset
+    facts: pd.DataFrame
+    manifest: dict
+
+
+#Hash dos primeiros size bytes do arquivo (ler e calcular o hash é barato, o caro é interpretar o csv)
+def _digest(path, size):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read(size)).hexdigest()
+
+
+#Tamanho, mtime e hash de cada arquivo de origem, gravado junto com o snapshot
+def manifest(dataset_dir=DATASET_DIR):
+    files = {}
+    for name in SOURCE_FILES:
+        stat = (Path(dataset_dir) / name).stat()
+        files[name] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha1': _digest(Path(dataset_dir) / name, stat.st_size)}
+    return files
+
+
+#Corridas e pilotos citados em results.csv que ainda não existem nas dimensões (esses resultados ficaram fora da tabela fato;
+#se a corrida ou o piloto for adicionado depois, somente uma reconstrução completa recupera essas linhas)
+def orphans(dataset, dataset_dir=DATASET_DIR):
+    results = pd.concat([pd.read_csv(Path(dataset_dir) / name, usecols=['raceId', 'driverId']) for name in SESSION_FILES.values()])
+    return {'raceId': sorted(set(results['raceId'].tolist()) - set(dataset.races['raceId'].tolist())),
+            'driverId': sorted(set(results['driverId'].tolist()) - set(dataset.drivers['driverId'].tolist()))}
+
+
+#Offset a partir do qual cada arquivo recebeu linhas novas, ou None quando alguma mudança não foi um simples append
+def appended_offsets(previous, current, dataset_dir=DATASET_DIR):
+    offsets = {}
+    for name in SOURCE_FILES:
+        before, after = previous.get(name), current[name]
+        if before is None:
+            return None
+        if before['size'] == after['size'] and before['sha1'] == after['sha1']:
+            continue
+        if name not in APPEND_ONLY or after['size'] < before['size']:
+            return None
+        #O conteudo anterior precisa estar intacto e terminar em quebra de linha
+        path = Path(dataset_dir) / name
+        if _digest(path, before['size']) != before['sha1']:
+            return None
+        with open(path, 'rb') as f:
+            f.seek(before['size'] - 1)
+            if f.read(1) != b'\n':
+                return None
+        offsets[name] = (before['size'], after['size'])
+    return offsets
+
+
+#Lendo somente as linhas adicionadas no final do csv (cabeçalho + bytes novos)
+def read_appended(path, start, end):
+    with open(path, 'rb') as f:
+        header = f.readline()
+        f.seek(start)
+        tail = f.read(end - start)
+    return pd.read_csv(io.BytesIO(header + tail))
+
+
+def _append(df, rows):
+    return downcast(pd.concat([df, downcast(rows)], ignore_index=True))
+
+
+#Adicionando as corridas, pilotos e resultados novos ao dataset já carregado, sem reler o histórico.
+#Retorna None quando a mudança exige reconstruir tudo (arquivo reescrito, planilhas ou dimensões sem append)
+def ingest(dataset, previous_manifest, dataset_dir=DATASET_DIR):
+    current = manifest(dataset_dir)
+    offsets = appended_offsets(previous_manifest, current, dataset_dir)
+    if offsets is None:
+        return None
+    new = {name: read_appended(Path(dataset_dir) / name, *offsets[name]) for name in offsets}
+
+    races, drivers = dataset.races, dataset.drivers
+    if 'races.csv' in new:
+        races = _append(races, race_dimension(new['races.csv']))
+    if 'drivers.csv' in new:
+        drivers = _append(drivers, driver_dimension(new['drivers.csv']))
+    if races['raceId'].duplicated().any() or drivers['driverId'].duplicated().any():
+        return None
+    missing = previous_manifest.get('orphans', {})
+    if set(missing.get('raceId', [])) & set(races['raceId'].tolist()) or set(missing.get('driverId', [])) & set(drivers['driverId'].tolist()):
+        return None
+    current['orphans'] = {key: list(ids) for key, ids in missing.items()}
+
+    facts = dataset.facts
+    new_facts = []
+    for session, name in SESSION_FILES.items():
+        if name not in new:
+            continue
+        results = new[name]
+        if results['resultId'].isin(facts.loc[facts['sessionId'] == session, 'resultId']).any():
+            return None
+        #Resultados de corridas ou pilotos que ainda não existem ficam fora, como na reconstrução completa, e são lembrados no manifest
+        for key, dimension in (('raceId', races), ('driverId', drivers)):
+            absent = set(results[key].tolist()) - set(dimension[key].tolist())
+            current['orphans'][key] = sorted(set(current['orphans'].get(key, [])) | absent)
+        new_facts.append(fact_rows(results, session, races, drivers, dataset.constructors, dataset.circuits, dataset.status))
+
+    new_facts = downcast(pd.concat(new_facts).sort_values(FACT_ORDER).reset_index(drop=True)) if new_facts else facts.iloc[0:0]
+    if not new_facts.empty:
+        #Normalmente as linhas novas já vêm depois de todas as anteriores; senão reordenando a tabela fato
+        in_order = facts.empty or tuple(new_facts[FACT_ORDER].iloc[0]) > tuple(facts[FACT_ORDER].iloc[-1])
+        facts = _append(facts, new_facts)
+        if not in_order:
+            facts = facts.sort_values(FACT_ORDER).reset_index(drop=True)
+
+    return Ingested(dataset=replace(dataset, facts=facts, races=races, drivers=drivers), facts=new_facts, manifest=current)
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+from f1_reliability.dataset import RACE
+
+
+#Tabela de KPIs de todas as equipes (by = constructorId) ou pilotos (by = driverId) em uma única passada de groupby
+#sobre as linhas selecionadas (races, wins, podiums, seasons, mechanical issues, podiums/victories lost, worst season e
+#reliability). Vitorias, podios e podios/vitorias perdidos contam somente o Grand Prix; falhas e confiabilidade contam
+#todas as sessões
+def reliability_kpis(results, by):
+    race = (results['sessionId'] == RACE).to_numpy()
+    rows = pd.DataFrame({by: results[by].to_numpy(),
+                         'raceId': results['raceId'].to_numpy(),
+                         'year': results['year'].to_numpy(),
+                         'wins': race & (results['positionOrder'] == 1).to_numpy(),
+                         'podiums': race & (results['positionOrder'] <= 3).to_numpy(),
+                         'mechanical_issues': results['is_mechanical'].to_numpy(),
+                         'finished': results['is_finished'].to_numpy(),
+                         'podiums_lost': race & ((results['grid'] <= 3) & results['is_mechanical']).to_numpy(),
+                         'victories_lost': race & ((results['grid'] == 1) & results['is_mechanical']).to_numpy()})
+
+    kpis = rows.groupby(by).agg(races=('raceId', 'nunique'),
+                                seasons=('year', 'nunique'),
+                                wins=('wins', 'sum'),
+                                podiums=('podiums', 'sum'),
+                                mechanical_issues=('mechanical_issues', 'sum'),
+                                finished=('finished', 'sum'),
+                                podiums_lost=('podiums_lost', 'sum'),
+                                victories_lost=('victories_lost', 'sum'))
+
+    #Pior temporada = ano com mais falhas mecânicas (em caso de empate, o primeiro ano)
+    per_season = rows[rows['mechanical_issues']].groupby([by, 'year']).size().reset_index(name='failures')
+    per_season = per_season.sort_values([by, 'failures', 'year'], ascending=[True, False, True])
+    kpis['worst_season'] = per_season.drop_duplicates(by).set_index(by)['year'].astype('Int64')
+
+    #Confiabilidade = corridas terminadas / (terminadas + falhas mecânicas)
+    denominator = kpis['finished'] + kpis['mechanical_issues']
+    kpis['reliability'] = np.round(kpis['finished'] * 100 / denominator.where(denominator > 0), 1)
+    return kpis
+
+
+def constructor_kpis(results):
+    return reliability_kpis(results, 'constructorId')
+
+
+#KPIs de todos os pilotos, com a quantidade de equipes e a ultima equipe de cada um na seleção
+def driver_kpis(results):
+    kpis = reliability_kpis(results, 'driverId')
+    teams = results[['driverId', 'year', 'raceId', 'constructorId']].sort_values(['driverId', 'year', 'raceId'])
+    kpis['teams'] = teams.groupby('driverId')['constructorId'].nunique()
+    kpis['last_team'] = teams.drop_duplicates('driverId', keep='last').set_index('driverId')['constructorId']
+    return kpis
+
+
+#Falhas mecânicas de todos os pilotos por temporada, equipe e tipo de falha em uma única agregação; a pagina só recorta
+#as linhas do piloto selecionado
+def driver_failures(results):
+    failures = results.loc[results['is_mechanical'].to_numpy(), ['driverId', 'year', 'constructorId', 'statusId']]
+    failures = failures.groupby(['driverId', 'year', 'constructorId', 'statusId']).size().reset_index(name='failures')
+    return failures
+
+
+#Tabela resumo por circuito em uma única agregação sobre as linhas selecionadas: falhas (das falhas selecionadas, se houver),
+#corridas, media de falhas por corrida com falha e a falha mais frequente. Circuitos sem falhas ficam na tabela com zero
+def circuit_summary(results, statuses=None):
+    mechanical = results['is_mechanical'].to_numpy()
+    selected = mechanical if statuses is None else mechanical & results['statusId'].isin(statuses).to_numpy()
+    rows = pd.DataFrame({'circuitId': results['circuitId'].to_numpy(),
+                         'raceId': results['raceId'].to_numpy(),
+                         'mechanical_race': results['raceId'].where(mechanical).to_numpy(),
+                         'failures': selected,
+                         'mechanical': mechanical})
+
+    summary = rows.groupby('circuitId').agg(failures=('failures', 'sum'),
+                                            races=('raceId', 'nunique'),
+                                            mechanical=('mechanical', 'sum'),
+                                            mechanical_races=('mechanical_race', 'nunique'))
+    summary['mean'] = (summary['mechanical'] / summary['mechanical_races'].where(summary['mechanical_races'] > 0)).fillna(0)
+
+    #Falha mais frequente por circuito (em caso de empate, o menor statusId)
+    frequent = results.loc[mechanical, ['circuitId', 'statusId']].groupby(['circuitId', 'statusId']).size().reset_index(name='status_count')
+    frequent = frequent.sort_values(['circuitId', 'status_count', 'statusId'], ascending=[True, False, True]).drop_duplicates('circuitId')
+    summary = summary.join(frequent.set_index('circuitId'))
+    summary['statusId'] = summary['statusId'].astype('Int64')
+    summary['status_count'] = summary['status_count'].fillna(0).astype('int64')
+    summary['rate'] = np.round(summary['status_count'] * 100 / summary['failures'].where(summary['failures'] > 0), 0)
+
+    summary = summary.drop(columns=['mechanical', 'mechanical_races']).reset_index()
+    return summary.sort_values('failures', ascending=False, kind='stable').reset_index(drop=True)
@@ -0,0 +1,42 @@
+from pathlib import Path
+
+import pandas as pd
+
+from f1_reliability.dataset import DATASET_DIR, build_dataset
+
+
+#Tabela fato larga como era montada antes do star schema (merge de todas as tabelas), usada somente como referencia
+def build_wide(dataset_dir=DATASET_DIR):
+    dataset_dir = Path(dataset_dir)
+    df_circuits = pd.read_csv(dataset_dir / 'circuits.csv').rename(columns={'name': 'circuit_name', 'url': 'link'})
+    f_races_results = pd.read_csv(dataset_dir / 'results.csv').\
+                            merge(pd.read_csv(dataset_dir / 'races.csv'), on='raceId').\
+                            merge(pd.read_csv(dataset_dir / 'drivers.csv'), on='driverId').\
+                            merge(pd.read_csv(dataset_dir / 'constructors.csv'), on='constructorId').\
+                            merge(pd.read_csv(dataset_dir / 'status.csv'), on='statusId').\
+                            merge(pd.read_excel(dataset_dir / 'constructor_car_pictures.xlsx'), on='constructorId').\
+                            merge(pd.read_excel(dataset_dir / 'circuits_pictures.xlsx'), on='circuitId').\
+                            merge(df_circuits, on='circuitId')
+    f_races_results['driver'] = f_races_results['forename'] + ' ' + f_races_results['surname']
+    return f_races_results
+
+
+def report(dataset_dir=DATASET_DIR):
+    wide = build_wide(dataset_dir)
+    dataset = build_dataset(dataset_dir)
+    before = int(wide.memory_usage(deep=True).sum())
+    after = dataset.memory_usage()
+
+    lines = [f'{"table":<14}{"rows":>8}{"columns":>9}{"MB":>9}',
+             f'{"wide (before)":<14}{len(wide):>8}{wide.shape[1]:>9}{before / 1e6:>9.2f}']
+    for name, df in dataset.tables().items():
+        lines.append(f'{name:<14}{len(df):>8}{df.shape[1]:>9}{after[name] / 1e6:>9.2f}')
+    total = sum(after.values())
+    lines.append(f'{"star (after)":<14}{"":>8}{"":>9}{total / 1e6:>9.2f}')
+    lines.append(f'reduction: {before / total:.1f}x')
+    return '\n'.join(lines)
+
+
+#python -m f1_reliability.memory_report
+if __name__ == '__main__':
+    print(report())
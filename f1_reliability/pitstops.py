@@ -0,0 +1,65 @@
+import numpy as np
+
+from f1_reliability.dataset import RACE
+
+
+#Parada anormalmente longa: duração acima de LONG_STOP_FACTOR x a mediana das paradas da mesma corrida
+LONG_STOP_FACTOR = 1.5
+
+#Marcando as paradas longas ao ler pit_stops.csv (comparando cada parada com a mediana da corrida;
+#paradas com bandeira vermelha ficam muito acima)
+def mark_long_stops(stops):
+    race_median = stops.groupby('raceId')['milliseconds'].transform('median')
+    stops['is_long'] = stops['milliseconds'] > race_median * LONG_STOP_FACTOR
+    return stops
+
+
+#Tabela de paradas da versão atual do dataset, lida pelo registro somente quando a analise de paradas é aberta
+def get_pit_stops(store):
+    return store.tables['pit_stops']
+
+
+#Uma linha por resultado (raceId, driverId) das corridas com dados de paradas: quantidade de paradas, parada mais longa,
+#se houve parada anormalmente longa e volta da ultima parada, junto com o desfecho do resultado (somente o Grand Prix, a sprint não tem paradas)
+def stop_profile(stops, results):
+    per_result = stops.groupby(['raceId', 'driverId']).agg(stops=('stop', 'size'),
+                                                          longest_ms=('milliseconds', 'max'),
+                                                          long_stops=('is_long', 'sum'),
+                                                          last_stop_lap=('lap', 'max'))
+    results = results[(results['sessionId'] == RACE) & results['raceId'].isin(stops['raceId'].unique())]
+    profile = results[['raceId', 'driverId', 'constructorId', 'circuitId', 'year', 'laps', 'is_mechanical']].\
+                    merge(per_result.reset_index(), on=['raceId', 'driverId'], how='left')
+    profile['stops'] = profile['stops'].fillna(0).astype('int64')
+    profile['long_stops'] = profile['long_stops'].fillna(0).astype('int64')
+    profile['has_long_stop'] = profile['long_stops'] > 0
+    #Voltas entre a ultima parada e o fim da corrida do piloto (para falhas: voltas até a quebra)
+    profile['laps_since_stop'] = profile['laps'] - profile['last_stop_lap'].fillna(0)
+    return profile
+
+
+#Taxa de falhas mecânicas com e sem parada anormalmente longa
+def failure_rate_by_long_stop(profile):
+    rates = profile.groupby('has_long_stop').agg(results=('is_mechanical', 'size'), failures=('is_mechanical', 'sum')).reset_index()
+    rates['rate'] = np.round(rates['failures'] * 100 / rates['results'], 1)
+    return rates
+
+
+#Distribuição da quantidade de paradas feitas antes de cada falha mecânica
+def stops_before_failure(profile):
+    return profile.loc[profile['is_mechanical'], 'stops'].value_counts().sort_index().rename_axis('stops').reset_index(name='failures')
+
+
+#Resumo de paradas e falhas por equipe ou circuito (by = constructorId ou circuitId)
+def summary_by(profile, by):
+    profile = profile.assign(failure_after_long=profile['is_mechanical'] & profile['has_long_stop'])
+    summary = profile.groupby(by).agg(results=('is_mechanical', 'size'),
+                                      stops=('stops', 'sum'),
+                                      median_longest_ms=('longest_ms', 'median'),
+                                      long_stop_results=('has_long_stop', 'sum'),
+                                      failures=('is_mechanical', 'sum'),
+                                      failures_after_long=('failure_after_long', 'sum'))
+    summary['stops_per_race'] = np.round(summary['stops'] / summary['results'], 2)
+    summary['failure_rate'] = np.round(summary['failures'] * 100 / summary['results'], 1)
+    long_results = summary['long_stop_results'].where(summary['long_stop_results'] > 0)
+    summary['failure_rate_after_long'] = np.round(summary['failures_after_long'] * 100 / long_results, 1)
+    return summary.reset_index()
@@ -0,0 +1,170 @@
+import argparse
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+#Instrumentação das paginas (desligada por padrão; F1_PROFILE=1 liga). Cada rerun registra o tempo de cada etapa
+#(carga, filtros, KPIs, graficos, ...), o tempo, as linhas e o acerto de cache de cada função em cache, mostra tudo
+#em um painel no fim da pagina e grava uma linha JSON por registro no arquivo de metricas. Desligada, cached() é
+#exatamente st.cache_data e lap() retorna na primeira linha
+ENABLED = os.environ.get('F1_PROFILE', '').lower() in ('1', 'true', 'yes')
+
+#Arquivo de metricas (JSON lines, fica dentro de cache/, fora do git; configuravel com F1_PROFILE_FILE)
+PROFILE_FILE = Path(os.environ.get('F1_PROFILE_FILE', Path(__file__).resolve().parent.parent / 'cache' / 'metrics' / 'profile.jsonl'))
+
+logger = logging.getLogger(__name__)
+_lock = threading.Lock()
+_state = threading.local()
+
+
+#Linhas processadas/produzidas por uma etapa: tamanho da tabela ou pontos enviados ao navegador por uma figura
+def rows(value):
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray, list)):
+        return len(value)
+    if isinstance(value, tuple):
+        return rows(value[0]) if value else None
+    if hasattr(value, 'data') and hasattr(value, 'layout'): #figura Plotly
+        points = 0
+        for trace in value.data:
+            values = next((v for v in (getattr(trace, name, None) for name in ('x', 'values', 'lat', 'y')) if v is not None), ())
+            points += len(values)
+        return points
+    return None
+
+
+def _run():
+    return st.session_state.get('_profiling_run')
+
+
+def _record(step, kind, seconds, rows=None, cache=None, args=None):
+    run = _run()
+    record = {'time': round(time.time(), 3),
+              'run': run['id'] if run else None,
+              'page': run['page'] if run else None,
+              'step': step,
+              'kind': kind,
+              'ms': round(seconds * 1000, 3),
+              'rows': rows,
+              'cache': cache,
+              'args': args}
+    if run is not None:
+        run['records'].append(record)
+    line = json.dumps(record, default=str)
+    logger.info(line)
+    with _lock:
+        PROFILE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with PROFILE_FILE.open('a') as f:
+            f.write(line + '\n')
+
+
+#Inicio de um rerun da pagina
+def start(page):
+    if not ENABLED:
+        return
+    now = time.perf_counter()
+    st.session_state['_profiling_run'] = {'id': uuid.uuid4().hex[:8], 'page': page, 'start': now, 'lap': now, 'records': []}
+
+
+#Fim de uma etapa da pagina: registra o tempo desde o fim da etapa anterior (as funções em cache chamadas dentro da
+#etapa também aparecem sozinhas, com kind = cached)
+def lap(step, rows=None):
+    if not ENABLED:
+        return
+    run = _run()
+    if run is None:
+        return
+    now = time.perf_counter()
+    _record(step, 'section', now - run['lap'], rows)
+    run['lap'] = now
+
+
+#Substituto de st.cache_data que registra tempo, linhas do resultado, acerto (hit) ou calculo (miss) e os argumentos
+#(sem os que começam com _ e o fingerprint). O miss é detectado pelo corpo da função ter sido executado
+def cached(step, **options):
+    def decorator(func):
+        if not ENABLED:
+            return st.cache_data(func, **options)
+        signature = inspect.signature(func)
+        names = [name for name in signature.parameters if not name.startswith('_') and name != 'fingerprint']
+
+        @functools.wraps(func)
+        def body(*args, **kwargs):
+            _state.computed = True
+            return func(*args, **kwargs)
+        cached_func = st.cache_data(body, **options)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            previous = getattr(_state, 'computed', False)
+            _state.computed = False
+            start = time.perf_counter()
+            try:
+                result = cached_func(*args, **kwargs)
+            finally:
+                computed = _state.computed
+                _state.computed = previous
+            bound = signature.bind(*args, **kwargs).arguments
+            _record(step, 'cached', time.perf_counter() - start, rows(result), 'miss' if computed else 'hit',
+                    {name: repr(bound[name]) for name in names if name in bound})
+            return result
+        wrapper.clear = cached_func.clear
+        return wrapper
+    return decorator
+
+
+#Painel de depuração no fim da pagina com as etapas do rerun atual (mais lentas primeiro)
+def finish():
+    if not ENABLED:
+        return
+    run = _run()
+    if run is None:
+        return
+    lap('render')
+    total = time.perf_counter() - run['start']
+    _record('total', 'run', total)
+    records = pd.DataFrame(run['records'])
+    with st.expander(f':stopwatch: Profiling: {total * 1000:.0f} ms'):
+        st.dataframe(records[records['kind'] != 'run'].sort_values('ms', ascending=False),
+                     hide_index=True,
+                     column_order=['step', 'kind', 'ms', 'rows', 'cache', 'args'],
+                     column_config={'ms': st.column_config.NumberColumn('ms', format='%.1f')})
+        st.caption(f'Run {run["id"]}. Sections include the cached steps called inside them. Metrics are appended to {PROFILE_FILE}.')
+
+
+#Resumo do arquivo de metricas: etapas com mais tempo total primeiro
+def summary(path=PROFILE_FILE):
+    records = pd.read_json(path, lines=True)
+    records = records[records['kind'] != 'run']
+    groups = records.groupby(['page', 'step', 'kind'])
+    table = groups.agg(calls=('ms', 'size'),
+                       total_ms=('ms', 'sum'),
+                       mean_ms=('ms', 'mean'),
+                       p95_ms=('ms', lambda ms: ms.quantile(0.95)),
+                       mean_rows=('rows', 'mean'))
+    table['hit_rate'] = records.assign(hit=records['cache'] == 'hit').groupby(['page', 'step', 'kind'])['hit'].mean()
+    table.loc[table.index.get_level_values('kind') != 'cached', 'hit_rate'] = np.nan
+    return table.sort_values('total_ms', ascending=False).round(2).reset_index()
+
+
+#python -m f1_reliability.profiling [--file cache/metrics/profile.jsonl] [--top 20]
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Summarize the page profiling metrics, hottest steps first.')
+    parser.add_argument('--file', type=Path, default=PROFILE_FILE)
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args(argv)
+    print(summary(args.file).head(args.top).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
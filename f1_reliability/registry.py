@@ -0,0 +1,88 @@
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+from f1_reliability.dataset import DATASET_DIR
+from f1_reliability.pitstops import mark_long_stops
+
+
+#Declaração de uma tabela secundaria do dataset: arquivo, colunas com os tipos e chaves de junção com a tabela fato
+@dataclass(frozen=True)
+class Table:
+    file: str
+    dtypes: dict
+    keys: tuple
+    prepare: object = None #função opcional aplicada depois da leitura (colunas derivadas)
+
+
+#Tabelas carregadas somente no primeiro acesso (a tabela fato e as dimensões ficam no snapshot, ver dataset.py)
+TABLES = {
+    'pit_stops': Table('pit_stops.csv',
+                       {'raceId': 'int16', 'driverId': 'int16', 'stop': 'int8', 'lap': 'int8', 'milliseconds': 'int32'},
+                       keys=('raceId', 'driverId'), prepare=mark_long_stops),
+    'qualifying': Table('qualifying.csv',
+                        {'qualifyId': 'int32', 'raceId': 'int16', 'driverId': 'int16', 'constructorId': 'int16',
+                         'position': 'int8', 'q1': 'string', 'q2': 'string', 'q3': 'string'},
+                        keys=('raceId', 'driverId', 'constructorId')),
+    'driver_standings': Table('driver_standings.csv',
+                              {'raceId': 'int16', 'driverId': 'int16', 'points': 'float32', 'position': 'int16', 'wins': 'int8'},
+                              keys=('raceId', 'driverId')),
+    'constructor_standings': Table('constructor_standings.csv',
+                                   {'raceId': 'int16', 'constructorId': 'int16', 'points': 'float32', 'position': 'int16', 'wins': 'int8'},
+                                   keys=('raceId', 'constructorId')),
+    'constructor_results': Table('constructor_results.csv',
+                                 {'raceId': 'int16', 'constructorId': 'int16', 'points': 'float32', 'status': 'string'},
+                                 keys=('raceId', 'constructorId')),
+    'seasons': Table('seasons.csv', {'year': 'int16', 'url': 'string'}, keys=('year',)),
+}
+
+
+def read_table(table, dataset_dir=DATASET_DIR):
+    df = pd.read_csv(Path(dataset_dir) / table.file, usecols=list(table.dtypes), dtype=table.dtypes, na_values=['\\N'])
+    return table.prepare(df) if table.prepare is not None else df
+
+
+#Registro das tabelas secundarias de uma versão do dataset: cada tabela é lida no primeiro acesso e guardada,
+#com o tempo de leitura e a memoria ocupada
+class Registry:
+    def __init__(self, dataset_dir=DATASET_DIR, tables=TABLES):
+        self.dataset_dir = dataset_dir
+        self.tables = tables
+        self._loaded = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        df = self._loaded.get(name)
+        if df is None:
+            with self._lock:
+                df = self._loaded.get(name)
+                if df is None:
+                    start = time.perf_counter()
+                    df = read_table(self.tables[name], self.dataset_dir)
+                    self._stats[name] = {'seconds': time.perf_counter() - start,
+                                         'memory_mb': df.memory_usage(deep=True).sum() / 1e6}
+                    self._loaded[name] = df
+        return df
+
+    #Tabela com arquivo, chaves, linhas, tempo de leitura e memoria de cada tabela (vazia para as que não foram lidas)
+    def report(self):
+        rows = []
+        for name, table in self.tables.items():
+            stats = self._stats.get(name, {})
+            rows.append({'table': name, 'file': table.file, 'keys': ', '.join(table.keys), 'loaded': name in self._loaded,
+                         'rows': len(self._loaded[name]) if name in self._loaded else None,
+                         'seconds': round(stats['seconds'], 4) if stats else None,
+                         'memory_mb': round(stats['memory_mb'], 3) if stats else None})
+        return pd.DataFrame(rows)
+
+
+#python -m f1_reliability.registry: carrega todas as tabelas e mostra o relatorio
+if __name__ == '__main__':
+    registry = Registry()
+    for name in registry.tables:
+        registry[name]
+    print(registry.report().to_string(index=False))
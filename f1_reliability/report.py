@@ -0,0 +1,113 @@
+import argparse
+import html
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from f1_reliability import analytics
+from f1_reliability.dataset import DATASET_DIR
+from f1_reliability.filters import FilterSpec
+from f1_reliability.store import get_store
+
+
+#Diretorio padrão dos relatorios exportados (fica dentro de cache/, fora do git)
+REPORT_DIR = Path(__file__).resolve().parent.parent / 'cache' / 'reports'
+
+
+#Intervalos de anos do relatorio: cada temporada, janelas moveis de window anos e o periodo completo
+def year_windows(years, seasons=True, window=None, full=True):
+    windows = []
+    if seasons:
+        windows += [(year, year) for year in years]
+    if window:
+        windows += [(years[i], years[i + window - 1]) for i in range(len(years) - window + 1)]
+    if full:
+        windows.append((years[0], years[-1]))
+    return list(dict.fromkeys(windows))
+
+
+_store = None
+
+
+#Cada processo do pool carrega o snapshot uma única vez
+def _init_worker(dataset_dir):
+    global _store
+    _store = get_store(dataset_dir)
+
+
+#Relatorio de um intervalo de anos: KPIs de todas as equipes e resumo de todos os circuitos
+def _report(window):
+    start_year, end_year = window
+    spec = FilterSpec(start_year, end_year)
+    constructors = analytics.constructor_table(_store, spec).reset_index()
+    circuits = analytics.circuit_table(_store, spec)
+    for df in (constructors, circuits):
+        df.insert(0, 'end_year', end_year)
+        df.insert(0, 'start_year', start_year)
+    return constructors, circuits
+
+
+def build_reports(windows, workers=None, dataset_dir=DATASET_DIR):
+    store = get_store(dataset_dir)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(dataset_dir,)) as executor:
+        chunksize = max(1, len(windows) // ((workers or os.cpu_count() or 1) * 4))
+        results = list(executor.map(_report, windows, chunksize=chunksize))
+    constructors = pd.concat([r[0] for r in results], ignore_index=True)
+    constructors = store.dataset.attach(constructors, 'constructors', ['constructor'])
+    circuits = pd.concat([r[1] for r in results], ignore_index=True)
+    return constructors, circuits
+
+
+#Uma pagina html por equipe (todas as janelas de anos) e um indice com links
+def write_html(constructors, output_dir):
+    html_dir = Path(output_dir) / 'html'
+    (html_dir / 'constructors').mkdir(parents=True, exist_ok=True)
+    links = []
+    for (constructor_id, name), team in constructors.groupby(['constructorId', 'constructor']):
+        table = team.drop(columns=['constructorId', 'constructor', 'finished']).to_html(index=False, na_rep='-')
+        page = f'<html><head><meta charset="utf-8"><title>{html.escape(name)}</title></head><body><h1>{html.escape(name)}</h1>{table}</body></html>'
+        (html_dir / 'constructors' / f'{constructor_id}.html').write_text(page, encoding='utf-8')
+        links.append(f'<li><a href="constructors/{constructor_id}.html">{html.escape(name)}</a></li>')
+    index = f'<html><head><meta charset="utf-8"><title>F1 Reliability</title></head><body><h1>Constructors</h1><ul>{"".join(links)}</ul></body></html>'
+    (html_dir / 'index.html').write_text(index, encoding='utf-8')
+
+
+def write_reports(constructors, circuits, output_dir=REPORT_DIR, static_html=False):
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name, df in (('constructors', constructors), ('circuits', circuits)):
+        df.to_parquet(output_dir / f'{name}.parquet', index=False)
+        df.to_json(output_dir / f'{name}.json', orient='records', indent=1)
+    if static_html:
+        write_html(constructors, output_dir)
+
+
+#python -m f1_reliability.report [--window 10] [--html] [--workers 8]
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export constructor and circuit reliability reports for every season.')
+    parser.add_argument('--output', default=REPORT_DIR, type=Path)
+    parser.add_argument('--dataset-dir', default=DATASET_DIR, type=Path)
+    parser.add_argument('--window', type=int, help='also export rolling windows of this many seasons')
+    parser.add_argument('--no-seasons', action='store_true', help='skip the single-season reports')
+    parser.add_argument('--workers', type=int, help='worker processes (default: number of CPUs)')
+    parser.add_argument('--html', action='store_true', help='also write static html pages per constructor')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    years = get_store(args.dataset_dir).index.year_values
+    windows = year_windows(years, seasons=not args.no_seasons, window=args.window)
+    constructors, circuits = build_reports(windows, args.workers, args.dataset_dir)
+    write_reports(constructors, circuits, args.output, args.html)
+    print(json.dumps({'windows': len(windows),
+                      'constructor rows': len(constructors),
+                      'circuit rows': len(circuits),
+                      'output': str(args.output),
+                      'seconds': round(time.perf_counter() - start, 2)}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from f1_reliability.counterfactual import CONSTRUCTORS_SINCE, championship, counterfactual_results, final_standings, table_points
+from f1_reliability.dataset import RACE
+from f1_reliability.survival import era
+
+
+#Simulação de Monte Carlo de uma temporada: cada Grand Prix parte da ordem contrafactual (sem as quebras, ver
+#counterfactual.py), cada carro quebra com a probabilidade da sua taxa de falhas e os que sobram são reclassificados e
+#pontuados com a tabela da era. Todas as simulações de um bloco são matrizes (simulações x resultados) do NumPy
+
+#Simulações por padrão e tamanho de cada bloco. Cada bloco tem a sua semente (SeedSequence.spawn), então o resultado
+#depende só da semente e da quantidade de simulações, e não da quantidade de processos
+RUNS = 10000
+CHUNK = 2500
+
+#Processos usados por padrão (1 = no proprio processo; configuravel com F1_SIM_WORKERS)
+WORKERS = int(os.environ.get('F1_SIM_WORKERS', 1))
+
+#Taxas de falha mecânica por largada: a da propria equipe na temporada ou a media de todas as equipes na decada
+RATES = {'constructor': 'Own failure rate',
+         'era': 'Era average'}
+
+
+#Temporada pronta para simular: resultados ordenados por (corrida, posição contrafactual)
+@dataclass(frozen=True)
+class Season:
+    year: int
+    rates: np.ndarray #probabilidade de falha mecânica de cada resultado
+    race_start: np.ndarray #indice do primeiro resultado da corrida de cada resultado
+    entity: np.ndarray #codigo do piloto ou equipe de cada resultado
+    labels: np.ndarray #driverId ou constructorId de cada codigo
+    offset: np.ndarray #pontos fora da tabela (sprints, volta mais rapida, ...) de cada codigo, mantidos fixos
+    points: np.ndarray #pontos da tabela por posição (a ultima coluna vale zero)
+    table: pd.DataFrame #classificação real e contrafactual da temporada
+
+
+#Taxa de falhas mecânicas por largada em Grand Prix de cada resultado
+def failure_rates(facts, results, rates='constructor'):
+    races = facts[facts['sessionId'] == RACE]
+    if rates == 'era':
+        by_era = races['is_mechanical'].groupby(era(races['year'])).mean()
+        return by_era.reindex(era(results['year'])).to_numpy()
+    by_team = races.groupby(['year', 'constructorId'])['is_mechanical'].mean()
+    return by_team.reindex(pd.MultiIndex.from_frame(results[['year', 'constructorId']])).to_numpy()
+
+
+def season(facts, races, standings, year, by='driverId', rates='constructor'):
+    season_facts = facts[facts['year'] == year]
+    results = counterfactual_results(season_facts).sort_values(['raceId', 'cf_position'], kind='stable').reset_index(drop=True)
+    table = championship(results, season_facts, final_standings(standings, races, by), by)
+    codes = pd.Series(np.arange(len(table)), index=table[by].to_numpy())
+    entity = codes.reindex(results[by]).to_numpy()
+    #Parte fixa dos pontos: pontos oficiais menos os pontos que a tabela dá às posições reais
+    offset = table['points'].to_numpy() - results.groupby(entity)['table_points'].sum().reindex(range(len(table)), fill_value=0).to_numpy()
+    race_ids = results['raceId'].to_numpy()
+    first = np.r_[True, race_ids[1:] != race_ids[:-1]]
+    width = int(results.groupby('raceId').size().max())
+    return Season(year=year,
+                  rates=failure_rates(facts, results, rates).astype(np.float32),
+                  race_start=np.maximum.accumulate(np.where(first, np.arange(len(results)), 0)),
+                  entity=entity,
+                  labels=table[by].to_numpy(),
+                  offset=offset,
+                  points=np.r_[table_points(np.full(width, year), np.arange(1, width + 1)), 0],
+                  table=table)
+
+
+#Um bloco de simulações: falhas sorteadas de uma vez, posição de cada carro que sobrou = carros que sobraram até ele
+#na mesma corrida (soma acumulada menos a soma antes do inicio da corrida), pontos pela tabela e soma por piloto/equipe
+#com uma multiplicação pela matriz indicadora (resultados x pilotos)
+def _simulate_chunk(season, runs, seed):
+    rng = np.random.default_rng(seed)
+    survived = rng.random((runs, len(season.rates)), dtype=np.float32) >= season.rates
+    ahead = np.cumsum(survived, axis=1, dtype=np.int32)
+    before = np.concatenate([np.zeros((runs, 1), dtype=np.int32), ahead], axis=1)[:, season.race_start]
+    position = np.where(survived, ahead - before, 0)
+    points = season.points[np.minimum(position, len(season.points)) - 1].astype(np.float32)
+    indicator = np.zeros((len(season.rates), len(season.labels)), dtype=np.float32)
+    indicator[np.arange(len(season.rates)), season.entity] = 1
+    totals = points @ indicator + season.offset.astype(np.float32)
+    wins = (position == 1).astype(np.float32) @ indicator
+    #Classificação de cada simulação por pontos e, no empate, vitorias; positions conta as colocações (piloto x colocação)
+    n = len(season.labels)
+    order = np.argsort(-(totals.astype(np.float64) * 1000 + wins), axis=1, kind='stable')
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.broadcast_to(np.arange(n), order.shape), axis=1)
+    positions = np.bincount((np.arange(n) * n + rank).ravel(), minlength=n * n).reshape(n, n)
+    return positions, totals.sum(axis=0, dtype=np.float64), (totals.astype(np.float64) ** 2).sum(axis=0), wins.sum(axis=0, dtype=np.float64)
+
+
+#Resultado de uma temporada simulada
+@dataclass(frozen=True)
+class Simulation:
+    table: pd.DataFrame #um piloto ou equipe por linha: classificação real e medias simuladas
+    positions: pd.DataFrame #probabilidade de cada colocação final (linhas = pilotos ou equipes)
+    runs: int
+    seed: int
+
+
+def simulate(season, runs=RUNS, seed=0, workers=WORKERS):
+    sizes = [min(CHUNK, runs - start) for start in range(0, runs, CHUNK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = list(executor.map(_simulate_chunk, [season] * len(sizes), sizes, seeds))
+    else:
+        chunks = [_simulate_chunk(season, size, chunk_seed) for size, chunk_seed in zip(sizes, seeds)]
+    positions, points, squares, wins = (sum(values) for values in zip(*chunks))
+    mean = points / runs
+    table = pd.DataFrame({'id': season.labels,
+                          'sim_points': np.round(mean, 1),
+                          'sim_points_std': np.round(np.sqrt(np.maximum(squares / runs - mean ** 2, 0)), 1),
+                          'sim_wins': np.round(wins / runs, 2),
+                          'sim_position': np.round((positions * np.arange(1, len(season.labels) + 1)).sum(axis=1) / runs, 2),
+                          'title_probability': positions[:, 0] / runs,
+                          'top3_probability': positions[:, :3].sum(axis=1) / runs})
+    return Simulation(table=table,
+                      positions=pd.DataFrame(positions / runs, index=season.labels, columns=range(1, len(season.labels) + 1)),
+                      runs=runs, seed=seed)
+
+
+#Temporada simulada com a classificação oficial ao lado (by = driverId ou constructorId)
+def simulate_season(facts, races, standings, year, by='driverId', rates='constructor', runs=RUNS, seed=0, workers=WORKERS):
+    if by == 'constructorId' and year < CONSTRUCTORS_SINCE:
+        raise ValueError(f'there is no constructors championship before {CONSTRUCTORS_SINCE}')
+    prepared = season(facts, races, standings, year, by, rates)
+    simulation = simulate(prepared, runs, seed, workers)
+    table = prepared.table[[by, 'points', 'position', 'cf_points', 'cf_position']].merge(simulation.table.rename(columns={'id': by}), on=by)
+    return Simulation(table=table.sort_values('position').reset_index(drop=True), positions=simulation.positions,
+                      runs=runs, seed=seed)
+
+
+#python -m f1_reliability.simulation 2008 [--by constructorId] [--rates era] [--runs 10000] [--workers 4]
+def main(argv=None):
+    from f1_reliability.store import get_store
+
+    parser = argparse.ArgumentParser(description='Re-simulate a season with resampled mechanical failures.')
+    parser.add_argument('year', type=int)
+    parser.add_argument('--by', choices=['driverId', 'constructorId'], default='driverId')
+    parser.add_argument('--rates', choices=list(RATES), default='constructor')
+    parser.add_argument('--runs', type=int, default=RUNS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    args = parser.parse_args(argv)
+
+    store = get_store()
+    standings = store.tables['driver_standings' if args.by == 'driverId' else 'constructor_standings']
+    start = time.perf_counter()
+    simulation = simulate_season(store.dataset.facts, store.dataset.races, standings, args.year, args.by, args.rates,
+                                 args.runs, args.seed, args.workers)
+    elapsed = time.perf_counter() - start
+    names = store.dataset.labels('drivers', 'driver') if args.by == 'driverId' else store.dataset.labels('constructors', 'constructor')
+    table = simulation.table.head(10).assign(name=lambda df: df[args.by].map(names))
+    print(table[['position', 'name', 'points', 'sim_points', 'sim_points_std', 'title_probability']].to_string(index=False))
+    print(f'{args.runs} simulations in {elapsed * 1000:.0f} ms ({args.workers} worker(s))')
+
+
+if __name__ == '__main__':
+    main()
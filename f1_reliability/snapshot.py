@@ -0,0 +1,168 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from f1_reliability import ingest
+from f1_reliability.dataset import DATASET_DIR, Dataset, build_dataset
+
+
+#Diretorio onde ficam os snapshots colunares (Arrow IPC) da tabela fato e das dimensões (configuravel com F1_SNAPSHOT_DIR)
+SNAPSHOT_DIR = Path(os.environ.get('F1_SNAPSHOT_DIR', Path(__file__).resolve().parent.parent / 'cache' / 'snapshot'))
+
+
+#Versão do formato do snapshot (tabelas e colunas); mudar quando o star schema mudar para não ler snapshots antigos
+SNAPSHOT_VERSION = 2
+
+#Idade minima (segundos) de um diretorio .tmp para prune() apagar: mais novo que isso pode ser a gravação em andamento
+#de outro processo
+TMP_GRACE = 3600
+
+
+#Fingerprint dos arquivos de origem: nome, tamanho e mtime de cada arquivo em dataset/ (mais a versão do formato)
+def fingerprint(dataset_dir=DATASET_DIR):
+    digest = hashlib.sha1(f'v{SNAPSHOT_VERSION};'.encode())
+    for path in sorted(Path(dataset_dir).iterdir()):
+        if path.is_file():
+            stat = path.stat()
+            digest.update(f'{path.name}:{stat.st_size}:{stat.st_mtime_ns};'.encode())
+    return digest.hexdigest()[:16]
+
+
+#Cada versão do dataset fica em um diretorio com um arquivo .arrow por tabela
+def snapshot_path(fp, snapshot_dir=SNAPSHOT_DIR):
+    return Path(snapshot_dir) / fp
+
+
+#Gravando sem compressão para que a leitura não precise descomprimir (as tabelas são convertidas inteiras para pandas).
+#O manifest dos arquivos de origem fica junto para a proxima atualização saber o que foi adicionado.
+#Cada gravação usa o seu proprio diretorio .tmp (varios servidores, a API e os workers do relatorio podem gravar a mesma
+#versão ao mesmo tempo). Se o snapshot já existir ao terminar, o do outro processo é mantido e o nosso é descartado;
+#com overwrite=True o antigo é trocado pelo novo
+def write_snapshot(dataset, path, manifest=None, overwrite=False):
+    path = Path(path)
+    tmp = path.with_name(f'{path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp')
+    tmp.mkdir(parents=True)
+    try:
+        for name, df in dataset.tables().items():
+            feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), tmp / f'{name}.arrow', compression='uncompressed')
+        if manifest is not None:
+            (tmp / 'manifest.json').write_text(json.dumps(manifest, indent=1))
+        #Um snapshot sem manifest (gravação antiga ou incompleta) também é trocado
+        if path.exists() and not overwrite and (manifest is None or read_manifest(path) is not None):
+            return
+        old = path.with_name(f'{path.name}.{os.getpid()}.{uuid.uuid4().hex}.old.tmp')
+        try:
+            os.replace(path, old) #tirando o snapshot antigo do caminho antes de apagar
+            shutil.rmtree(old, ignore_errors=True)
+        except FileNotFoundError:
+            pass
+        try:
+            os.replace(tmp, path) #troca atômica para não deixar um snapshot pela metade se o processo cair
+        except OSError: #outro processo instalou o snapshot entre as duas trocas
+            if not path.exists():
+                raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def read_snapshot(path):
+    path = Path(path)
+    return Dataset(**{name: feather.read_table(path / f'{name}.arrow').to_pandas()
+                      for name in Dataset.__dataclass_fields__})
+
+
+def read_manifest(path):
+    path = Path(path) / 'manifest.json'
+    return json.loads(path.read_text()) if path.exists() else None
+
+
+#Snapshot mais recente que ainda existe no diretorio (versão anterior do dataset)
+def latest(snapshot_dir=SNAPSHOT_DIR):
+    if not Path(snapshot_dir).exists():
+        return None
+    paths = [path for path in Path(snapshot_dir).iterdir() if (path / 'manifest.json').exists()]
+    return max(paths, key=lambda path: path.stat().st_mtime_ns, default=None)
+
+
+#Removendo snapshots de versões anteriores do dataset (e gravações .tmp abandonadas, mais velhas que TMP_GRACE)
+def prune(keep, snapshot_dir=SNAPSHOT_DIR):
+    for path in Path(snapshot_dir).iterdir():
+        if path == keep:
+            continue
+        if path.name.endswith('.tmp'):
+            try:
+                if time.time() - path.stat().st_mtime < TMP_GRACE:
+                    continue
+            except FileNotFoundError: #a gravação terminou e foi renomeada
+                continue
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+
+
+#Carrega o snapshot que corresponde aos arquivos atuais e o seu manifest. Quando a origem mudou somente por linhas
+#adicionadas (um Grand Prix novo), atualiza a versão anterior de forma incremental; senão reconstroi tudo
+def load_versioned(dataset_dir=DATASET_DIR, snapshot_dir=SNAPSHOT_DIR):
+    path = snapshot_path(fingerprint(dataset_dir), snapshot_dir)
+    if path.exists() and read_manifest(path) is not None:
+        return read_snapshot(path), read_manifest(path)
+    previous = latest(snapshot_dir)
+    if previous is not None:
+        ingested = update(read_snapshot(previous), read_manifest(previous), dataset_dir, snapshot_dir)
+        if ingested is not None:
+            return ingested.dataset, ingested.manifest
+    dataset, manifest = build(dataset_dir, snapshot_dir)
+    return dataset, manifest
+
+
+def load(dataset_dir=DATASET_DIR, snapshot_dir=SNAPSHOT_DIR):
+    return load_versioned(dataset_dir, snapshot_dir)[0]
+
+
+#Ingestão incremental a partir de um dataset já carregado, gravando o novo snapshot (None = precisa reconstruir)
+def update(dataset, manifest, dataset_dir=DATASET_DIR, snapshot_dir=SNAPSHOT_DIR):
+    ingested = ingest.ingest(dataset, manifest, dataset_dir)
+    if ingested is not None:
+        path = snapshot_path(fingerprint(dataset_dir), snapshot_dir)
+        write_snapshot(ingested.dataset, path, ingested.manifest)
+        prune(path, snapshot_dir)
+    return ingested
+
+
+def build(dataset_dir=DATASET_DIR, snapshot_dir=SNAPSHOT_DIR, overwrite=False):
+    path = snapshot_path(fingerprint(dataset_dir), snapshot_dir)
+    manifest = ingest.manifest(dataset_dir) #antes de ler os arquivos: linhas adicionadas durante a leitura aparecem repetidas na proxima atualização, que então reconstroi
+    dataset = build_dataset(dataset_dir)
+    manifest['orphans'] = ingest.orphans(dataset, dataset_dir)
+    write_snapshot(dataset, path, manifest, overwrite)
+    prune(path, snapshot_dir)
+    return dataset, manifest
+
+
+#Etapa de build: python -m f1_reliability.snapshot
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the columnar snapshot of the F1 dataset.')
+    parser.add_argument('--dataset-dir', default=DATASET_DIR, type=Path)
+    parser.add_argument('--snapshot-dir', default=SNAPSHOT_DIR, type=Path)
+    parser.add_argument('--force', action='store_true', help='rebuild even if the snapshot is up to date')
+    args = parser.parse_args(argv)
+
+    path = snapshot_path(fingerprint(args.dataset_dir), args.snapshot_dir)
+    if path.exists() and not args.force:
+        print(f'Snapshot up to date: {path}')
+        return
+    dataset, _ = build(args.dataset_dir, args.snapshot_dir, overwrite=args.force)
+    print(f'Snapshot written: {path} ({len(dataset.facts)} result rows)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+import threading
+from dataclasses import dataclass
+
+from f1_reliability import snapshot
+from f1_reliability.backends import build_backend, extend_backend
+from f1_reliability.cube import Cube
+from f1_reliability.dataset import DATASET_DIR, Dataset
+from f1_reliability.filters import FilterIndex
+from f1_reliability.registry import Registry
+
+
+#Dados compartilhados por todas as sessões e paginas do processo (somente leitura, nenhuma pagina altera as tabelas)
+@dataclass(frozen=True)
+class Store:
+    fingerprint: str
+    dataset: Dataset
+    cube: Cube #ou DuckDBCube, conforme F1_BACKEND (mesma interface)
+    index: FilterIndex
+    manifest: dict
+    tables: Registry #tabelas secundarias (paradas, classificação, ...), lidas no primeiro acesso
+
+
+_lock = threading.Lock()
+_store = None
+
+
+#Atualizando a instancia atual com as linhas adicionadas depois de um Grand Prix (None = precisa recarregar tudo)
+def _update(store, fingerprint, dataset_dir):
+    ingested = snapshot.update(store.dataset, store.manifest, dataset_dir)
+    if ingested is None:
+        return None
+    dataset = ingested.dataset
+    cube = extend_backend(store.cube, dataset, ingested.facts)
+    return Store(fingerprint=fingerprint, dataset=dataset, cube=cube, index=FilterIndex(dataset), manifest=ingested.manifest,
+                 tables=Registry(dataset_dir))
+
+
+def _load(fingerprint, dataset_dir):
+    dataset, manifest = snapshot.load_versioned(dataset_dir)
+    return Store(fingerprint=fingerprint, dataset=dataset, cube=build_backend(dataset), index=FilterIndex(dataset), manifest=manifest,
+                 tables=Registry(dataset_dir))
+
+
+#Instancia única do processo. O fingerprint dos arquivos é conferido a cada chamada para recarregar quando o dataset mudar;
+#o lock garante que sessões simultâneas com a cache vazia carreguem o snapshot uma única vez
+def get_store(dataset_dir=DATASET_DIR):
+    global _store
+    fingerprint = snapshot.fingerprint(dataset_dir)
+    store = _store
+    if store is not None and store.fingerprint == fingerprint:
+        return store
+    with _lock:
+        if _store is None:
+            _store = _load(fingerprint, dataset_dir)
+        elif _store.fingerprint != fingerprint:
+            _store = _update(_store, fingerprint, dataset_dir) or _load(fingerprint, dataset_dir)
+        return _store
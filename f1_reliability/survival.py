@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+
+#Curvas de sobrevivência (Kaplan-Meier) até a falha mecânica em função da distancia da corrida: voltas completadas como
+#fração das voltas do vencedor da mesma corrida/sessão. Quem terminou ou abandonou por outro motivo (acidente,
+#desclassificação, ...) sai do grupo em risco sem falha (censurado) na distancia que completou
+
+
+#Quantidade de pontos da curva: a distancia é arredondada para cima em passos de 1/BINS da corrida
+BINS = 100
+
+#Categorias dos status de falha mecânica (status que não aparecem aqui ficam em Other)
+FAILURE_CATEGORIES = {
+    'Power unit': ['Engine', 'Power Unit', 'Power loss', 'Engine fire', 'Engine misfire', 'Turbo', 'Supercharger', 'ERS',
+                   'Injection', 'Ignition', 'Spark plugs', 'Distributor', 'Crankshaft'],
+    'Transmission': ['Gearbox', 'Transmission', 'Clutch', 'Differential', 'Driveshaft', 'Drivetrain', 'Halfshaft', 'Axle',
+                     'CV joint'],
+    'Cooling and fluids': ['Radiator', 'Overheating', 'Cooling system', 'Water pressure', 'Water leak', 'Water pump', 'Water pipe',
+                           'Oil leak', 'Oil pressure', 'Oil line', 'Oil pump', 'Oil pipe', 'Fuel pressure', 'Fuel pump',
+                           'Fuel system', 'Fuel pipe'],
+    'Electrical and hydraulics': ['Electrical', 'Hydraulics', 'Pneumatics', 'Battery', 'Alternator', 'Launch control', 'Throttle'],
+    'Chassis': ['Suspension', 'Brakes', 'Brake duct', 'Steering', 'Track rod', 'Wheel', 'Wheel rim', 'Wheel nut', 'Wheel bearing',
+                'Tyre', 'Puncture', 'Tyre puncture', 'Vibrations', 'Seat', 'Driver Seat'],
+}
+OTHER = 'Other'
+
+
+#Categoria de cada status (Series statusId -> categoria), somente para os status mecânicos
+def failure_categories(status):
+    category = {name: category for category, names in FAILURE_CATEGORIES.items() for name in names}
+    mechanical = status[status['is_mechanical']]
+    return pd.Series(mechanical['status'].map(category).fillna(OTHER).to_numpy(), index=mechanical['statusId'], name='category')
+
+
+#Decada da temporada (1950s, 1960s, ...)
+def era(years):
+    return (np.asarray(years) // 10 * 10).astype(str).astype(object) + 's'
+
+
+#Voltas do vencedor de cada corrida e sessão (Series com indice (raceId, sessionId))
+def race_laps(facts):
+    return facts.groupby(['raceId', 'sessionId'])['laps'].max()
+
+
+#Fração da corrida completada por cada resultado (voltas / voltas do vencedor da mesma corrida e sessão).
+#laps_by_race vem da tabela fato inteira quando results é só uma parte (algumas equipes, sem o vencedor)
+def race_distance(results, laps_by_race=None):
+    if laps_by_race is None:
+        laps_by_race = race_laps(results)
+    laps = laps_by_race.reindex(pd.MultiIndex.from_arrays([results['raceId'], results['sessionId']])).to_numpy()
+    laps = np.where(laps > 0, laps, np.nan)
+    return pd.Series(results['laps'].to_numpy() / laps, index=results.index).fillna(0).clip(0, 1)
+
+
+#Estimador de Kaplan-Meier de todos os grupos de uma vez: as saidas (falhas + censuras) e as falhas são contadas por
+#(grupo, passo de distancia) em uma matriz, o grupo em risco é o total menos as saidas dos passos anteriores e a
+#sobrevivência é o produto acumulado de (1 - falhas / em risco) ao longo da distancia
+def _kaplan_meier(group_codes, n_groups, steps, failed, bins, event_codes=None, n_events=None):
+    shape = (n_groups, bins + 1)
+    removed = np.bincount(group_codes * (bins + 1) + steps, minlength=shape[0] * shape[1]).reshape(shape)
+    at_risk = removed.sum(axis=1, keepdims=True) - np.cumsum(removed, axis=1) + removed
+    if event_codes is None:
+        failures = np.bincount(group_codes[failed] * (bins + 1) + steps[failed], minlength=shape[0] * shape[1]).reshape(shape)
+    else:
+        #Uma curva por tipo de falha, todas com o mesmo grupo em risco (as falhas dos outros tipos são censuras)
+        failures = np.bincount(event_codes[failed] * (bins + 1) + steps[failed], minlength=n_events * shape[1]).reshape(n_events, shape[1])
+        at_risk = np.broadcast_to(at_risk, failures.shape)
+    hazard = np.divide(failures, at_risk, out=np.zeros(failures.shape), where=at_risk > 0)
+    return np.cumprod(1 - hazard, axis=1), at_risk, failures
+
+
+#Curvas de sobrevivência por grupo: by = constructorId, era ou category (tipo de falha). results são as linhas da
+#tabela fato da seleção (laps, raceId, sessionId, year, statusId, is_mechanical e a coluna de by).
+#Retorna uma linha por (grupo, distancia) com a sobrevivência, o grupo em risco e as falhas naquele passo
+def survival_curves(results, by, status=None, laps_by_race=None, bins=BINS):
+    distance = race_distance(results, laps_by_race).to_numpy()
+    steps = np.ceil(distance * bins).astype(np.int64)
+    failed = results['is_mechanical'].to_numpy()
+    if by == 'category':
+        categories = failure_categories(status)
+        labels = [c for c in FAILURE_CATEGORIES if c in set(categories)] + ([OTHER] if OTHER in set(categories) else [])
+        codes = pd.Series(range(len(labels)), index=labels)
+        event_codes = np.zeros(len(results), dtype=np.int64)
+        event_codes[failed] = results.loc[failed, 'statusId'].map(categories).map(codes).to_numpy()
+        survival, at_risk, failures = _kaplan_meier(np.zeros(len(results), dtype=np.int64), 1, steps, failed, bins,
+                                                    event_codes, len(labels))
+    else:
+        values = era(results['year']) if by == 'era' else results[by].to_numpy()
+        group_codes, labels = pd.factorize(values, sort=True)
+        survival, at_risk, failures = _kaplan_meier(group_codes.astype(np.int64), len(labels), steps, failed, bins)
+    return pd.DataFrame({by: np.repeat(np.asarray(labels), bins + 1),
+                         'distance': np.tile(np.arange(bins + 1) / bins, len(labels)),
+                         'survival': survival.ravel(),
+                         'at_risk': at_risk.ravel(),
+                         'failures': failures.ravel()})
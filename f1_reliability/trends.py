@@ -0,0 +1,45 @@
+import numpy as np
+
+
+#Janelas moveis (temporadas) das tendências de confiabilidade
+WINDOWS = (3, 5)
+
+#Medidas de cada janela: taxa de chegada, falhas mecânicas por largada e confiabilidade (mesma definição dos KPIs)
+METRICS = {'finish_rate': 'Finish rate (%)',
+           'failures_per_start': 'Mechanical failures per start',
+           'reliability': 'Reliability (%)'}
+
+
+#Largadas, chegadas e falhas mecânicas de cada equipe por temporada, contadas pelo cubo (ou outro backend)
+def season_totals(cube):
+    keys = ['constructorId', 'year']
+    seasons = cube.count_by(keys, 'starts')
+    for name, flag in (('finished', 'finished'), ('failures', 'mechanical')):
+        seasons = seasons.merge(cube.slice(**{flag: True}).count_by(keys, name), on=keys, how='left')
+    return seasons.fillna({'finished': 0, 'failures': 0}).astype({'finished': 'int64', 'failures': 'int64'})
+
+
+#Tendências moveis de todas as equipes em uma passada: com as linhas ordenadas por (equipe, ano), a soma de cada janela
+#é a diferença de duas somas acumuladas, e o inicio da janela (ano - window + 1 da mesma equipe) sai de uma busca binaria.
+#As janelas são de temporadas do calendario: um ano sem corridas da equipe conta como zero
+def rolling_trends(seasons, windows=WINDOWS):
+    seasons = seasons.sort_values(['constructorId', 'year']).reset_index(drop=True)
+    key = seasons['constructorId'].to_numpy(np.int64) * 10000 + seasons['year'].to_numpy(np.int64)
+    totals = {column: np.concatenate([[0], np.cumsum(seasons[column].to_numpy(np.int64))])
+              for column in ('starts', 'finished', 'failures')}
+    end = np.arange(1, len(seasons) + 1)
+    trends = seasons.copy()
+    for window in windows:
+        start = np.searchsorted(key, key - (window - 1), side='left')
+        starts, finished, failures = (totals[column][end] - totals[column][start] for column in ('starts', 'finished', 'failures'))
+        counted = finished + failures
+        trends[f'finish_rate_{window}'] = np.round(finished * 100 / np.where(starts > 0, starts, np.nan), 1)
+        trends[f'failures_per_start_{window}'] = np.round(failures / np.where(starts > 0, starts, np.nan), 3)
+        trends[f'reliability_{window}'] = np.round(finished * 100 / np.where(counted > 0, counted, np.nan), 1)
+    return trends
+
+
+#Recorte da tabela de tendências para o grafico: equipes e anos selecionados, uma medida de uma janela
+def trend_lines(trends, constructors, start_year, end_year, metric, window):
+    lines = trends[trends['constructorId'].isin(constructors) & trends['year'].between(start_year, end_year)]
+    return lines[['constructorId', 'year', f'{metric}_{window}']].rename(columns={f'{metric}_{window}': metric})
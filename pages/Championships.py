@@ -0,0 +1,205 @@
+import streamlit as st
+
+from f1_reliability import analytics, charts, counterfactual, profiling, simulation
+from f1_reliability.store import get_store
+
+#Configuração inicial de pagina
+st.set_page_config(page_title='F1 Reliability Dashboard',
+                   page_icon='🏁',
+                   layout='wide',
+                   initial_sidebar_state='auto')
+
+#Instrumentação opcional do rerun (F1_PROFILE=1): tempo de cada etapa e das funções em cache
+profiling.start('Championships')
+
+st.logo('https://upload.wikimedia.org/wikipedia/commons/3/33/F1.svg')
+link = 'https://www.linkedin.com/in/andr%C3%A9s-michelangelli/'
+st.sidebar.markdown(f"Made by [Andrés A. Michelangelli]({link})")
+
+#Carregando os dados compartilhados (as classificações oficiais só são lidas quando esta pagina é aberta)
+store = get_store()
+dataset = store.dataset
+profiling.lap('load')
+
+#Opções de campeonato: tabela, chave e nomes
+CHAMPIONSHIPS = {'Drivers': ('drivers', 'driverId', dataset.labels('drivers', 'driver')),
+                 'Constructors': ('constructors', 'constructorId', dataset.labels('constructors', 'constructor'))}
+
+#Campeonatos contrafactuais de todas as temporadas, calculados em um lote e guardados na cache. A pagina só guarda os
+#recortes: uma variavel global com o resultado inteiro ficaria presa aos fragmentos de cada sessão (uma copia por sessão)
+@profiling.cached('load_championships')
+def load_championships(fingerprint, _store):
+    return analytics.championships(_store)
+
+@profiling.cached('load_years')
+def load_years(fingerprint, championship, _store):
+    table = getattr(load_championships(fingerprint, _store), CHAMPIONSHIPS[championship][0])
+    return sorted(table['year'].unique().tolist())
+
+#Recorte da temporada e nomes, guardados em cache pela seleção
+@profiling.cached('load_table')
+def load_table(fingerprint, championship, start_year, end_year, _store):
+    table_name, key, names = CHAMPIONSHIPS[championship]
+    table = getattr(load_championships(fingerprint, _store), table_name)
+    table = table[table['year'].between(start_year, end_year)]
+    decided = counterfactual.decided_by_reliability(table, key)
+    decided['champion_name'] = decided['champion'].map(names)
+    decided['cf_champion_name'] = decided['cf_champion'].map(names)
+    return table.assign(name=table[key].map(names)), decided
+
+@profiling.cached('points_lost_figure')
+def points_lost_figure(fingerprint, championship, start_year, end_year, _store):
+    table, _ = load_table(fingerprint, championship, start_year, end_year, _store)
+    top = table[table['position'] <= 2].assign(standing=lambda df: df['position'].map({1: 'Champion', 2: 'Runner-up'}))
+    return charts.points_lost_bars(top, top['name'], 'Points lost by the champion and the runner-up')
+
+@profiling.cached('standings_figure')
+def standings_figure(fingerprint, championship, season, _store):
+    table, _ = load_table(fingerprint, championship, season, season, _store)
+    return charts.standings_bars(table.sort_values('position').head(10), f'{season} standings with and without mechanical failures')
+
+@profiling.cached('validation_figure')
+def validation_figure(fingerprint, start_year, end_year, _store):
+    validation = load_championships(fingerprint, _store).validation
+    return charts.share_lines(validation[validation['year'].between(start_year, end_year)], ['table_match', 'standings_match'])
+
+#Temporada re-simulada com as falhas sorteadas, guardada em cache por (temporada, parametros)
+@profiling.cached('load_simulation')
+def load_simulation(fingerprint, championship, season, rates, runs, seed, _store):
+    _, key, names = CHAMPIONSHIPS[championship]
+    result = analytics.season_simulation(_store, season, key, rates, runs, seed).table
+    return result.assign(name=result[key].map(names))
+
+@profiling.cached('simulation_figure')
+def simulation_figure(fingerprint, championship, season, rates, runs, seed, _store):
+    result = load_simulation(fingerprint, championship, season, rates, runs, seed, _store)
+    result = result[result['title_probability'] > 0].sort_values('title_probability', ascending=False).head(10)
+    return charts.probability_bars(result, 'title_probability', 'name',
+                                   f'{season} title probability in {runs:,} simulations ({simulation.RATES[rates].lower()})',
+                                   'Title probability')
+
+#Temporada escolhida e re-simulação em fragmentos: trocar a temporada refaz somente esta seção, e os parametros da
+#simulação refazem somente a simulação
+@st.fragment
+def simulation_section(championship, key, season):
+    #Temporada re-simulada: falhas mecânicas sorteadas milhares de vezes pelas taxas de falha da equipe ou da era
+    st.subheader(f'{season} re-simulated with resampled mechanical failures')
+    st.caption('Each simulation starts from the order without failures, draws a mechanical failure for every car with the chosen '
+               "failure rate per start and scores the remaining cars with the era's points table. Points outside that table "
+               '(sprints, fastest laps) are kept as they were.')
+    col5, col6, col7 = st.columns(3)
+    rates = col5.radio('Failure rates: ', list(simulation.RATES), format_func=simulation.RATES.get, horizontal=True)
+    runs = col6.select_slider('Simulations: ', options=[1000, 5000, 10000, 20000], value=simulation.RUNS)
+    seed = col7.number_input('Seed: ', min_value=0, value=0, step=1)
+    simulated = load_simulation(store.fingerprint, championship, season, rates, runs, seed, store).head(10)
+    col8, col9 = st.columns([0.45, 0.55])
+    with col8:
+        st.dataframe(simulated,
+                     hide_index=True,
+                     column_order=['position', 'name', 'points', 'sim_points', 'sim_points_std', 'sim_position', 'title_probability'],
+                     column_config={'position': 'Position',
+                                    'name': 'Driver' if key == 'driverId' else 'Team',
+                                    'points': 'Points',
+                                    'sim_points': 'Mean simulated points',
+                                    'sim_points_std': 'Std. dev.',
+                                    'sim_position': 'Mean simulated position',
+                                    'title_probability': st.column_config.ProgressColumn('Title probability', format='percent',
+                                                                                         min_value=0, max_value=1)})
+    with col9:
+        st.plotly_chart(simulation_figure(store.fingerprint, championship, season, rates, runs, seed, store))
+
+@st.fragment
+def season_section(championship, key, table, seasons):
+    season = st.selectbox('Season: ', seasons)
+    standings = table[table['year'] == season].sort_values('position').head(10)
+    col3, col4 = st.columns([0.45, 0.55])
+    with col3:
+        st.dataframe(standings,
+                     hide_index=True,
+                     column_order=['position', 'name', 'points', 'failures', 'points_lost', 'cf_points', 'cf_position'],
+                     column_config={'position': 'Position',
+                                    'name': 'Driver' if key == 'driverId' else 'Team',
+                                    'points': 'Points',
+                                    'failures': 'Mechanical failures',
+                                    'points_lost': 'Points lost',
+                                    'cf_points': 'Points without failures',
+                                    'cf_position': 'Position without failures'})
+    with col4:
+        st.plotly_chart(standings_figure(store.fingerprint, championship, season, store))
+    simulation_section(championship, key, season)
+
+st.sidebar.header("Select filters below:")
+st.write(' ')
+st.sidebar.divider()
+championship = st.sidebar.radio('Championship: ', list(CHAMPIONSHIPS), horizontal=True)
+key = CHAMPIONSHIPS[championship][1]
+
+st.sidebar.divider()
+st.sidebar.subheader('Years')
+years = load_years(store.fingerprint, championship, store)
+start_year, end_year = st.sidebar.select_slider(
+    "Select a range of years: ",
+    options=years,
+    value=(years[0], years[-1]))
+table, decided = load_table(store.fingerprint, championship, start_year, end_year, store)
+profiling.lap('filters', len(table))
+
+# ---- MAINPAGE ----
+
+st.title(':trophy: Championships Decided by Reliability')
+st.caption('Each car retired by a mechanical failure is placed at its expected finishing position (the mean of its grid slot '
+           "and the driver's median finish that season) and every Grand Prix is re-scored with that era's points system. "
+           'Official standings are the baseline; only the points gained or lost by the re-scoring are added.')
+
+kpi1, kpi2, kpi3, kpi4 = st.columns(4)
+kpi1.metric(label='Seasons', value=table['year'].nunique())
+kpi2.metric(label='Champion changes without failures', value=len(decided))
+kpi3.metric(label='Points lost by the champions', value=f"{table.loc[table['position'] == 1, 'points_lost'].clip(lower=0).sum():g}")
+kpi4.metric(label='Points lost to failures', value=f"{table['points_lost'].clip(lower=0).sum():g}")
+profiling.lap('kpis')
+st.divider()
+
+col1, col2 = st.columns([0.55, 0.45])
+
+#Campeonatos decididos pela confiabilidade
+with col1:
+    st.subheader('Championships decided by reliability')
+    st.dataframe(decided,
+                 hide_index=True,
+                 column_order=['year', 'champion_name', 'champion_points', 'cf_champion_name', 'cf_champion_points', 'cf_champion_cf_points'],
+                 column_config={'year': st.column_config.NumberColumn('Season', format='%d'),
+                                'champion_name': 'Champion',
+                                'champion_points': 'Points',
+                                'cf_champion_name': 'Champion without failures',
+                                'cf_champion_points': 'Actual points',
+                                'cf_champion_cf_points': 'Points without failures'})
+
+#Pontos perdidos pelo campeão e pelo vice de cada temporada
+with col2:
+    st.plotly_chart(points_lost_figure(store.fingerprint, championship, start_year, end_year, store))
+
+#Classificação real e contrafactual de uma temporada
+st.divider()
+season_section(championship, key, table, [year for year in years[::-1] if start_year <= year <= end_year])
+
+#Checagem contra as classificações oficiais
+with st.expander('Check against the official standings'):
+    st.caption("Share of Grand Prix results where the era's points table gives the points actually awarded (fastest lap points, "
+               'half points and shared drives differ), and share of drivers whose summed result points match the final official standings '
+               '(dropped results and missing results differ).')
+    st.plotly_chart(validation_figure(store.fingerprint, start_year, end_year, store))
+profiling.lap('charts')
+
+#Painel de profiling (somente com F1_PROFILE=1)
+profiling.finish()
+
+# ---- HIDE STREAMLIT STYLE -----
+#Codigo para ocultar marca d'agua e botões do streamlit
+hide_st_style = """
+            <style>
+            #MainMenu {visibility: hidden;}
+            footer {visibility: hidden;}
+            header {visibility: hidden;}
+            </style>
+            """
+st.markdown(hide_st_style, unsafe_allow_html=True)
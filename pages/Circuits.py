@@ -1,33 +1,35 @@
+from dataclasses import replace
+
 import streamlit as st
-import plotly.express as px
 import pandas as pd
 
+from f1_reliability import analytics, assets, charts, profiling
+from f1_reliability.filters import FilterSpec
+from f1_reliability.store import get_store
+
 #Configuração inicial de pagina
 st.set_page_config(page_title='F1 Reliability Dashboard',
                    page_icon='🏁',
                    layout='wide',
                    initial_sidebar_state='auto')
 
+#Instrumentação opcional do rerun (F1_PROFILE=1): tempo de cada etapa e das funções em cache
+profiling.start('Circuits')
+
 st.logo('https://upload.wikimedia.org/wikipedia/commons/3/33/F1.svg')
 link = 'https://www.linkedin.com/in/andr%C3%A9s-michelangelli/'
 st.sidebar.markdown(f"Made by [Andrés A. Michelangelli]({link})")
 
-#Carregando o session state
-f_races_results = st.session_state['main_df']
+#Carregando os dados compartilhados (não depende da pagina Main ter sido aberta antes)
+store = get_store()
+dataset = store.dataset
+index = store.index
+profiling.lap('load')
 
-#Definindo critérios de seleção da coluna Status como mechanical issues
-mechanical_issues = ['Engine', 'Transmission', 'Gearbox', 'Suspension', 'Hydraulics', 'Brakes', 'Differential', 
-                       'Clutch', 'Driveshaft', 'Fuel pressure', 'Throttle', 'Steering', 'Exhaust', 'Fuel pump', 
-                       'Track rod', 'Pneumatics', 'Engine fire', 'Fuel system', 'Oil line', 'Oil pressure', 'Drivetrain', 'Halfshaft', 
-                       'Crankshaft', 'Wheel bearing', 'Vibrations', 'Oil pump', 'Injection', 'Distributor', 'Turbo', 
-                       'CV joint', 'Water pump', 'Spark plugs', 'Fuel pipe', 'Oil pipe', 'Axle', 'Water pipe', 
-                       'Supercharger', 'Engine misfire', 'Power Unit', 'Brake duct', 'Cooling system', 'Overheating',
-                       'Oil leak', 'Mechanical', 'Radiator', 'Electrical', 'Driver Seat', 'Water Pressure', 'Water leak',
-                       'Fire', 'Power loss', 'Launch control', 'Ignition', 'Battery', 'Alternator', 'ERS', 'Seat', 'Tyre', 'Puncture',
-                       'Wheel', 'Tyre puncture'
-                    ]
-
-pattern = '|'.join(mechanical_issues) #definindo pattern e carater "|" para botar mais opções como se fosse "or" entre cada palabra
+#Nomes e atributos dos circuitos a partir das chaves inteiras
+circuits = dataset.circuits.set_index('circuitId')
+status_names = dataset.labels('status', 'status')
+session_names = dataset.labels('sessions', 'session')
 
 #Criando o slider para filtrar o dataframe principal por anos
 st.sidebar.header("Select filters below:")
@@ -36,43 +38,106 @@ st.sidebar.divider()
 st.sidebar.subheader('Years')
 
 #Definindo a lista de anos disponíveis
-years = sorted(f_races_results['year'].unique())
+years = index.year_values
 
 start_year, end_year = st.sidebar.select_slider(
     "Select a range of years: ",
     options=years,
     value=(years[-21], years[-1]))
 
-#Definindo a tabela fato principal com os anos selecionados e condicionais
-races_results_filtered = f_races_results[(f_races_results['year'] >= start_year) & 
-                                             (f_races_results['year'] <= end_year)]
+st.sidebar.divider()
+#Sessões: Grand Prix e sprint (nenhuma seleção = todas)
+sessions = st.sidebar.multiselect("Select sessions: ",
+                                  session_names.index,
+                                  format_func=session_names.get)
 
-#Definindo opções de paises e circuito, dependendo da tabela fato filtrada pelos anos
+#Definindo opções de paises e circuito, dependendo dos anos selecionados
 st.sidebar.divider()
 country = st.sidebar.selectbox('Select country: ',
-                               races_results_filtered['country_y'].sort_values(ascending=True).unique(),
+                               index.options('country', FilterSpec(start_year, end_year, sessions=sessions)),
                                index=None)
 
 circuit = st.sidebar.selectbox('Select circuit: ',
-                                races_results_filtered[races_results_filtered['country_y'] == country]['circuit_name'].sort_values(ascending=True).unique(),
-                                index=None)
-
-if country and not circuit:
-    races_results_filtered = f_races_results[(f_races_results['year'] >= start_year) & 
-                                             (f_races_results['year'] <= end_year) & 
-                                             (f_races_results['country_y'] == country)]
-elif country and circuit:
-    races_results_filtered = f_races_results[(f_races_results['year'] >= start_year) & 
-                                            (f_races_results['year'] <= end_year) & 
-                                            (f_races_results['country_y'] == country) & 
-                                            (f_races_results['circuit_name'] == circuit)]
+                                circuits.loc[index.options('circuitId', FilterSpec(start_year, end_year, countries=[country] if country else None, sessions=sessions)), 'circuit_name'].sort_values(ascending=True).index if country else [],
+                                index=None,
+                                format_func=circuits['circuit_name'].get)
+
+#Filtros de anos, pais e circuito usados pelas funções de analise
+filters = FilterSpec(start_year, end_year,
+                     countries=[country] if country else None,
+                     circuits=[circuit] if circuit else None,
+                     sessions=sessions)
 
 #Definindo opções multiselect de falhas mecânicas que irão alterar somente o mapa do mundo, o dataframe e histograma
 options = st.sidebar.multiselect(
                             "Select mechanical issues: ",
-                            races_results_filtered[races_results_filtered['status'].str.contains(pattern, case=False, na=False)]['status'].sort_values(ascending=True).unique()
+                            status_names[index.options('statusId', replace(filters, mechanical=True))].sort_values(ascending=True).index,
+                            format_func=status_names.get
                             )
 
+#Nomes dos status selecionados para os titulos dos graficos
+selected_issues = [status_names[s] for s in options]
+#Filtros com as falhas mecânicas selecionadas (mapa, graficos por ano e por equipe, histograma e KPIs)
+issues = replace(filters, statuses=options)
+profiling.lap('filters', len(index.select(filters)) if profiling.ENABLED else None)
+
+#Tabela resumo por circuito construida em uma única agregação e memorizada por (anos, pais, circuito, falhas selecionadas),
+#então interações como o modo escuro do mapa não reconstroem a tabela
+@profiling.cached('load_circuit_summary')
+def load_circuit_summary(fingerprint, filters, statuses, _store):
+    summary = analytics.circuit_table(_store, filters, statuses or None).drop(columns='circuitId').set_index('circuit_name')
+    summary.index.name = 'Circuit' #Alterando o nome do indice para Circuit
+    return summary
+
+#Figuras memorizadas pelos filtros: o toggle do modo escuro só refaz o mapa e as abas não refazem os outros graficos
+@profiling.cached('map_figure')
+def map_figure(fingerprint, issues, fit, style, title, _store):
+    #Somando as falhas mecânicas (filtradas pelas opções multiselect, se houver) por circuito
+    circuits_map = analytics.failures_by(_store, issues, 'circuitId', 'status')
+    circuits_map = _store.dataset.attach(circuits_map, 'circuits', ['circuit_name', 'country', 'lat', 'lng'])
+    return charts.failures_map(circuits_map, title, style, fit=fit)
+
+@profiling.cached('year_figure')
+def year_figure(fingerprint, issues, title, _store):
+    #Step dinâmico dos anos em função do periodo selecionado
+    dtick = 1 if issues.end_year - issues.start_year <= 40 else 2
+    return charts.year_bars(analytics.failures_by(_store, issues, 'year', 'status'), 'status', title, dtick=dtick, height=450)
+
+@profiling.cached('issues_figure')
+def issues_figure(fingerprint, filters, _store):
+    ranking = analytics.top_failures(_store, filters, 'statusId', 'status_count', 10)
+    ranking = _store.dataset.attach(ranking, 'status', ['status'])
+    return charts.ranking_bars(ranking, 'status_count', 'status', 'Most frequent mechanical issues',
+                               {'status_count': 'quantity', 'status': 'mechanical issues'}, height=450)
+
+@profiling.cached('constructors_figure')
+def constructors_figure(fingerprint, issues, title, _store):
+    ranking = analytics.top_failures(_store, issues, 'constructorId', 'status', 10)
+    ranking = _store.dataset.attach(ranking, 'constructors', ['constructor'])
+    return charts.ranking_bars(ranking, 'status', 'constructor', title,
+                               {'status': 'mechanical issues', 'constructor': 'constructor'}, height=450)
+
+#Histograma das voltas das falhas: as faixas e o box plot são calculados aqui, o navegador não recebe as voltas de cada falha
+@profiling.cached('histogram_figure')
+def histogram_figure(fingerprint, issues, title, _store):
+    fig = charts.binned_histogram(analytics.failure_laps(_store, issues), title, 'laps')
+    fig.update_layout(bargap=0.1)
+    return fig
+
+#Curvas de sobrevivência até a falha por distancia da corrida (by = era ou category), todos os grupos em uma passada
+@profiling.cached('survival_figure')
+def survival_figure(fingerprint, filters, by, title, _store):
+    return charts.survival_lines(analytics.survival(_store, filters, by), by, title)
+
+#Mapa com o toggle do modo escuro em um fragmento: o toggle reexecuta somente o mapa (as abas trocam no navegador, sem rerun)
+@st.fragment
+def map_chart(issues, fit, title):
+    #mapa em dark ou light mode
+    on = st.toggle("Map on dark mode")
+    map_mode = 'carto-darkmatter' if on else 'open-street-map'
+    #Zoom ajustado aos circuitos quando um pais é selecionado
+    st.plotly_chart(map_figure(store.fingerprint, issues, fit, map_mode, title, store))
+
 # ---- MAINPAGE ----  
 
 st.title(':earth_americas: F1 Circuits Reliability Analysis Dashboard')
@@ -83,79 +148,27 @@ col1, col2, col3 = st.columns([0.1, 0.7, 0.2])
 kpi1, kpi2, kpi3, kpi4, kpi5, kpi6 = st.columns(6)
 col4, col5 = st.columns(2)
 col6, col7 = st.columns([0.72, 0.28])
+col8, col9 = st.columns(2)
 
 #Mostrando bandeira, nome do pais e nome do circuito e layout
 with col1: #bandeira
     if country:
-        country_flag = races_results_filtered['flag_url_y'].iloc[0]
-        st.image(f'{country_flag}', caption=country,width=70)
+        country_flag = circuits.loc[circuits['country'] == country, 'flag_url'].iloc[0]
+        st.image(assets.image(country_flag, assets.FLAG_WIDTH), caption=country, width=assets.FLAG_WIDTH)
     #else: #Opcional
         #st.caption(f'<h1 style="text-align: center;">Select country and circuit</h1>', unsafe_allow_html=True)
 with col2: #Nome do circuito
     if circuit:
-            st.header(f'{circuit}', divider='blue')
+            st.header(f"{circuits.loc[circuit, 'circuit_name']}", divider='blue')
 with col3: #Layout do circuito
         if circuit:
-            circuit_layout = races_results_filtered['picture_url'].iloc[0]
+            circuit_layout = circuits.loc[circuit, 'picture_url']
             if pd.notna(circuit_layout) and circuit_layout != 'nan':
-                st.image(circuit_layout,width=180)
+                st.image(assets.image(circuit_layout, assets.CIRCUIT_WIDTH), width=assets.CIRCUIT_WIDTH)
 
 #Configurando Mapa Mundi mostrando os circuitos utilizando plotly 
 with col4:
-    circuits_map = races_results_filtered[['circuit_name', 'country_y','lat', 'lng', 'status']]
-
-    if options: #Se a opção options estive ativa, filtrar o df pelas opções multiselect selecionadas pelo usuário
-        circuits_map = circuits_map[circuits_map['status'].isin(options)]
-    #Groupby para contar todos os valores status que são considerados como falhas mecânicas
-    circuits_map = circuits_map[circuits_map['status'].str.contains(pattern, case=False, na=False)].groupby(['circuit_name', 'country_y','lat', 'lng'])['status'].count().reset_index()
-
-    # Calcula a latitude e longitude médias
-    mean_lat = circuits_map['lat'].mean()  
-    mean_lng = circuits_map['lng'].mean()
-
-    mean_lat = circuits_map['lat'].mean()  
-    mean_lng = circuits_map['lng'].mean()
-
-    # Calcula a diferença máxima e mínima de latitude e longitude para ajustar o zoom
-    lat_diff = circuits_map['lat'].max() - circuits_map['lat'].min()
-    lng_diff = circuits_map['lng'].max() - circuits_map['lng'].min()
-    
-    map_zoom = 0.2  # Zoom padrão
-    if country and lat_diff > 0 and lng_diff > 0:
-        map_zoom = max(1, 7 - int(max(lat_diff, lng_diff)))  # Ajustar o zoom dinamicamente
-
-    #mapa em dark ou light mode
-    on = st.toggle("Map on dark mode")
-
-    if on:
-        map_mode = 'carto-darkmatter'
-    else:
-        map_mode = 'open-street-map'
-
-    # Cria um mapa de dispersão com Plotly Express
-    fig1 = px.scatter_mapbox(
-                        circuits_map,
-                        lat='lat',
-                        lon='lng',
-                        hover_name='circuit_name',
-                        hover_data={'country_y': True, 'status': True},
-                        color='status',
-                        color_continuous_scale='Plasma',
-                        size='status',
-                        size_max=20,
-                        zoom=map_zoom,
-                        title=f'Mechanical issues by location {options}'
-    )
-
-
-    # Atualiza o layout do mapa para centralizar na média dos pontos
-    fig1.update_layout(
-                    mapbox_style=map_mode, #para opção light selecionar open-street-map, opção dark: carto-darkmatter
-                    mapbox_center={'lat': mean_lat, 'lon': mean_lng},
-                    mapbox_zoom=map_zoom  # Ajuste o zoom conforme necessário
-    )
-
-    st.plotly_chart(fig1)
+    map_chart(issues, bool(country), f'Mechanical issues by location {selected_issues}')
 
 #Configurando o grafico de quantidade de falhas mecânicas em função do tempo
 with col5:
@@ -163,161 +176,67 @@ with col5:
     tabs = st.tabs(['Mechanical issues per year', 'Most frequent mechanical issues', 'Less reliable constructors' ])
 
     with tabs[0]:
-        mechanical_issues_per_year = races_results_filtered[['year', 'status']]
-
-        if options:
-            mechanical_issues_per_year = races_results_filtered[races_results_filtered['status'].isin(options)]
-
-        mechanical_issues_per_year = mechanical_issues_per_year[mechanical_issues_per_year['status'].str.contains(pattern, case=False, na=False)].groupby('year')['status'].count().reset_index()
-        
-        year_diff = end_year - start_year
-
-        if year_diff <= 40: #Configurando o step dinâmico en função do periodo de anos selecionado
-            dtick = 1
-        else:
-            dtick = 2
-
-        fig4 = px.bar(mechanical_issues_per_year, x='year', y='status',
-                    labels={'x':'year', 'y':'mechanical issues'},
-                    title=f'Mechanical Issues per Year {options}',
-                    height=450)
-        fig4.update_traces(texttemplate='%{y}',
-                        textposition='outside',
-                        textfont_color='white',
-                        textfont_size=12)
-        fig4.update_xaxes(tickmode='linear',  # Define o modo de tick como linear para mostrar todos os anos
-                        tickangle=-45,      # Define o ângulo dos ticks para evitar sobreposição
-                        dtick=dtick             # Define o intervalo entre ticks como 1 para mostrar cada ano
-                        )
-
-        st.plotly_chart(fig4)
+        st.plotly_chart(year_figure(store.fingerprint, issues, f'Mechanical Issues per Year {selected_issues}', store))
     #Configurando o grafico de falhas mecânicas mais frequentes (top 10)
     with tabs[1]:
-
-        mechanical_issues_1 = races_results_filtered[['status']].copy() #Sempre que selecionar apenas uma coluna para fazer groupby, utilizar metodo copy()
-        #groupby com metodo size() que permite contar o número total de elementos em cada grupo, incluindo valores nulos.
-        mechanical_issues_1 = mechanical_issues_1[mechanical_issues_1['status'].str.contains(pattern, case=False, na=False)].groupby('status').size().reset_index(name='status_count')
-        mechanical_issues_1 = mechanical_issues_1.sort_values(by='status_count', ascending=False).head(10)
-        fig2 = px.bar(mechanical_issues_1, x='status_count', y='status', orientation='h',
-                    labels={'status_count': 'quantity', 'status': 'mechanical issues'},
-                    title='Most frequent mechanical issues',
-                    text='status_count', height=450)
-
-        fig2.update_yaxes(categoryorder='total ascending')
-        fig2.update_traces(textposition='outside', textfont_color='white')
-
-        st.plotly_chart(fig2)
+        st.plotly_chart(issues_figure(store.fingerprint, filters, store))
     #Mostrando o gráfico das equipes com mais falhas mecânicas Top 10
     with tabs[2]:
-        constructors_mechanical_issues = races_results_filtered[['name_y', 'status']]
-
-        if options:
-            constructors_mechanical_issues = races_results_filtered[races_results_filtered['status'].isin(options)]
-
-        constructors_mechanical_issues  = constructors_mechanical_issues [constructors_mechanical_issues ['status'].str.contains(pattern, case=False, na=False)].groupby('name_y')['status'].count().reset_index()
-        constructors_mechanical_issues  = constructors_mechanical_issues .sort_values(by='status', ascending=False).head(10)
-        fig5 = px.bar(constructors_mechanical_issues, x='status', y='name_y', orientation='h',
-                    labels={'status': 'mechanical issues', 'name_y': 'constructor'},
-                    title=f'Less reliable constructors (top 10) {options}',
-                    text='status', height=450)
-        
-        fig5.update_yaxes(categoryorder='total ascending')
-        fig5.update_traces(textposition='outside', textfont_color='white')
-
-        st.plotly_chart(fig5)
+        st.plotly_chart(constructors_figure(store.fingerprint, issues, f'Less reliable constructors (top 10) {selected_issues}', store))
 
 #Configurando o Dataframe 
 with col6:  
-    #Definindo condicional para alterar ou não o Dataframe em função do multiselect
-    if options:
-        df_filtered = races_results_filtered[races_results_filtered['status'].isin(options)]
+    #Tabela resumo dos circuitos (somente muda com anos, pais, circuito ou falhas selecionadas)
+    df_filtered = load_circuit_summary(store.fingerprint, filters, tuple(options), store)
+    #Bandeiras embutidas a partir da cache local de imagens (fora da cache da tabela: as miniaturas chegam em segundo plano)
+    df_filtered = df_filtered.assign(flag_url=df_filtered['flag_url'].map(assets.data_uri))
+
+    #Sem resultados na seleção (ex.: somente sprints em anos sem sprint) não há tabela para mostrar
+    if df_filtered.empty:
+        st.info('No results for the selected filters.')
     else:
-        df_filtered = races_results_filtered
-
-    #Construindo as tabelas das medidas por separado para depois mezclar (merge)
-    #Tabela principal
-    df_filtered = df_filtered[['circuit_name','flag_url_y', 'country_y', 'location_y', 'status']]
-    df_filtered = df_filtered[df_filtered['status'].str.contains(pattern, case=False, na=False)].groupby(['circuit_name', 'flag_url_y', 'country_y', 'location_y'])['status'].count().reset_index().sort_values(by='status', ascending=False)
-
-    #Calculando a quantidade de corridas por circuito
-    races_per_circuit = races_results_filtered[['circuit_name', 'raceId']].drop_duplicates()
-    races_per_circuit = races_per_circuit.groupby('circuit_name')['raceId'].count().reset_index().sort_values(by='raceId', ascending=False)
-
-    #Calculando o promedio de falhas mecânicas por circuito
-    mean_per_circuit = races_results_filtered[['raceId','circuit_name', 'status']]
-    mean_per_circuit = mean_per_circuit[mean_per_circuit['status'].str.contains(pattern, case=False, na=False)].groupby(['raceId','circuit_name'])['status'].count().reset_index()
-    mean_per_circuit = mean_per_circuit[['circuit_name', 'status']]
-    mean_per_circuit = mean_per_circuit.groupby(['circuit_name'])['status'].mean().reset_index().sort_values(by='status', ascending=False)
-
-    #Calculando e selecionando as falhas mecânicas mais frequentes por circuito
-    frequent_failures = races_results_filtered[['circuit_name', 'status']].copy()
-    frequent_failures = frequent_failures[frequent_failures['status'].str.contains(pattern, case=False, na=False)]
-    # Agrupando por circuito e status e contando a quantidade de ocorrências de cada status
-    frequent_failures = frequent_failures.groupby(['circuit_name', 'status'])['status'].count().reset_index(name='status_count')
-    # Obtendo o índice dos valores máximos de status_count para cada circuito
-    idx = frequent_failures.groupby('circuit_name')['status_count'].idxmax()
-    # Filtrando as linhas correspondentes aos índices dos valores máximos
-    frequent_failures = frequent_failures.loc[idx].reset_index(drop=True)
-    # Ordenando os valores por status_count em ordem decrescente (opcional)
-    frequent_failures = frequent_failures.sort_values(by='status_count', ascending=False)
-
-    #Fazendo INNER JOIN nas tabelas criadas para depois definir o novo indice em função do nome do circuito circuit_name
-    df_filtered = pd.merge(df_filtered, races_per_circuit, on='circuit_name').merge(mean_per_circuit, on='circuit_name').merge(frequent_failures, on='circuit_name').set_index('circuit_name')
-    df_filtered.index.name = 'Circuit' #Alterando o nome do indice para Circuit
-    df_filtered['rate'] = round(df_filtered['status_count'] * 100 / df_filtered['status_x'], 0)
-
-    #Utilizando a função st.dataframe do streamlit para criar a tabela com as medidas.
-    #É necessário utilizar o condicional para mudar o dataframe se options esta ativo para evitar mostrar Rate%
-    if options:
-        df_filtered = df_filtered.drop(columns=['status','status_count','rate'])
-                            
-    st.dataframe(df_filtered,
-                    column_config={
-                        'flag_url_y': st.column_config.ImageColumn('Country Flag'),
-                        'status_x': st.column_config.ProgressColumn('Mechanical issues', format='%d', min_value=0, max_value= int(df_filtered['status_x'].max())),
-                        'status_y': st.column_config.ProgressColumn('Mean', format='%d', min_value=0, max_value=int(df_filtered['status_y'].max())),
-                        'country_y': st.column_config.Column('Country'),
-                        'location_y': st.column_config.Column('Location'),
-                        'raceId': st.column_config.Column('Races'),
-                        'status': st.column_config.Column('Frequent Failure'),
-                        'status_count': st.column_config.Column('Times'),
-                        'rate': st.column_config.NumberColumn('Rate', format='%d%%')
-                    })
-    
+        #Utilizando a função st.dataframe do streamlit para criar a tabela com as medidas.
+        #É necessário utilizar o condicional para mudar o dataframe se options esta ativo para evitar mostrar Rate%
+        if options:
+            df_filtered = df_filtered.drop(columns=['status','status_count','rate'])
+
+        st.dataframe(df_filtered,
+                        column_config={
+                            'flag_url': st.column_config.ImageColumn('Country Flag'),
+                            'failures': st.column_config.ProgressColumn('Mechanical issues', format='%d', min_value=0, max_value=max(1, int(df_filtered['failures'].fillna(0).max()))),
+                            'mean': st.column_config.ProgressColumn('Mean', format='%d', min_value=0, max_value=max(1, int(df_filtered['mean'].fillna(0).max()))),
+                            'country': st.column_config.Column('Country'),
+                            'location': st.column_config.Column('Location'),
+                            'races': st.column_config.Column('Races'),
+                            'status': st.column_config.Column('Frequent Failure'),
+                            'status_count': st.column_config.Column('Times'),
+                            'rate': st.column_config.NumberColumn('Rate', format='%d%%')
+                        })
+
 #Configurando o histograma de frequencia de falhas mecânicas
 with col7:
-    df_hist = races_results_filtered[races_results_filtered['status'].isin(mechanical_issues)]
-
-    #Definindo condicional
-    if options:
-        df_hist = df_hist[df_hist['status'].isin(options)]
-
-    df_hist = df_hist[['laps']]
-    
-    fig3 = px.histogram(df_hist, x="laps",
-                        nbins=20,
-                        title=f'Mechanical issues histogram {options}',
-                        marginal='box')
-    fig3.update_layout(bargap=0.1)
-
-    st.plotly_chart(fig3)
+    #Somente as falhas mecânicas (filtradas pelo multiselect, se houver)
+    st.plotly_chart(histogram_figure(store.fingerprint, issues, f'Mechanical issues histogram {selected_issues}', store))
 
+#Curvas de sobrevivência: parcela dos carros ainda sem falha mecânica a cada ponto da corrida (quem termina ou abandona
+#por outro motivo sai da conta sem falha), por decada e por tipo de falha
+with col8:
+    st.plotly_chart(survival_figure(store.fingerprint, filters, 'era', 'Survival to a mechanical failure by era', store))
+with col9:
+    st.plotly_chart(survival_figure(store.fingerprint, filters, 'category', 'Survival by failure category', store))
+profiling.lap('charts')
 
 #Configurando KPIs
 #Alterando os KPIs em função do multiselect
-if options:
-    df_kpi = races_results_filtered[races_results_filtered['status'].isin(options)]
-else:
-    df_kpi = races_results_filtered
+kpis = analytics.overview(store, issues)
 
 #Calculando os KPIs
-total_races = df_kpi[['raceId']].drop_duplicates().count().iloc[0]
-total_seasons = df_kpi[['year']].drop_duplicates().count().iloc[0]
-total_teams = df_kpi[['constructorId']].drop_duplicates().count().iloc[0]
-total_mechanical_issues = df_kpi[['status']]
-total_mechanical_issues = (df_kpi[df_kpi['status'].str.contains(pat=pattern, case=False, na=False)].count()).iloc[0]
-total_countries = df_kpi[['country_y']].drop_duplicates().count().iloc[0]
-total_circuits = df_kpi[['circuit_name']].drop_duplicates().count().iloc[0]
+total_races = kpis.races
+total_seasons = kpis.seasons
+total_teams = kpis.constructors
+total_mechanical_issues = kpis.mechanical_issues
+total_countries = kpis.countries
+total_circuits = kpis.circuits
 
 #Mostrando os KPIs
 kpi1.metric(label='Races', value=total_races)
@@ -326,7 +245,11 @@ kpi3.metric(label='Teams', value=total_teams)
 kpi4.metric(label='Mechanical issues', value=total_mechanical_issues)
 kpi5.metric(label='Countries', value=total_countries)
 kpi6.metric(label='Circuits', value=total_circuits)
+profiling.lap('kpis', kpis.results)
     
+#Painel de profiling (somente com F1_PROFILE=1)
+profiling.finish()
+
 # ---- HIDE STREAMLIT STYLE -----
 #Codigo para ocultar marca d'agua e botões do streamlit
 hide_st_style = """
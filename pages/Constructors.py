@@ -1,33 +1,35 @@
+from dataclasses import replace
+
 import streamlit as st
-import plotly.express as px
 import pandas as pd
 
+from f1_reliability import analytics, assets, charts, profiling, trends
+from f1_reliability.filters import FilterSpec
+from f1_reliability.store import get_store
+
 #Configuração inicial de pagina
 st.set_page_config(page_title='F1 Reliability Dashboard',
                    page_icon='🏁',
                    layout='wide',
                    initial_sidebar_state='auto')
 
+#Instrumentação opcional do rerun (F1_PROFILE=1): tempo de cada etapa e das funções em cache
+profiling.start('Constructors')
+
 st.logo('https://upload.wikimedia.org/wikipedia/commons/3/33/F1.svg')
 link = 'https://www.linkedin.com/in/andr%C3%A9s-michelangelli/'
 st.sidebar.markdown(f"Made by [Andrés A. Michelangelli]({link})")
 
-#Carregando o session state
-f_races_results = st.session_state['main_df']
+#Carregando os dados compartilhados (não depende da pagina Main ter sido aberta antes)
+store = get_store()
+dataset = store.dataset
+index = store.index
+profiling.lap('load')
 
-#Definindo critérios de seleção da coluna Status como mechanical issues
-mechanical_issues = ['Engine', 'Transmission', 'Gearbox', 'Suspension', 'Hydraulics', 'Brakes', 'Differential', 
-                       'Clutch', 'Driveshaft', 'Fuel pressure', 'Throttle', 'Steering', 'Exhaust', 'Fuel pump', 
-                       'Track rod', 'Pneumatics', 'Engine fire', 'Fuel system', 'Oil line', 'Oil pressure', 'Drivetrain', 'Halfshaft', 
-                       'Crankshaft', 'Wheel bearing', 'Vibrations', 'Oil pump', 'Injection', 'Distributor', 'Turbo', 
-                       'CV joint', 'Water pump', 'Spark plugs', 'Fuel pipe', 'Oil pipe', 'Axle', 'Water pipe', 
-                       'Supercharger', 'Engine misfire', 'Power Unit', 'Brake duct', 'Cooling system', 'Overheating',
-                       'Oil leak', 'Mechanical', 'Radiator', 'Electrical', 'Driver Seat', 'Water Pressure', 'Water leak',
-                       'Fire', 'Power loss', 'Launch control', 'Ignition', 'Battery', 'Alternator', 'ERS', 'Seat', 'Tyre', 'Puncture',
-                       'Wheel', 'Tyre puncture'
-                    ]
-
-pattern = '|'.join(mechanical_issues) #definindo pattern e carater "|" para botar mais opções como se fosse "or" entre cada palabra
+#Nomes e atributos das equipes a partir das chaves inteiras
+constructor_names = dataset.labels('constructors', 'constructor')
+session_names = dataset.labels('sessions', 'session')
+constructors = dataset.constructors.set_index('constructorId')
 
 #Criando o slider para filtrar o dataframe principal por anos
 st.sidebar.header("Select filters below:")
@@ -36,197 +38,178 @@ st.sidebar.divider()
 st.sidebar.subheader('Years')
 
 #Definindo a lista de anos disponíveis
-years = sorted(f_races_results['year'].unique())
+years = index.year_values
 
 start_year, end_year = st.sidebar.select_slider(
     "Select a range of years: ",
     options=years,
     value=(years[-11], years[-1]))
 
-#Definindo a tabela fato principal com os anos selecionados
-races_results_filtered = f_races_results[(f_races_results['year'] >= start_year) & 
-                                             (f_races_results['year'] <= end_year)]
-
-#Definindo as opções disponiveis no inputbox de acordo com a tabela fato filtrada por anos
 st.sidebar.divider()
-team_1 = st.sidebar.selectbox('Select team: ',
-                               races_results_filtered['name_y'].sort_values(ascending=True).unique(),
-                               index= list(races_results_filtered['name_y'].sort_values(ascending=True).unique()).index('Red Bull')) 
+#Sessões: Grand Prix e sprint (nenhuma seleção = todas)
+sessions = st.sidebar.multiselect("Select sessions: ",
+                                  session_names.index,
+                                  format_func=session_names.get)
 
-team_2 = st.sidebar.selectbox('Compare with: ', races_results_filtered['name_y'].sort_values(ascending=True).unique(), index=None)
+#Tabela de KPIs de todas as equipes no intervalo de anos, calculada em uma única passada e guardada na cache
+@profiling.cached('load_kpis')
+def load_kpis(fingerprint, filters, _store):
+    return analytics.constructor_table(_store, filters)
+
+kpis = load_kpis(store.fingerprint, FilterSpec(start_year, end_year, sessions=sessions), store)
+
+#Definindo as opções disponiveis no multiselect de acordo com os anos selecionados
+st.sidebar.divider()
+team_options = list(constructor_names[kpis.index].sort_values(ascending=True).index)
+red_bull = constructor_names[constructor_names == 'Red Bull'].index[0]
+teams = st.sidebar.multiselect('Select teams to compare: ',
+                               team_options,
+                               default=[red_bull] if red_bull in team_options else None,
+                               format_func=constructor_names.get)
+
+#Cor do divisor do cabeçalho de cada equipe (st.header só aceita estas cores); os graficos usam charts.TEAM_PALETTE,
+#com cores distintas para até 10 equipes
+DIVIDER_COLORS = ['blue', 'red', 'green', 'orange', 'violet', 'gray']
+team_colors = {team: DIVIDER_COLORS[i % len(DIVIDER_COLORS)] for i, team in enumerate(teams)}
+profiling.lap('filters', len(kpis))
+
+#Grafico de comparação memorizado pelos filtros (a ordem das equipes em filters.constructors define as cores)
+@profiling.cached('teams_figure')
+def teams_figure(fingerprint, filters, _store):
+    names = _store.dataset.labels('constructors', 'constructor')
+    order = [names[team] for team in filters.constructors]
+    mechanical_issues_year = analytics.failures_by(_store, filters, ['year', 'constructorId'], 'status')
+    mechanical_issues_year = _store.dataset.attach(mechanical_issues_year, 'constructors', ['constructor'])
+    return charts.team_year_bars(mechanical_issues_year, charts.team_color_map(order), order)
+
+#Curvas de sobrevivência de todas as equipes dos anos selecionados, calculadas em uma única passada; trocar as equipes
+#selecionadas só recorta as curvas
+@profiling.cached('load_survival')
+def load_survival(fingerprint, filters, _store):
+    return analytics.survival(_store, filters, 'constructorId')
+
+@profiling.cached('survival_figure')
+def survival_figure(fingerprint, filters, _store):
+    names = _store.dataset.labels('constructors', 'constructor')
+    order = [names[team] for team in filters.constructors]
+    curves = load_survival(fingerprint, replace(filters, constructors=None), _store)
+    curves = curves[curves['constructorId'].isin(filters.constructors)]
+    return charts.survival_lines(curves, 'constructor', 'Survival to a mechanical failure by race distance',
+                                 charts.team_color_map(order), order)
+
+#Tendências moveis de todas as equipes e anos, calculadas uma vez por seleção de sessões; o slider de anos e as equipes
+#selecionadas só recortam a tabela
+@profiling.cached('load_trends')
+def load_trends(fingerprint, sessions, _store):
+    return analytics.trends(_store, sessions)
+
+@profiling.cached('trends_figure')
+def trends_figure(fingerprint, filters, metric, window, _store):
+    names = _store.dataset.labels('constructors', 'constructor')
+    order = [names[team] for team in filters.constructors]
+    lines = trends.trend_lines(load_trends(fingerprint, filters.sessions, _store), filters.constructors,
+                               filters.start_year, filters.end_year, metric, window)
+    lines = _store.dataset.attach(lines, 'constructors', ['constructor'])
+    return charts.team_trends(lines, metric, f'{trends.METRICS[metric]}, rolling {window} seasons', trends.METRICS[metric],
+                              charts.team_color_map(order), order)
+
+#Tendências com os seus proprios widgets em um fragmento: trocar a medida ou a janela refaz somente este grafico
+@st.fragment
+def trends_chart(filters):
+    trend_col1, trend_col2 = st.columns(2)
+    with trend_col1:
+        metric = st.selectbox('Trend: ', list(trends.METRICS), format_func=trends.METRICS.get)
+    with trend_col2:
+        window = st.radio('Rolling window: ', trends.WINDOWS, horizontal=True, format_func=lambda w: f'{w} seasons')
+    st.plotly_chart(trends_figure(store.fingerprint, filters, metric, window, store))
 
 # ---- MAINPAGE ----  
 
 st.title(':racing_car: F1 Constructors Reliability Comparison')
 #st.markdown('##')
 
-#Estabelecendo colunas e estrutura
-container = st.container()
-col1, col2= st.columns(2)
-col3, col4 = st.columns(2)
-col5 ,col6, col7, col8 = st.columns(4)
-col9, col10 = st.columns(2)
-
 # Criando o grafico de problemas mecanicos por ano com base na lista mechanical issues
-with container:
-    mechanical_issues_year_1 = races_results_filtered[['year', 'name_y', 'status']]
-    mechanical_issues_year_2 = mechanical_issues_year_1[mechanical_issues_year_1['status'].str.contains(pattern, case=False, na=False)].groupby(['year', 'name_y'])['status'].count().reset_index()
-    mechanical_issues_year_3 = mechanical_issues_year_2[(mechanical_issues_year_2['name_y'] == team_1) | (mechanical_issues_year_2['name_y'] == team_2)] #Considerando as duas opções selecionadas dentro da mesma tabela filtrada
-
-    #OPCIONAL: Grafico de linhas
-    fig1 = px.line(mechanical_issues_year_3,
-                    x="year", y="status",
-                    color='name_y',
-                    color_discrete_map={team_1: 'blue', team_2: 'red'},
-                    line_shape='spline')
-    #st.plotly_chart(fig1)
-
-    #Grafico de barras para comparar equipe 1 com equipe 2
-    fig2 = px.bar(mechanical_issues_year_3,
-                  x='year',
-                  y='status',
-                  color='name_y',
-                  height=550,
-                  barmode='group',
-                  title='Mechanical issues per year',
-                  labels={'year': 'Year', 'status': 'Mechanical issues', 'name_y': 'Team'},
-                  color_discrete_map={team_1: 'blue', team_2: 'red'},
-                  template='plotly_dark',
-                  hover_name='name_y'
-                )
-    fig2.update_traces(texttemplate='%{y}',
-                       textposition='outside',
-                       textfont_color='white',
-                       textfont_size=14)
-    fig2.update_xaxes(tickmode='linear',  # Define o modo de tick como linear para mostrar todos os anos
-                      tickangle=-45,      # Define o ângulo dos ticks para evitar sobreposição
-                      dtick=1             # Define o intervalo entre ticks como 1 para mostrar cada ano
-                    )
-    fig2.update_layout(title_font_size=30,      # Tamanho da fonte do título do gráfico
-                        xaxis_title_font_size=20,  # Tamanho da fonte do título do eixo X
-                        yaxis_title_font_size=20,  # Tamanho da fonte do título do eixo Y
-                        legend_title_font_size=20, # Tamanho da fonte do título da legenda
-                        legend_font_size=18,      # Tamanho da fonte dos itens da legenda
-                        xaxis_tickfont_size=18,   # Tamanho da fonte dos rótulos do eixo X
-                        yaxis_tickfont_size=18    # Tamanho da fonte dos rótulos do eixo Y
-                    )
-    st.plotly_chart(fig2)
-
-# ---- MAINPAGE: EQUIPE 1 ----
-with col1:
-    #Definindo e selecionando imagens de bandeira e carro por equipe
-    team_flag_1 = (races_results_filtered[races_results_filtered['name_y'] == team_1]['flag_url_x']).iloc[0]
-    team_country_1 = (races_results_filtered[races_results_filtered['name_y'] == team_1]['nationality_y']).iloc[0]
-    st.image(f'{team_flag_1}', caption=team_country_1,width=70)
-    car_1 = (races_results_filtered[races_results_filtered['name_y'] == team_1]['car_url']).iloc[0]
-    if pd.notna(car_1) and car_1 != 'nan':
-        st.image(car_1,width=400)
-    else:
-        st.caption(f'<h1 style="text-align: center;">Car image not available</h1>', unsafe_allow_html=True)
-with col3:
-    st.header(f'{team_1}', divider='blue')
-    
-with col5:
-    #KPIs
-    total_races_1 = races_results_filtered[['raceId','name_y']]
-    total_races_1 = int(total_races_1[total_races_1['name_y'] == team_1].drop_duplicates().count().iloc[0])
-    total_wins_1 = races_results_filtered[['raceId', 'name_y', 'positionOrder']]
-    total_wins_1 = int(total_wins_1[(total_wins_1['name_y'] == team_1) & (total_wins_1['positionOrder'] == 1)].drop_duplicates().count().iloc[0])
-    team_1_failures = int(mechanical_issues_year_2[mechanical_issues_year_2['name_y'] == team_1]['status'].sum())
-    podiums_lost_1 = int(races_results_filtered[(races_results_filtered['grid'] <= 3) & (races_results_filtered['name_y'] == team_1) & (races_results_filtered['status'].isin(mechanical_issues))].count().iloc[0])
- 
-    st.subheader(f':checkered_flag: Races: {total_races_1}')
-    st.subheader(f':trophy: Wins: {total_wins_1}')
-    st.subheader(f':wrench: Mechanical issues: {team_1_failures}')
-    st.subheader(f':red_circle: Podiums lost: {podiums_lost_1}')
-with col6:
-    #KPIs
-    total_seasons_1 = races_results_filtered[['year','name_y']]
-    total_seasons_1 = int(total_seasons_1[total_seasons_1['name_y'] == team_1].drop_duplicates().count().iloc[0])
-    total_podiums_1 = races_results_filtered[['raceId', 'name_y', 'positionOrder']]
-    total_podiums_1 = int(total_podiums_1[(total_podiums_1['name_y'] == team_1) & (total_podiums_1['positionOrder'] <= 3)].drop_duplicates().count().iloc[0])
-    wins_lost_1 = int(races_results_filtered[(races_results_filtered['grid'] == 1) & (races_results_filtered['name_y'] == team_1) & (races_results_filtered['status'].isin(mechanical_issues))].count().iloc[0])
-    mechanical_issues_year_2 = mechanical_issues_year_1[mechanical_issues_year_1['status'].str.contains(pattern, case=False, na=False)].groupby(['year', 'name_y'])['status'].count().reset_index()
-    worst_season_1 = mechanical_issues_year_2[(mechanical_issues_year_2['name_y'] == team_1)].sort_values(by='status',ascending=False).iloc[0,0]
-
-    st.subheader(f':earth_americas: Seasons: {total_seasons_1}')
-    st.subheader(f':medal: Podiums: {total_podiums_1}')
-    st.subheader(f':x: Victories lost: {wins_lost_1}')
-    st.subheader(f':black_circle: Worst season: {worst_season_1}')
-with col9:
-    #Calculando a confiabilidade da equipe
-    races_finished_1 = races_results_filtered[['year', 'name_y', 'status']]
-    #Filtrando o df com status que contem Finished ou o simbolo '+'
-    races_finished_1 = races_finished_1[(races_finished_1['status'].str.contains(r'Finished|\+', case=False, na=False)) & (races_finished_1['name_y'] == team_1)].groupby(['year', 'name_y'])['status'].count().reset_index()
-    races_finished_1 = races_finished_1['status'].sum()
-    reliability_1 = round((races_finished_1 *100 / (team_1_failures + races_finished_1)), 1)
-
-    st.markdown(f'<h1 style="text-align: center;">Reliability: {reliability_1}%</h1>', unsafe_allow_html=True)
-
-
-# ---- MAINPAGE: EQUIPE 2 ----
-with col2:
-    if team_2:
-        #Definindo e selecionando imagens de bandeira e carro por equipe
-        team_flag_2 = (races_results_filtered[races_results_filtered['name_y'] == team_2]['flag_url_x']).iloc[0]
-        team_country_2 = (races_results_filtered[races_results_filtered['name_y'] == team_2]['nationality_y']).iloc[0]
-        st.image(f'{team_flag_2}', caption=team_country_2, width=70)
-        car_2 = (races_results_filtered[races_results_filtered['name_y'] == team_2]['car_url']).iloc[0]
-        if pd.notna(car_2) and car_1 != 'nan':
-            st.image(car_2, width=400)
+if teams:
+    #Grafico de barras para comparar as equipes selecionadas
+    #(OPCIONAL: a mesma tabela como grafico de linhas, px.line com line_shape='spline')
+    st.plotly_chart(teams_figure(store.fingerprint, FilterSpec(start_year, end_year, constructors=teams, sessions=sessions), store))
+    #Parcela das largadas de cada equipe ainda sem falha mecânica a cada ponto da corrida (quem termina ou abandona
+    #por outro motivo sai da conta sem falha)
+    st.plotly_chart(survival_figure(store.fingerprint, FilterSpec(start_year, end_year, constructors=teams, sessions=sessions), store))
+
+    #Tendências moveis de confiabilidade (a janela inclui as temporadas anteriores ao inicio do slider)
+    trends_chart(FilterSpec(start_year, end_year, constructors=teams, sessions=sessions))
+else:
+    st.markdown(f'<h1 style="text-align: center;">Select one or more teams to compare</h1>', unsafe_allow_html=True)
+profiling.lap('charts')
+
+# ---- MAINPAGE: EQUIPES ----
+#Cada equipe selecionada le a sua linha da tabela de KPIs, duas equipes por linha de colunas
+def team_card(team, image_col, header_col, kpi_cols, reliability_col):
+    row = kpis.loc[team]
+    with image_col:
+        #Definindo e selecionando imagens de bandeira e carro por equipe (miniaturas da cache local de imagens)
+        st.image(assets.image(constructors.loc[team, 'flag_url'], assets.FLAG_WIDTH), caption=constructors.loc[team, 'nationality'], width=assets.FLAG_WIDTH)
+        car = constructors.loc[team, 'car_url']
+        if pd.notna(car) and car != 'nan':
+            st.image(assets.image(car, assets.CAR_WIDTH), width=assets.CAR_WIDTH)
         else:
             st.caption(f'<h1 style="text-align: center;">Car image not available</h1>', unsafe_allow_html=True)
-with col4:
-    if team_2:
-        st.header(f'{team_2}', divider='red')
-    else:
-        st.markdown(f'<h1 style="text-align: center;">Select another team to compare</h1>', unsafe_allow_html=True)
-with col7:
-    if team_2:
-        #KPIs
-        total_races_2 = races_results_filtered[['raceId','name_y']]
-        total_races_2 = int(total_races_2[total_races_2['name_y'] == team_2].drop_duplicates().count().iloc[0])
-        total_wins_2 = races_results_filtered[['raceId', 'name_y', 'positionOrder']]
-        total_wins_2 = int(total_wins_2[(total_wins_2['name_y'] == team_2) & (total_wins_2['positionOrder'] == 1)].drop_duplicates().count().iloc[0])
-        team_2_failures = int(mechanical_issues_year_2[mechanical_issues_year_2['name_y'] == team_2]['status'].sum())
-        podiums_lost_2 = int(races_results_filtered[(races_results_filtered['grid'] <= 3) & (races_results_filtered['name_y'] == team_2) & (races_results_filtered['status'].isin(mechanical_issues))].count().iloc[0])
-    
-        st.subheader(f':checkered_flag: Races: {total_races_2}')
-        st.subheader(f':trophy: Wins: {total_wins_2}')
-        st.subheader(f':wrench: Mechanical issues: {team_2_failures}')
-        st.subheader(f':red_circle: Podiums lost: {podiums_lost_2}')
-    else:
-        st.write(" ")
-with col8:
-    if team_2:
-    #KPIs
-        total_seasons_2 = races_results_filtered[['year','name_y']]
-        total_seasons_2 = int(total_seasons_2[total_seasons_2['name_y'] == team_2].drop_duplicates().count().iloc[0])
-        total_podiums_2 = races_results_filtered[['raceId', 'name_y', 'positionOrder']]
-        total_podiums_2 = int(total_podiums_2[(total_podiums_2['name_y'] == team_2) & (total_podiums_2['positionOrder'] <= 3)].drop_duplicates().count().iloc[0])
-        wins_lost_2 = int(races_results_filtered[(races_results_filtered['grid'] == 1) & (races_results_filtered['name_y'] == team_2) & (races_results_filtered['status'].isin(mechanical_issues))].count().iloc[0])
-        mechanical_issues_year_2 = mechanical_issues_year_1[mechanical_issues_year_1['status'].str.contains(pattern, case=False, na=False)].groupby(['year', 'name_y'])['status'].count().reset_index()
-        worst_season_2 = mechanical_issues_year_2[(mechanical_issues_year_2['name_y'] == team_2)].sort_values(by='status',ascending=False).iloc[0,0]
-
-        st.subheader(f':earth_americas: Seasons: {total_seasons_2}')
-        st.subheader(f':medal: Podiums: {total_podiums_2}')
-        st.subheader(f':x: Victories lost: {wins_lost_2}')
-        st.subheader(f':black_circle: Worst season: {worst_season_2}')
-    else:
-        st.write(" ")
-with col10:
-    if team_2:
-        #Calculando a confiabilidade da equipe
-        races_finished_2 = races_results_filtered[['year', 'name_y', 'status']]
-        #Filtrando o df com status que contem Finished ou o simbolo '+'
-        races_finished_2 = races_finished_2[(races_finished_2['status'].str.contains(r'Finished|\+', case=False, na=False)) & (races_finished_2['name_y'] == team_2)].groupby(['year', 'name_y'])['status'].count().reset_index()
-        races_finished_2 = races_finished_2['status'].sum()
-        reliability_2 = round((races_finished_2 *100 / (team_2_failures + races_finished_2)), 1)
-
-        st.markdown(f'<h1 style="text-align: center;">Reliability: {reliability_2}%</h1>', unsafe_allow_html=True)
-
-    else:
-        st.write(" ")
+    with header_col:
+        st.header(f'{constructor_names[team]}', divider=team_colors[team])
+    with kpi_cols[0]:
+        st.subheader(f':checkered_flag: Races: {int(row.races)}')
+        st.subheader(f':trophy: Wins: {int(row.wins)}')
+        st.subheader(f':wrench: Mechanical issues: {int(row.mechanical_issues)}')
+        st.subheader(f':red_circle: Podiums lost: {int(row.podiums_lost)}')
+    with kpi_cols[1]:
+        worst_season = int(row.worst_season) if pd.notna(row.worst_season) else '-'
+        st.subheader(f':earth_americas: Seasons: {int(row.seasons)}')
+        st.subheader(f':medal: Podiums: {int(row.podiums)}')
+        st.subheader(f':x: Victories lost: {int(row.victories_lost)}')
+        st.subheader(f':black_circle: Worst season: {worst_season}')
+    with reliability_col:
+        #Confiabilidade = corridas terminadas (status com Finished ou o simbolo '+') / (terminadas + falhas mecânicas)
+        reliability = f'{row.reliability}%' if pd.notna(row.reliability) else '-'
+        st.markdown(f'<h1 style="text-align: center;">Reliability: {reliability}</h1>', unsafe_allow_html=True)
+
+for pair in [teams[i:i + 2] for i in range(0, len(teams), 2)]:
+    #Estabelecendo colunas e estrutura
+    image_cols = st.columns(2)
+    header_cols = st.columns(2)
+    kpi_cols = st.columns(4)
+    reliability_cols = st.columns(2)
+    for i, team in enumerate(pair):
+        team_card(team, image_cols[i], header_cols[i], kpi_cols[2 * i:2 * i + 2], reliability_cols[i])
+    if len(teams) == 1:
+        with header_cols[1]:
+            st.markdown(f'<h1 style="text-align: center;">Select another team to compare</h1>', unsafe_allow_html=True)
+
+profiling.lap('team cards', len(teams))
+
+# ---- MAINPAGE: RANKING ----
+#Ranking de todas as equipes no intervalo de anos (ordenavel clicando nas colunas)
+st.divider()
+st.subheader(':bar_chart: All constructors')
+leaderboard = dataset.attach(kpis.drop(columns='finished').reset_index(), 'constructors', ['constructor'])
+leaderboard = leaderboard.sort_values(['wins', 'podiums'], ascending=False)
+st.dataframe(leaderboard,
+             hide_index=True,
+             column_order=['constructor', 'races', 'seasons', 'wins', 'podiums', 'mechanical_issues',
+                           'podiums_lost', 'victories_lost', 'worst_season', 'reliability'],
+             column_config={'constructor': 'Team',
+                            'races': 'Races',
+                            'seasons': 'Seasons',
+                            'wins': 'Wins',
+                            'podiums': 'Podiums',
+                            'mechanical_issues': 'Mechanical issues',
+                            'podiums_lost': 'Podiums lost',
+                            'victories_lost': 'Victories lost',
+                            'worst_season': st.column_config.NumberColumn('Worst season', format='%d'),
+                            'reliability': st.column_config.NumberColumn('Reliability', format='%.1f%%')})
+
+#Painel de profiling (somente com F1_PROFILE=1)
+profiling.finish()
 
 # ---- HIDE STREAMLIT STYLE -----
 #Codigo para ocultar marca d'agua e botões do streamlit
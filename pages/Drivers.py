@@ -0,0 +1,191 @@
+import re
+import unicodedata
+
+import streamlit as st
+import pandas as pd
+
+from f1_reliability import analytics, charts, profiling
+from f1_reliability.filters import FilterSpec
+from f1_reliability.store import get_store
+
+#Configuração inicial de pagina
+st.set_page_config(page_title='F1 Reliability Dashboard',
+                   page_icon='🏁',
+                   layout='wide',
+                   initial_sidebar_state='auto')
+
+#Instrumentação opcional do rerun (F1_PROFILE=1): tempo de cada etapa e das funções em cache
+profiling.start('Drivers')
+
+st.logo('https://upload.wikimedia.org/wikipedia/commons/3/33/F1.svg')
+link = 'https://www.linkedin.com/in/andr%C3%A9s-michelangelli/'
+st.sidebar.markdown(f"Made by [Andrés A. Michelangelli]({link})")
+
+#Carregando os dados compartilhados (não depende da pagina Main ter sido aberta antes)
+store = get_store()
+dataset = store.dataset
+index = store.index
+session_names = dataset.labels('sessions', 'session')
+profiling.lap('load')
+
+#Nome sem acentos e em minusculas, para a busca achar 'Perez' em 'Sergio Pérez'
+def search_key(text):
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode().lower()
+
+#Texto digitado pelo usuario como codigo inline no Markdown: links, enfase e :emoji: não são interpretados (a cerca de
+#crases é maior que qualquer sequencia de crases do texto)
+def code_span(text):
+    fence = '`' * (max(map(len, re.findall('`+', text)), default=0) + 1)
+    return f'{fence} {text} {fence}'
+
+#KPIs de todos os pilotos em uma única agregação por intervalo de anos e sessões; buscar e trocar de piloto só recorta
+#esta tabela
+@profiling.cached('load_drivers')
+def load_drivers(fingerprint, filters, _store):
+    table = analytics.driver_table(_store, filters)
+    table['search'] = table['driver'].map(search_key)
+    return table.sort_values('driver').reset_index(drop=True)
+
+#Falhas de todos os pilotos por temporada, equipe e tipo de falha, também uma única agregação por seleção
+@profiling.cached('load_failures')
+def load_failures(fingerprint, filters, _store):
+    return analytics.failures_by_driver(_store, filters)
+
+#Graficos do piloto memorizados pelos filtros e pelo piloto selecionado
+@profiling.cached('driver_figures')
+def driver_figures(fingerprint, filters, driver, _store):
+    failures = load_failures(fingerprint, filters, _store)
+    failures = failures[failures['driverId'] == driver]
+    seasons = failures.groupby(['year', 'status'], as_index=False)['failures'].sum()
+    teams = failures.groupby(['constructor', 'status'], as_index=False)['failures'].sum()
+    return (charts.failure_type_bars(seasons, 'year', 'Mechanical issues per season', 'Season'),
+            charts.failure_type_bars(teams, 'constructor', 'Mechanical issues per team', 'Team'))
+
+#Criando o slider para filtrar o dataframe principal por anos
+st.sidebar.header("Select filters below:")
+st.write(' ')
+st.sidebar.divider()
+st.sidebar.subheader('Years')
+
+#Definindo a lista de anos disponíveis
+years = index.year_values
+
+start_year, end_year = st.sidebar.select_slider(
+    "Select a range of years: ",
+    options=years,
+    value=(years[-11], years[-1]))
+
+st.sidebar.divider()
+#Sessões: Grand Prix e sprint (nenhuma seleção = todas)
+sessions = st.sidebar.multiselect("Select sessions: ",
+                                  session_names.index,
+                                  format_func=session_names.get)
+
+filters = FilterSpec(start_year, end_year, sessions=sessions)
+drivers = load_drivers(store.fingerprint, filters, store)
+driver_names = drivers.set_index('driverId')['driver']
+
+#Busca (aplicada ao apertar Enter ou sair do campo): recorta a tabela já calculada, sem acentos e sem diferenciar
+#maiusculas. A lista de pilotos também filtra enquanto se digita, no navegador
+st.sidebar.divider()
+search = st.sidebar.text_input('Search drivers: ', placeholder='Name, e.g. Senna')
+matches = drivers[drivers['search'].str.contains(search_key(search.strip()), regex=False)] if search.strip() else drivers
+
+#Sem busca, o piloto com mais vitorias na seleção vem selecionado
+default = 0 if search.strip() or matches.empty else int(matches['wins'].to_numpy().argmax())
+driver = st.sidebar.selectbox('Select a driver: ',
+                              matches['driverId'],
+                              index=default if not matches.empty else None,
+                              format_func=driver_names.get)
+profiling.lap('filters', len(matches))
+
+# ---- MAINPAGE ----
+
+st.title(':bust_in_silhouette: F1 Drivers Reliability')
+
+if driver is None:
+    st.info(f'No driver matches {code_span(search.strip())}.' if search.strip() else 'No drivers in the selected years and sessions.')
+else:
+    row = drivers.set_index('driverId').loc[driver]
+    st.header(f'{row.driver}', divider='red')
+    st.caption(f'{row.nationality}. Last team in the selection: {row.last_team}')
+
+    #KPIs do piloto lidos da tabela de todos os pilotos
+    kpi1, kpi2, kpi3, kpi4, kpi5 = st.columns(5)
+    worst_season = int(row.worst_season) if pd.notna(row.worst_season) else '-'
+    with kpi1:
+        st.subheader(f':checkered_flag: Races: {int(row.races)}')
+        st.subheader(f':earth_americas: Seasons: {int(row.seasons)}')
+    with kpi2:
+        st.subheader(f':trophy: Wins: {int(row.wins)}')
+        st.subheader(f':medal: Podiums: {int(row.podiums)}')
+    with kpi3:
+        st.subheader(f':wrench: Mechanical issues: {int(row.mechanical_issues)}')
+        st.subheader(f':racing_car: Teams: {int(row.teams)}')
+    with kpi4:
+        st.subheader(f':red_circle: Podiums lost: {int(row.podiums_lost)}')
+        st.subheader(f':x: Victories lost: {int(row.victories_lost)}')
+    with kpi5:
+        st.subheader(f':black_circle: Worst season: {worst_season}')
+        #Confiabilidade = corridas terminadas / (terminadas + falhas mecânicas)
+        reliability = f'{row.reliability}%' if pd.notna(row.reliability) else '-'
+        st.subheader(f':white_check_mark: Reliability: {reliability}')
+    profiling.lap('kpis')
+
+    if row.mechanical_issues:
+        col1, col2 = st.columns([0.6, 0.4])
+        fig1, fig2 = driver_figures(store.fingerprint, filters, driver, store)
+        with col1:
+            st.plotly_chart(fig1)
+        with col2:
+            st.plotly_chart(fig2)
+
+        #Tipos de falha por equipe e temporada
+        failures = load_failures(store.fingerprint, filters, store)
+        failures = failures[failures['driverId'] == driver].sort_values(['year', 'failures'], ascending=[True, False])
+        st.dataframe(failures,
+                     hide_index=True,
+                     column_order=['year', 'constructor', 'status', 'failures'],
+                     column_config={'year': st.column_config.NumberColumn('Season', format='%d'),
+                                    'constructor': 'Team',
+                                    'status': 'Issue',
+                                    'failures': 'Mechanical issues'})
+    else:
+        st.markdown(f'<h1 style="text-align: center;">No mechanical issues in the selected years</h1>', unsafe_allow_html=True)
+    profiling.lap('charts')
+
+# ---- MAINPAGE: RANKING ----
+#Todos os pilotos da busca no intervalo de anos (ordenavel clicando nas colunas)
+st.divider()
+st.subheader(':bar_chart: All drivers')
+st.dataframe(matches.sort_values(['wins', 'podiums'], ascending=False),
+             hide_index=True,
+             column_order=['driver', 'nationality', 'last_team', 'races', 'seasons', 'teams', 'wins', 'podiums',
+                           'mechanical_issues', 'podiums_lost', 'victories_lost', 'worst_season', 'reliability'],
+             column_config={'driver': 'Driver',
+                            'nationality': 'Nationality',
+                            'last_team': 'Last team',
+                            'races': 'Races',
+                            'seasons': 'Seasons',
+                            'teams': 'Teams',
+                            'wins': 'Wins',
+                            'podiums': 'Podiums',
+                            'mechanical_issues': 'Mechanical issues',
+                            'podiums_lost': 'Podiums lost',
+                            'victories_lost': 'Victories lost',
+                            'worst_season': st.column_config.NumberColumn('Worst season', format='%d'),
+                            'reliability': st.column_config.NumberColumn('Reliability', format='%.1f%%')})
+
+#Painel de profiling (somente com F1_PROFILE=1)
+profiling.finish()
+
+# ---- HIDE STREAMLIT STYLE -----
+#Codigo para ocultar marca d'agua e botões do streamlit
+hide_st_style = """
+            <style>
+            #MainMenu {visibility: hidden;}
+            footer {visibility: hidden;}
+            header {visibility: hidden;}
+            </style>
+            """
+st.markdown(hide_st_style, unsafe_allow_html=True)
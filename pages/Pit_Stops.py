@@ -0,0 +1,143 @@
+import streamlit as st
+
+from f1_reliability import analytics, charts, pitstops, profiling
+from f1_reliability.filters import FilterSpec
+from f1_reliability.store import get_store
+
+#Configuração inicial de pagina
+st.set_page_config(page_title='F1 Reliability Dashboard',
+                   page_icon='🏁',
+                   layout='wide',
+                   initial_sidebar_state='auto')
+
+#Instrumentação opcional do rerun (F1_PROFILE=1): tempo de cada etapa e das funções em cache
+profiling.start('Pit_Stops')
+
+st.logo('https://upload.wikimedia.org/wikipedia/commons/3/33/F1.svg')
+link = 'https://www.linkedin.com/in/andr%C3%A9s-michelangelli/'
+st.sidebar.markdown(f"Made by [Andrés A. Michelangelli]({link})")
+
+#Carregando os dados compartilhados (a tabela de paradas só é lida quando esta pagina é aberta)
+store = get_store()
+dataset = store.dataset
+index = store.index
+constructor_names = dataset.labels('constructors', 'constructor')
+profiling.lap('load')
+
+#Perfil de paradas de cada resultado, memorizado pelos filtros selecionados
+@profiling.cached('load_profile')
+def load_profile(fingerprint, filters, _store):
+    return analytics.pit_stop_profile(_store, filters)
+
+#Somente as temporadas que têm dados de paradas
+years = sorted(load_profile(store.fingerprint, FilterSpec(), store)['year'].unique().tolist())
+
+st.sidebar.header("Select filters below:")
+st.write(' ')
+st.sidebar.divider()
+st.sidebar.subheader('Years')
+start_year, end_year = st.sidebar.select_slider(
+    "Select a range of years: ",
+    options=years,
+    value=(years[0], years[-1]))
+
+st.sidebar.divider()
+teams = st.sidebar.multiselect(
+                            "Select teams: ",
+                            constructor_names[index.options('constructorId', FilterSpec(start_year, end_year))].sort_values().index,
+                            format_func=constructor_names.get
+                            )
+
+filters = FilterSpec(start_year, end_year, constructors=teams)
+profile = load_profile(store.fingerprint, filters, store)
+rates = pitstops.failure_rate_by_long_stop(profile).set_index('has_long_stop')
+profiling.lap('filters', len(profile))
+
+#Figuras memorizadas pelos filtros; o histograma recebe somente as faixas já contadas
+@profiling.cached('load_figures')
+def load_figures(fingerprint, filters, _store):
+    profile = load_profile(fingerprint, filters, _store)
+    chart = pitstops.failure_rate_by_long_stop(profile)
+    chart['stop'] = chart['has_long_stop'].map({True: 'Abnormally long stop', False: 'Normal stops'})
+    fig1 = charts.value_bars(chart, 'stop', 'rate', 'Failure rate by longest stop',
+                             {'stop': '', 'rate': 'Mechanical failure rate (%)'})
+    fig2 = charts.value_bars(pitstops.stops_before_failure(profile), 'stops', 'failures', 'Stops before a mechanical failure',
+                             {'stops': 'Stops before the failure', 'failures': 'Mechanical failures'}, dtick=1)
+    fig3 = charts.binned_histogram(profile.loc[profile['is_mechanical'], 'laps_since_stop'],
+                                   'Laps from the last stop to the failure',
+                                   'Laps since the last stop', 'Mechanical failures', box=False, height=450)
+    fig3.update_layout(bargap=0.1)
+    return fig1, fig2, fig3
+
+fig1, fig2, fig3 = load_figures(store.fingerprint, filters, store)
+
+# ---- MAINPAGE ----
+
+st.title(':stopwatch: F1 Pit Stops and Reliability')
+st.caption(f'A stop is abnormally long when it takes more than {pitstops.LONG_STOP_FACTOR}x the median stop of the same race.')
+
+kpi1, kpi2, kpi3, kpi4, kpi5 = st.columns(5)
+st.divider()
+col1, col2, col3 = st.columns(3)
+col4, col5 = st.columns([0.6, 0.4])
+
+#KPIs
+kpi1.metric(label='Races', value=int(profile['raceId'].nunique()))
+kpi2.metric(label='Pit stops', value=int(profile['stops'].sum()))
+kpi3.metric(label='Results with a long stop', value=int(profile['has_long_stop'].sum()))
+kpi4.metric(label='Failure rate after a long stop', value=f"{rates['rate'].get(True, 0.0)}%")
+kpi5.metric(label='Failure rate otherwise', value=f"{rates['rate'].get(False, 0.0)}%")
+profiling.lap('kpis')
+
+#Taxa de falhas mecânicas com e sem parada longa
+with col1:
+    st.plotly_chart(fig1)
+
+#Quantidade de paradas antes de cada falha mecânica
+with col2:
+    st.plotly_chart(fig2)
+
+#Voltas entre a ultima parada e a falha
+with col3:
+    st.plotly_chart(fig3)
+profiling.lap('charts')
+
+#Tabelas por equipe e por circuito
+column_config = {'results': 'Results',
+                 'stops_per_race': 'Stops per race',
+                 'median_longest_ms': st.column_config.NumberColumn('Median longest stop (ms)', format='%d'),
+                 'long_stop_results': 'Results with a long stop',
+                 'failures': 'Mechanical failures',
+                 'failure_rate': st.column_config.NumberColumn('Failure rate', format='%.1f%%'),
+                 'failure_rate_after_long': st.column_config.NumberColumn('Failure rate after a long stop', format='%.1f%%')}
+columns = list(column_config)
+
+with col4:
+    by_constructor = dataset.attach(pitstops.summary_by(profile, 'constructorId'), 'constructors', ['constructor'])
+    st.subheader('By constructor')
+    st.dataframe(by_constructor.sort_values('failure_rate', ascending=False),
+                 hide_index=True,
+                 column_order=['constructor', *columns],
+                 column_config={'constructor': 'Team', **column_config})
+with col5:
+    by_circuit = dataset.attach(pitstops.summary_by(profile, 'circuitId'), 'circuits', ['circuit_name'])
+    st.subheader('By circuit')
+    st.dataframe(by_circuit.sort_values('failure_rate', ascending=False),
+                 hide_index=True,
+                 column_order=['circuit_name', 'results', 'stops_per_race', 'failures', 'failure_rate', 'failure_rate_after_long'],
+                 column_config={'circuit_name': 'Circuit', **column_config})
+profiling.lap('tables')
+
+#Painel de profiling (somente com F1_PROFILE=1)
+profiling.finish()
+
+# ---- HIDE STREAMLIT STYLE -----
+#Codigo para ocultar marca d'agua e botões do streamlit
+hide_st_style = """
+            <style>
+            #MainMenu {visibility: hidden;}
+            footer {visibility: hidden;}
+            header {visibility: hidden;}
+            </style>
+            """
+st.markdown(hide_st_style, unsafe_allow_html=True)